@@ -0,0 +1,247 @@
+"""
+UBNAD asyncio runtime
+Enrichment, scoring, alerting and persistence as asyncio stages joined by bounded queues
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty
+
+from config import MONITORING_CONFIG
+from core import event_analyzer
+from core.intent_monitor import get_intent_score, get_idle_time
+from core.process_table import get_process_table
+from core.scoring_engine import ScoringEngine, get_default_engine
+from database.activity_store import insert_events
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("enrich", "score", "alert", "persist")
+
+
+class StageStats:
+    """Items, events and service time of one stage."""
+
+    __slots__ = ("items", "events", "busy_ms", "max_ms")
+
+    def __init__(self):
+        self.items = 0
+        self.events = 0
+        self.busy_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, events, started):
+        elapsed = (time.perf_counter() - started) * 1000
+        self.items += 1
+        self.events += events
+        self.busy_ms += elapsed
+        self.max_ms = max(self.max_ms, elapsed)
+
+
+class AsyncPipeline:
+    """
+    One analysis pipeline: enrich -> score -> alert -> persist.
+
+    Work moves between stages as event batches through bounded
+    asyncio.Queues, so a slow stage back-pressures the ones before it
+    instead of growing memory. Blocking work - psutil lookups for
+    processes the enricher has not sampled yet, SQLite writes - runs in
+    executors, so enrichment and persistence overlap with scoring on the
+    event loop.
+
+    Given its own ScoringEngine (the shared one otherwise), a pipeline
+    shares no per-process state with others, so several pipelines (e.g.
+    one per agent host) can run side by side in one process.
+    """
+
+    def __init__(self, name="local", scoring_engine=None, enrich=True, queue_size=None,
+                 io_executor=None, db_executor=None):
+        self.name = name
+        self.engine = scoring_engine or get_default_engine()
+        self.enrich = enrich
+        self.queue_size = queue_size or MONITORING_CONFIG.get('async_stage_queue', 8)
+        self.io_executor = io_executor or ThreadPoolExecutor(max_workers=4, thread_name_prefix="enrich")
+        self.db_executor = db_executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self.stats = {stage: StageStats() for stage in STAGES}
+        self.queues = {}
+        self._tasks = []
+
+    def start(self):
+        """Create the stage queues and tasks (call from the running event loop)."""
+        self.queues = {stage: asyncio.Queue(maxsize=self.queue_size) for stage in STAGES}
+        handlers = {"enrich": self._enrich, "score": self._score,
+                    "alert": self._alert, "persist": self._persist}
+        downstream = dict(zip(STAGES, STAGES[1:] + (None,)))
+        self._tasks = [asyncio.create_task(self._stage(stage, handlers[stage], downstream[stage]),
+                                           name=f"{self.name}-{stage}")
+                       for stage in STAGES]
+
+    async def submit(self, batch):
+        """Feed a collector batch into the pipeline (waits while the first stage is full)."""
+        await self.queues["enrich"].put(batch)
+
+    async def close(self):
+        """Let queued batches drain through every stage, then stop."""
+        await self.queues["enrich"].put(None)
+        await asyncio.gather(*self._tasks)
+
+    async def _stage(self, stage, handler, downstream):
+        queue = self.queues[stage]
+        stats = self.stats[stage]
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                if downstream:
+                    await self.queues[downstream].put(None)
+                return
+            started = time.perf_counter()
+            try:
+                result = await handler(batch)
+            except Exception as e:
+                logger.error(f"[{self.name}] {stage} stage error: {e}", exc_info=True)
+                continue
+            stats.record(len(batch), started)
+            if downstream and result:
+                await self.queues[downstream].put(result)
+
+    async def _enrich(self, events):
+        # Processes the background enricher has not sampled yet need a
+        # (blocking) psutil lookup - done off the event loop
+        if self.enrich:
+            table = get_process_table()
+            unknown = {e["pid"] for e in events if e.get("pid") is not None and table.peek(e["pid"]) is None}
+            if unknown:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(self.io_executor, lambda: [table.get(pid) for pid in unknown])
+        intent, idle = get_intent_score(), get_idle_time()
+        for event in events:
+            event["intent_score"] = intent
+            event["idle_time"] = idle
+        return events
+
+    async def _score(self, events):
+        existing = [e for e in events if e.get("event_type") == "existing"]
+        rows = event_analyzer.record_existing_connections(existing, self.engine) if existing else []
+        for event in events:
+            if event.get("event_type") == "existing":
+                continue
+            row = event_analyzer.score_event(event, self.engine, report=False)
+            if row is not None:
+                rows.append(row)
+        return rows
+
+    async def _alert(self, rows):
+        for row in rows:
+            event_analyzer.report_event(row)
+        return rows
+
+    async def _persist(self, rows):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.db_executor, insert_events, rows)
+        return None
+
+    def metrics(self):
+        """Queue depth and service time per stage."""
+        metrics = {}
+        for stage in STAGES:
+            stats = self.stats[stage]
+            queue = self.queues.get(stage)
+            metrics[stage] = {
+                'queue_depth': queue.qsize() if queue else 0,
+                'batches': stats.items,
+                'events': stats.events,
+                'avg_ms': round(stats.busy_ms / stats.items, 3) if stats.items else 0.0,
+                'max_ms': round(stats.max_ms, 3),
+            }
+        return metrics
+
+    def summary(self):
+        """One-line stage summary for the status log."""
+        return ", ".join(f"{stage} q={m['queue_depth']} {m['avg_ms']:.1f}ms"
+                         for stage, m in self.metrics().items())
+
+
+class AsyncRuntime:
+    """
+    Collection stage plus one or more AsyncPipelines.
+
+    The collector thread keeps publishing to its thread-safe queue; the
+    collection stage takes batches from it in an executor, passes them
+    through the event coalescer and routes them to a pipeline. With
+    `per_host`, every agent host (aggregator mode) gets its own pipeline
+    and scoring engine, created on first contact.
+
+    `coalescer` is the EventCoalescer configured by the caller (event
+    time for replay/pcap); the shared core.event_analyzer one by default.
+    """
+
+    def __init__(self, source_queue, per_host=False, enrich=True, is_running=lambda: True,
+                 coalescer=None):
+        self.source_queue = source_queue
+        self.coalescer = coalescer or event_analyzer.coalescer
+        self.per_host = per_host
+        self.enrich = enrich
+        self.is_running = is_running
+        self.io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="enrich")
+        self.db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self.pipelines = {}
+        self.collect_stats = StageStats()
+
+    def pipeline(self, host=None):
+        """Get (or start) the pipeline for a host."""
+        name = (host or "local") if self.per_host else "local"
+        pipeline = self.pipelines.get(name)
+        if pipeline is None:
+            engine = ScoringEngine.from_config(MONITORING_CONFIG) if self.per_host else None
+            if engine is not None:
+                engine.event_time = get_default_engine().event_time
+            pipeline = self.pipelines[name] = AsyncPipeline(
+                name, engine, enrich=self.enrich,
+                io_executor=self.io_executor, db_executor=self.db_executor)
+            pipeline.start()
+        return pipeline
+
+    async def _route(self, events):
+        if not self.per_host:
+            await self.pipeline().submit(events)
+            return
+        by_host = {}
+        for event in events:
+            by_host.setdefault(event.get("host"), []).append(event)
+        for host, host_events in by_host.items():
+            await self.pipeline(host).submit(host_events)
+
+    def _take(self):
+        try:
+            return self.source_queue.get(timeout=0.5)
+        except Empty:
+            return None
+
+    async def run(self, status_interval=15):
+        """Collect and route batches until is_running() turns false, then drain."""
+        loop = asyncio.get_running_loop()
+        last_status = time.time()
+        while self.is_running():
+            batch = await loop.run_in_executor(self.io_executor, self._take)
+            started = time.perf_counter()
+            events = self.coalescer.push(list(batch or ()))
+            if events:
+                await self._route(events)
+                self.collect_stats.record(len(events), started)
+
+            now = time.time()
+            if now - last_status >= status_interval:
+                logger.info(f"Status: {self.collect_stats.events} events collected, "
+                            f"source queue: {self.source_queue.qsize()} batches")
+                for name, pipeline in self.pipelines.items():
+                    logger.info(f"  [{name}] {pipeline.summary()}")
+                last_status = now
+
+        held = self.coalescer.flush()
+        if held:
+            await self._route(held)
+        await asyncio.gather(*(pipeline.close() for pipeline in self.pipelines.values()))
+        self.io_executor.shutdown(wait=False)
+        self.db_executor.shutdown(wait=True)
@@ -0,0 +1,2 @@
+# UBNAD Benchmarks
+# Stand-alone scripts measuring collector and pipeline performance.
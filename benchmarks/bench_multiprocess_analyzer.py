@@ -0,0 +1,88 @@
+"""
+UBNAD Multiprocess Analyzer Benchmark
+=====================================
+Feeds recorded events through multiprocess_analyzer_loop() (shared-memory
+rings, analyzer processes, one writer process) and reports end-to-end
+events/s for each number of analyzer processes.
+
+Usage:
+    python benchmarks/bench_multiprocess_analyzer.py [--source PATH] [--events N]
+                                                     [--processes 1,2,4] [--names N]
+
+Process names are rewritten to --names distinct values so the load can
+spread over the partitions (the exports contain only a handful of
+processes). Events are written to a temporary database, never to
+database/ubnad.db.
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from queue import Queue
+
+# Add parent to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import activity_store
+from collector.replay_collector import ReplayCollector
+import main as ubnad
+
+
+def stored_rows():
+    return sqlite3.connect(str(activity_store.DB_PATH)).execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+
+def run(processes, events):
+    """Dispatch `events` to `processes` analyzers; returns seconds until all rows are stored."""
+    activity_store.init_db()
+    before = stored_rows()
+    ubnad.event_queue = Queue()
+    for start in range(0, len(events), 500):
+        ubnad.event_queue.put(events[start:start + 500])
+
+    ubnad.running = True
+    started = time.perf_counter()
+    loop = threading.Thread(target=ubnad.multiprocess_analyzer_loop, args=(processes,))
+    loop.start()
+    while stored_rows() - before < len(events):
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    ubnad.running = False
+    loop.join()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the multiprocess analyzer")
+    parser.add_argument("--source", default=str(Path(__file__).resolve().parent.parent / "exports"),
+                        help="CSV export, exports directory or SQLite DB (default: exports/)")
+    parser.add_argument("--events", type=int, default=50000, help="Events per run (default: 50000)")
+    parser.add_argument("--processes", default="1,2,4", help="Analyzer process counts to try")
+    parser.add_argument("--names", type=int, default=64, help="Distinct process names (default: 64)")
+    args = parser.parse_args()
+
+    ubnad.logger.setLevel(logging.WARNING)
+    recorded = ReplayCollector(Queue(), args.source, speed=0.0).events
+    events = []
+    for i in range(args.events):
+        event = dict(recorded[i % len(recorded)])
+        event["process"] = f"{event['process']}#{i % args.names}"
+        event.pop("event_type", None)
+        events.append(event)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        activity_store.DB_PATH = Path(tmp) / "bench.db"
+        print(f"{'processes':>9} {'seconds':>8} {'events/s':>10}")
+        for processes in (int(p) for p in args.processes.split(",")):
+            elapsed = run(processes, events)
+            print(f"{processes:>9} {elapsed:>8.2f} {len(events) / elapsed:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+UBNAD Collector Scale Benchmark
+===============================
+Runs the psutil collector's full scan (snapshot, connection table diff,
+process lookup, traffic sampling) against synthetic socket tables of
+growing size and reports scan time, events per scan and memory.
+
+Usage:
+    python benchmarks/bench_synthetic_scale.py [--sizes 100,1000,...] [--churn F]
+                                               [--processes N] [--scans R] [--seed S]
+                                               [--max-known N] [--no-memory]
+
+Tables come from simulators/synthetic_socket_table.py, so results are
+reproducible and need no real sockets or privileges. Memory is the
+Python heap traced while building the table and running the scans
+(tracemalloc is only enabled for that measurement pass).
+
+Connections beyond max_known_connections are not tracked (and not
+reported) - watch the 'overflow' column when sizing that setting for
+large hosts.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from queue import Queue
+
+# Add parent to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collector.windows_net_collector import WindowsNetCollector
+from simulators.synthetic_socket_table import SyntheticSocketTable
+
+
+def drain(queue):
+    """Empty the event queue and return the number of events."""
+    events = 0
+    while not queue.empty():
+        events += len(queue.get_nowait())
+    return events
+
+
+def run_scans(table, scans, max_known=None):
+    """Baseline scan plus `scans` live scans; returns (collector, scan ms list, events per scan)."""
+    queue = Queue()
+    collector = WindowsNetCollector(queue, provider=table)
+    if max_known:
+        collector.known_connections.max_entries = max_known
+    collector.last_status = time.time()
+    collector._scan_connections(event_type="existing")
+    drain(queue)
+
+    timings, events = [], []
+    for _ in range(scans):
+        start = time.perf_counter()
+        collector._scan_connections()
+        timings.append((time.perf_counter() - start) * 1000)
+        events.append(drain(queue))
+    return collector, timings, events
+
+
+def measure_memory(args, size):
+    """Peak traced heap (MB) for the table plus the collector state."""
+    tracemalloc.start()
+    table = SyntheticSocketTable(sockets=size, churn=args.churn, processes=args.processes, seed=args.seed)
+    table_mb = tracemalloc.get_traced_memory()[0] / 1e6
+    run_scans(table, 2, args.max_known)
+    peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return table_mb, peak_mb
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark collector scans on synthetic socket tables")
+    parser.add_argument("--sizes", default="100,1000,10000,100000,500000",
+                        help="Comma-separated socket table sizes")
+    parser.add_argument("--churn", type=float, default=0.01,
+                        help="Fraction of sockets replaced per scan (default: 0.01)")
+    parser.add_argument("--processes", type=int, default=200,
+                        help="Distinct processes owning the sockets (default: 200)")
+    parser.add_argument("--scans", type=int, default=10,
+                        help="Live scans per size (default: 10)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-known", type=int, default=None,
+                        help="Override max_known_connections (default: from config)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip the tracemalloc pass (faster for large sizes)")
+    args = parser.parse_args()
+
+    print(f"churn={args.churn:.2%} per scan, {args.processes} processes, seed={args.seed}\n")
+    print(f"{'sockets':>8} {'best ms':>9} {'mean ms':>9} {'events/scan':>12} "
+          f"{'table MB':>9} {'peak MB':>9} {'known':>8} {'overflow':>8}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        table = SyntheticSocketTable(sockets=size, churn=args.churn, processes=args.processes, seed=args.seed)
+        collector, timings, events = run_scans(table, args.scans, args.max_known)
+        table_mb, peak_mb = (None, None) if args.no_memory else measure_memory(args, size)
+        memory = "" if table_mb is None else f"{table_mb:>9.1f} {peak_mb:>9.1f}"
+        print(f"{size:>8} {min(timings):>9.2f} {sum(timings) / len(timings):>9.2f} "
+              f"{sum(events) / len(events):>12.1f} {memory:>19} {len(collector.known_connections):>8} "
+              f"{collector.known_connections.overflow:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+UBNAD Agent Wire Protocol Benchmark
+===================================
+Measures the agent -> aggregator path: batch encoding, decoding, and
+end-to-end throughput of several agents streaming to one aggregator over
+localhost.
+
+Usage:
+    python benchmarks/bench_wire_protocol.py [--agents N] [--events N] [--batch N]
+
+Events are generated with a realistic amount of repetition (a few dozen
+processes and a few hundred destinations), which is what the per-batch
+string table is designed for.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from queue import Queue, Empty
+
+# Add parent to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collector.agent import AgentForwarder
+from collector.aggregator_collector import AggregatorCollector
+from collector.wire_protocol import FRAME_HEADER, decode_batch, encode_batch
+
+
+def make_batch(size, offset=0):
+    """Build one batch of open events with sampled byte counts."""
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    return [{
+        "event_type": "open",
+        "timestamp": timestamp,
+        "pid": 1000 + (i % 300),
+        "process": f"proc{i % 40}.exe",
+        "dest_ip": f"203.0.{(i // 250) % 4}.{i % 250}",
+        "dest_port": (443, 80, 8080, 53)[i % 4],
+        "protocol": "TCP",
+        "bytes_sent": i * 13,
+        "bytes_recv": i * 97,
+    } for i in range(offset, offset + size)]
+
+
+def bench_codec(batch, rounds=20):
+    """Return (encode events/s, decode events/s, bytes per event)."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        frame = encode_batch(batch)[0]
+    encode_rate = len(batch) * rounds / (time.perf_counter() - start)
+
+    payload = frame[FRAME_HEADER.size:]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        decode_batch(payload, "bench")
+    decode_rate = len(batch) * rounds / (time.perf_counter() - start)
+    return encode_rate, decode_rate, len(frame) / len(batch)
+
+
+def bench_end_to_end(agents, events, batch_size):
+    """Stream `events` per agent through a localhost aggregator; return events/s."""
+    analyzer_queue = Queue(maxsize=1000)
+    aggregator = AggregatorCollector(analyzer_queue, "127.0.0.1:0")
+    if not aggregator.start():
+        sys.exit(1)
+    port = aggregator.address[1]
+
+    batches = events // batch_size
+    forwarders = []
+    for n in range(agents):
+        local_queue = Queue()
+        for b in range(batches):
+            local_queue.put(make_batch(batch_size, b * batch_size))
+        forwarder = AgentForwarder(local_queue, f"127.0.0.1:{port}", hostname=f"agent-{n:03d}")
+        threading.Thread(target=forwarder.run, daemon=True).start()
+        forwarders.append(forwarder)
+
+    expected = agents * batches * batch_size
+    received = 0
+    start = time.perf_counter()
+    while received < expected:
+        try:
+            received += len(analyzer_queue.get(timeout=10))
+        except Empty:
+            break
+    elapsed = time.perf_counter() - start
+
+    for forwarder in forwarders:
+        forwarder.stop()
+    aggregator.stop()
+    return received, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the agent wire protocol and aggregator")
+    parser.add_argument("--agents", type=int, default=4, help="Concurrent agents")
+    parser.add_argument("--events", type=int, default=200000, help="Events sent by each agent")
+    parser.add_argument("--batch", type=int, default=1000, help="Events per batch")
+    args = parser.parse_args()
+
+    encode_rate, decode_rate, per_event = bench_codec(make_batch(args.batch))
+    print(f"codec ({args.batch}-event batches): encode {encode_rate:,.0f} ev/s, "
+          f"decode {decode_rate:,.0f} ev/s, {per_event:.1f} bytes/event")
+
+    received, elapsed = bench_end_to_end(args.agents, args.events, args.batch)
+    print(f"end-to-end: {received:,} events from {args.agents} agents in {elapsed:.2f}s "
+          f"= {received / elapsed:,.0f} ev/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,89 @@
+"""
+Collector backends and backend selection.
+
+Backends: 'psutil' (portable polling), 'proc' (/proc/net tables),
+'sock_diag' (netlink socket dumps), 'ebpf' (kernel connect tracing),
+'scoped' (selected cgroups / network namespaces only), 'replay'
+(recorded events), 'pcap' (connections extracted from captures) and
+'aggregator' (events streamed by remote agents, see collector.agent).
+'auto' picks eBPF on Linux when bcc is available, then /proc/net, and
+psutil elsewhere.
+"""
+
 # Collector modules
+
+import sys
+
+from config import MONITORING_CONFIG
+
+BACKENDS = ('auto', 'psutil', 'proc', 'sock_diag', 'ebpf', 'scoped', 'replay', 'pcap', 'aggregator')
+
+
+def create_collector(event_queue, backend=None, config=None):
+    """
+    Build a collector backend selected by name or MONITORING_CONFIG.
+
+    Backends are imported lazily so optional dependencies (bcc) are only
+    needed when selected.
+
+    Returns:
+        BaseCollector: an unstarted collector
+    """
+    config = MONITORING_CONFIG if config is None else config
+    backend = backend or config.get('collector_backend', 'auto')
+
+    if backend == 'auto':
+        if not sys.platform.startswith('linux'):
+            backend = 'psutil'
+        else:
+            from collector.ebpf_collector import HAS_BCC
+            backend = 'ebpf' if HAS_BCC else 'proc'
+
+    if backend == 'psutil':
+        from collector.windows_net_collector import WindowsNetCollector
+        return WindowsNetCollector(event_queue)
+    if backend == 'proc':
+        from collector.linux_proc_collector import LinuxProcNetCollector
+        return LinuxProcNetCollector(event_queue)
+    if backend == 'sock_diag':
+        from collector.sock_diag_collector import SockDiagCollector
+        return SockDiagCollector(event_queue)
+    if backend == 'ebpf':
+        from collector.ebpf_collector import EbpfCollector
+        return EbpfCollector(event_queue)
+    if backend == 'scoped':
+        from collector.scoped_collector import ScopedCollector
+        return ScopedCollector(
+            event_queue,
+            cgroups=config.get('scope_cgroups', ()),
+            netns=config.get('scope_netns', ()),
+        )
+    if backend == 'replay':
+        from collector.replay_collector import ReplayCollector
+        return ReplayCollector(
+            event_queue,
+            config.get('replay_source', 'exports'),
+            speed=config.get('replay_speed', 0.0),
+        )
+    if backend == 'pcap':
+        from collector.pcap_collector import PcapCollector
+        return PcapCollector(
+            event_queue,
+            config.get('pcap_source'),
+            attribution=config.get('pcap_attribution'),
+            speed=config.get('replay_speed', 0.0),
+            local_nets=config.get('pcap_local_nets', ()),
+        )
+    if backend == 'aggregator':
+        from collector.aggregator_collector import AggregatorCollector
+        return AggregatorCollector(event_queue, config.get('aggregator_bind', '0.0.0.0:9555'))
+    raise ValueError(f"Unknown collector backend: {backend!r} (choose from {', '.join(BACKENDS)})")
+
+
+def fallback_backend(backend):
+    """Backend to try when `backend` fails to start, or None."""
+    if backend == 'ebpf':
+        return 'proc' if sys.platform.startswith('linux') else 'psutil'
+    if backend in ('proc', 'sock_diag'):
+        return 'psutil'
+    return None
@@ -0,0 +1,104 @@
+"""
+Agent Forwarder
+Streams a local collector's event batches to a central aggregator
+"""
+
+import socket
+import time
+from queue import Empty
+
+from collector.aggregator_collector import parse_address
+from collector.wire_protocol import encode_batch, encode_hello
+
+
+class AgentForwarder:
+    """
+    Sends batches from the local event queue to an aggregator.
+
+    Runs in the calling thread (run() blocks until stop()). Each queue
+    item is encoded to BATCH frames and written with one sendall(). When
+    the aggregator is unreachable the pending batch is kept and the
+    connection is retried with exponential backoff (up to 30s); the
+    collector keeps filling the bounded queue meanwhile and counts what
+    it has to drop.
+    """
+
+    MAX_BACKOFF = 30.0
+
+    def __init__(self, event_queue, aggregator, hostname=None):
+        self.event_queue = event_queue
+        self.aggregator = parse_address(aggregator, default_host="127.0.0.1")
+        self.hostname = hostname or socket.gethostname()
+        self.running = False
+        self.sock = None
+
+        # Monitoring counters
+        self.sent_batches = 0
+        self.sent_events = 0
+        self.sent_bytes = 0
+        self.connections = 0
+
+    def run(self):
+        """Forward batches until stop() is called."""
+        self.running = True
+        pending = None
+        backoff = 1.0
+        while self.running:
+            if pending is None:
+                try:
+                    pending = self.event_queue.get(timeout=1.0)
+                except Empty:
+                    continue
+            try:
+                if self.sock is None:
+                    self._connect()
+                    backoff = 1.0
+                self.send(pending)
+                pending = None
+            except OSError as e:
+                self._close()
+                if not self.running:
+                    break
+                print(f"[Agent] Aggregator {self.aggregator[0]}:{self.aggregator[1]} "
+                      f"unreachable ({e}) - retrying in {backoff:.0f}s")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.MAX_BACKOFF)
+        self._close()
+
+    def send(self, batch):
+        """Encode and send one batch on the open connection."""
+        frames = encode_batch(batch)
+        data = frames[0] if len(frames) == 1 else b"".join(frames)
+        self.sock.sendall(data)
+        self.sent_batches += 1
+        self.sent_events += len(batch)
+        self.sent_bytes += len(data)
+
+    def _connect(self):
+        self.sock = socket.create_connection(self.aggregator, timeout=10.0)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.sendall(encode_hello(self.hostname))
+        self.connections += 1
+        print(f"[Agent] Connected to aggregator {self.aggregator[0]}:{self.aggregator[1]} as {self.hostname}")
+
+    def _close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+    def stop(self):
+        """Stop forwarding (run() returns within a second)."""
+        self.running = False
+
+    def get_metrics(self):
+        """Get forwarding counters."""
+        return {
+            'sent_batches': self.sent_batches,
+            'sent_events': self.sent_events,
+            'sent_bytes': self.sent_bytes,
+            'connections': self.connections,
+            'connected': self.sock is not None,
+        }
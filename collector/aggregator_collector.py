@@ -0,0 +1,149 @@
+"""
+Aggregator Collector
+Receives event batches from remote UBNAD agents and feeds them to the local analyzer
+"""
+
+import socket
+import threading
+from queue import Full
+
+from collector.base_collector import BaseCollector
+from collector.wire_protocol import (
+    DEFAULT_PORT, FRAME_BATCH, FRAME_HELLO, ProtocolError, decode_batch, decode_hello, read_frame,
+)
+
+
+def parse_address(address, default_host="0.0.0.0"):
+    """Parse "host:port", ":port" or "port" into (host, port)."""
+    address = str(address)
+    host, sep, port = address.rpartition(":")
+    if not sep:
+        return default_host, int(address or DEFAULT_PORT)
+    return host.strip("[]") or default_host, int(port or DEFAULT_PORT)
+
+
+class AggregatorCollector(BaseCollector):
+    """
+    Collector backend accepting many agents over TCP.
+
+    Every agent connection gets a reader thread that decodes BATCH frames
+    and publishes them as-is, tagged with the agent's hostname from its
+    HELLO frame. Under the block queue policy publishing waits while the
+    analyzer queue is full, so a slow analyzer pushes back on the agents
+    through TCP flow control instead of dropping events here; a shedding
+    policy may drop part of a batch instead, counted in dropped_events.
+    """
+
+    name = "aggregator"
+
+    def __init__(self, event_queue, bind=f"0.0.0.0:{DEFAULT_PORT}"):
+        super().__init__(event_queue)
+        self.bind = parse_address(bind)
+        self.server = None
+        self.agents = {}  # {peer_address: hostname}
+        self.frames = 0
+        self.bytes_received = 0
+        self.protocol_errors = 0
+        self._lock = threading.Lock()
+
+    @property
+    def address(self):
+        """Address the server listens on (useful with port 0)."""
+        return self.server.getsockname() if self.server else None
+
+    def start(self):
+        """Open the listening socket and start accepting agents."""
+        try:
+            self.server = socket.create_server(self.bind, backlog=128)
+        except OSError as e:
+            print(f"[Collector] Aggregator cannot listen on {self.bind[0]}:{self.bind[1]}: {e}")
+            return False
+        self.server.settimeout(1.0)
+        super().start()
+        host, port = self.address[:2]
+        print(f"[Collector] Aggregator listening on {host}:{port}")
+        return True
+
+    def _run(self):
+        """Accept loop - one reader thread per agent."""
+        while self.running:
+            try:
+                conn, peer = self.server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve_agent, args=(conn, peer), daemon=True).start()
+
+    def _serve_agent(self, conn, peer):
+        """Read frames from one agent until it disconnects."""
+        peer_name = f"{peer[0]}:{peer[1]}"
+        host = None
+        try:
+            with conn, conn.makefile("rb", buffering=1 << 20) as stream:
+                while self.running:
+                    frame = read_frame(stream)
+                    if frame is None:
+                        break
+                    frame_type, payload = frame
+                    with self._lock:
+                        self.frames += 1
+                        self.bytes_received += len(payload)
+                    if frame_type == FRAME_HELLO:
+                        host = decode_hello(payload)
+                        with self._lock:
+                            self.agents[peer_name] = host
+                        print(f"[Collector] Agent connected: {host} ({peer_name})")
+                    elif frame_type == FRAME_BATCH:
+                        if host is None:
+                            raise ProtocolError("BATCH before HELLO")
+                        self._publish_blocking(decode_batch(payload, host))
+                    else:
+                        raise ProtocolError(f"Unknown frame type {frame_type}")
+        except (ProtocolError, OSError) as e:
+            with self._lock:
+                self.protocol_errors += 1
+            if self.running:
+                print(f"[Collector] Agent {host or peer_name} dropped: {e}")
+        finally:
+            with self._lock:
+                self.agents.pop(peer_name, None)
+            if host and self.running:
+                print(f"[Collector] Agent disconnected: {host} ({peer_name})")
+
+    def _publish_blocking(self, batch):
+        """Publish a batch, waiting for queue space as long as we are running."""
+        while self.running:
+            try:
+                accepted = self.event_queue.put(batch, timeout=self.publish_timeout)
+            except Full:
+                continue
+            if accepted is None:  # plain queue.Queue
+                accepted = len(batch)
+            # Reader threads share the counters
+            with self._lock:
+                self.scan_count += 1
+                self.event_count += accepted
+                self.dropped_events += len(batch) - accepted
+            return
+
+    def get_metrics(self):
+        """Get collector metrics plus connected agents and traffic."""
+        metrics = super().get_metrics()
+        with self._lock:
+            metrics.update({
+                'agents': sorted(self.agents.values()),
+                'frames': self.frames,
+                'bytes_received': self.bytes_received,
+                'protocol_errors': self.protocol_errors,
+            })
+        return metrics
+
+    def stop(self):
+        """Stop accepting agents and close the listening socket."""
+        self.running = False
+        if self.server is not None:
+            self.server.close()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
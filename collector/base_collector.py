@@ -0,0 +1,81 @@
+"""
+Base Collector - Common interface for network event sources
+Every backend publishes lists of event dicts onto the analyzer's event queue
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from queue import Full
+
+
+class BaseCollector(ABC):
+    """
+    Interface shared by all collector backends.
+
+    Backends produce event dicts with the keys main.process_event()
+    consumes (timestamp, pid, process, dest_ip, dest_port and optionally
+    protocol and event_type: 'open', 'close' or 'existing' for
+    connections found at startup) and hand them over in batches via
+    _publish(). Subclasses implement _run(), which is executed on a
+    daemon thread by start().
+    """
+
+    name = "base"
+
+    def __init__(self, event_queue):
+        self.event_queue = event_queue
+        self.running = False
+        self.scan_count = 0
+        self.event_count = 0
+        self.dropped_events = 0
+        self.last_status = None
+        self.publish_timeout = 1.0
+        self._thread = None
+
+    def start(self):
+        """Start the collector in background thread."""
+        self.running = True
+        self.last_status = time.time()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return True
+
+    @abstractmethod
+    def _run(self):
+        """Collector main loop (runs on the collector thread)."""
+
+    def _publish(self, batch):
+        """
+        Hand a list of events to the analyzer as a single queue item.
+
+        An EventQueue may keep only part of the batch (or fold it into
+        queued events) under its overload policy; the rest counts as dropped.
+        """
+        put_batch = getattr(self.event_queue, "put_batch", None)
+        if put_batch is None:
+            try:
+                self.event_queue.put(batch, timeout=self.publish_timeout)
+            except Full:
+                self.dropped_events += len(batch)
+                return False
+            self.event_count += len(batch)
+            return True
+
+        accepted = put_batch(batch, timeout=self.publish_timeout)
+        self.event_count += accepted
+        self.dropped_events += len(batch) - accepted
+        return accepted > 0
+
+    def get_metrics(self):
+        """Get collector metrics."""
+        return {
+            'backend': self.name,
+            'scan_count': self.scan_count,
+            'event_count': self.event_count,
+            'dropped_events': self.dropped_events,
+        }
+
+    def stop(self):
+        """Stop the collector."""
+        self.running = False
@@ -0,0 +1,185 @@
+"""
+Connection Table - Generational tracking of live outbound connections
+Diffs each socket snapshot against the previous one so closed sockets expire
+"""
+
+import socket
+import struct
+import time
+
+_KEY_V4 = struct.Struct("!IH4sH4s")
+_KEY_V6 = struct.Struct("!IH16sH16s")
+_NO_PID = 0xFFFFFFFF
+
+
+def pack_connection_key(pid, local_ip, local_port, remote_ip, remote_port):
+    """
+    Pack a connection 5-tuple into a compact bytes key.
+
+    A packed IPv4 key is 16 bytes (IPv6: 40 bytes) instead of a 5-tuple
+    holding two address strings, which keeps large tables small.
+    """
+    pid = _NO_PID if pid is None else pid
+    if ':' in remote_ip or ':' in local_ip:
+        return _KEY_V6.pack(pid, local_port, _pton6(local_ip), remote_port, _pton6(remote_ip))
+    return _KEY_V4.pack(pid, local_port, socket.inet_aton(local_ip),
+                        remote_port, socket.inet_aton(remote_ip))
+
+
+def unpack_connection_key(key):
+    """Unpack a key from pack_connection_key() back into a 5-tuple."""
+    if len(key) == _KEY_V4.size:
+        pid, lport, lip, rport, rip = _KEY_V4.unpack(key)
+        lip, rip = socket.inet_ntoa(lip), socket.inet_ntoa(rip)
+    else:
+        pid, lport, lip, rport, rip = _KEY_V6.unpack(key)
+        lip = socket.inet_ntop(socket.AF_INET6, lip)
+        rip = socket.inet_ntop(socket.AF_INET6, rip)
+    return (None if pid == _NO_PID else pid, lip, lport, rip, rport)
+
+
+def _pton6(ip):
+    """Pack an IPv6 (or IPv4) address string into 16 bytes."""
+    if ':' not in ip:
+        ip = '::ffff:' + ip
+    return socket.inet_pton(socket.AF_INET6, ip.split('%', 1)[0])
+
+
+class ConnectionTable:
+    """
+    Generational table of connections seen in the socket snapshots.
+
+    Every scan is bracketed by begin_scan() / end_scan(). Entries seen in
+    the previous generation are carried into the current one when observed
+    again; whatever is left of the previous generation at end_scan() has
+    disappeared from the socket table and expires. A reused 5-tuple after
+    a close is therefore reported as new again.
+
+    Each entry remembers the generation and scan time it was first seen
+    plus caller-supplied info, so expiry also yields connection lifetimes
+    (see `closed`) without any extra pass over the socket table.
+
+    At `max_entries` the table stops taking new keys instead of evicting:
+    every tracked key may still be live further down the snapshot, and
+    dropping one would report it as new again. Untracked connections are
+    counted in `overflow` and not reported; once closes free up room a
+    still-open one is picked up (and reported) by a later scan.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.generation = 0
+        self._previous = {}  # {key: (first_seen_generation, first_seen_time, info)}
+        self._current = {}
+        self._scanning = False
+        self.scan_time = None
+        self._last_scan_time = None
+        self.closed = []  # [(info, duration_secs, polls_seen)] from the last end_scan()
+
+        # Monitoring counters
+        self.inserted = 0
+        self.expired = 0
+        self.overflow = 0
+        self.peak_size = 0
+
+    def __len__(self):
+        return len(self._current) + len(self._previous)
+
+    def __contains__(self, key):
+        return key in self._current or key in self._previous
+
+    def begin_scan(self, now=None):
+        """Start a new generation (`now` is the snapshot time, default time.time())."""
+        if self._scanning:
+            # Previous scan was aborted - nothing it missed may expire
+            self._previous.update(self._current)
+        else:
+            self._previous = self._current
+            self._last_scan_time = self.scan_time
+        self._current = {}
+        self._scanning = True
+        self.generation += 1
+        self.scan_time = time.time() if now is None else now
+
+    def observe(self, key, info=None):
+        """
+        Record a connection key as live in this generation.
+
+        `info` is stored with a new entry and handed back when it closes.
+
+        Returns:
+            bool: True if the connection was not live in the previous scan
+            (False for a new connection the full table could not take)
+        """
+        current = self._current
+        if key in current:
+            return False
+
+        first_seen = self._previous.pop(key, None)
+        if first_seen is not None:
+            current[key] = first_seen
+            return False
+
+        if len(current) + len(self._previous) >= self.max_entries:
+            self.overflow += 1
+            return False
+        current[key] = (self.generation, self.scan_time, info)
+        self.inserted += 1
+        return True
+
+    def set_info(self, key, info):
+        """Attach info to an entry observed in this generation."""
+        generation, first_seen, _ = self._current[key]
+        self._current[key] = (generation, first_seen, info)
+
+    def forget(self, keys):
+        """
+        Drop entries of the current generation, so the next scan reports them as new.
+
+        Used when a scan's events could not be handed on: the connections
+        are still open, but nobody has been told about them.
+
+        Returns:
+            list: info of the dropped entries
+        """
+        infos = []
+        for key in keys:
+            entry = self._current.pop(key, None)
+            if entry is not None:
+                infos.append(entry[2])
+        return infos
+
+    def end_scan(self):
+        """
+        Close the current generation and expire connections that vanished.
+
+        Connections that vanished are listed in `closed` as
+        (info, duration_secs, polls_seen). The duration is the observed
+        lifetime: first sighting to the last scan that still saw it.
+
+        Returns:
+            int: Number of entries expired by this scan
+        """
+        expired = len(self._previous)
+        self.expired += expired
+        last_seen = self._last_scan_time
+        self.closed = [
+            (info, max(0.0, last_seen - first_seen), self.generation - first_generation)
+            for first_generation, first_seen, info in self._previous.values()
+        ] if expired and last_seen is not None else []
+        self._previous = {}
+        self._scanning = False
+        self.peak_size = max(self.peak_size, len(self._current))
+        return expired
+
+    def stats(self):
+        """Get table counters for monitoring."""
+        return {
+            'size': len(self),
+            'max_entries': self.max_entries,
+            'generation': self.generation,
+            'inserted': self.inserted,
+            'expired': self.expired,
+            'overflow': self.overflow,
+            'peak_size': self.peak_size,
+        }
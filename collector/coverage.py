@@ -0,0 +1,127 @@
+"""
+Coverage Monitor - Estimate how many outbound connections polling misses
+Compares the kernel's TCP ActiveOpens counter with the connections a collector emitted
+"""
+
+import ctypes
+import sys
+
+SNMP_PATH = "/proc/net/snmp"
+
+
+def read_snmp_tcp(path=SNMP_PATH):
+    """
+    Read the Tcp counters from /proc/net/snmp.
+
+    Linux keeps one TCP MIB for IPv4 and IPv6, so ActiveOpens already
+    covers both families.
+
+    Returns:
+        dict: {counter_name: int}, empty if unavailable
+    """
+    try:
+        with open(path, "rb") as f:
+            tcp_lines = [line.split()[1:] for line in f if line.startswith(b"Tcp:")]
+    except OSError:
+        return {}
+    if len(tcp_lines) < 2:
+        return {}
+    names, values = tcp_lines[0], tcp_lines[1]
+    return {name.decode(): int(value) for name, value in zip(names, values)}
+
+
+class _MibTcpStats(ctypes.Structure):
+    _fields_ = [(name, ctypes.c_ulong) for name in (
+        "dwRtoAlgorithm", "dwRtoMin", "dwRtoMax", "dwMaxConn", "dwActiveOpens",
+        "dwPassiveOpens", "dwAttemptFails", "dwEstabResets", "dwCurrEstab",
+        "dwInSegs", "dwOutSegs", "dwRetransSegs", "dwInErrs", "dwOutRsts", "dwNumConns")]
+
+
+def read_windows_tcp():
+    """Read ActiveOpens/AttemptFails summed over IPv4 and IPv6 via GetTcpStatisticsEx."""
+    iphlpapi = ctypes.windll.iphlpapi
+    totals = {"ActiveOpens": 0, "AttemptFails": 0}
+    for family in (2, 23):  # AF_INET, AF_INET6
+        stats = _MibTcpStats()
+        if iphlpapi.GetTcpStatisticsEx(ctypes.byref(stats), family) != 0:
+            return {}
+        totals["ActiveOpens"] += stats.dwActiveOpens
+        totals["AttemptFails"] += stats.dwAttemptFails
+    return totals
+
+
+def read_tcp_counters():
+    """Read the platform's TCP open counters ({} if unsupported)."""
+    if sys.platform == "win32":
+        try:
+            return read_windows_tcp()
+        except (AttributeError, OSError):
+            return {}
+    return read_snmp_tcp()
+
+
+class CoverageMonitor:
+    """
+    Tracks collector coverage against kernel connection counters.
+
+    Each scan, the growth in successful active opens (ActiveOpens minus
+    AttemptFails) is compared with the new connections the collector
+    emitted. The kernel also counts loopback and private destinations,
+    which the collector filters out, and connects that fail later on, so
+    the coverage ratio is a lower bound and the miss estimate an upper
+    bound. The first scan only sets the baseline, because connections
+    already open at startup were not opened during monitoring.
+    """
+
+    def __init__(self, reader=read_tcp_counters):
+        self.reader = reader
+        self.available = True
+        self._baseline = None
+        self.kernel_opens = 0
+        self.observed_opens = 0
+
+    def update(self, new_connections):
+        """Account one scan that emitted `new_connections` new connections."""
+        if not self.available:
+            return
+        counters = self.reader()
+        if "ActiveOpens" not in counters:
+            self.available = False
+            return
+        opens = counters["ActiveOpens"] - counters.get("AttemptFails", 0)
+        if self._baseline is not None:
+            delta = opens - self._baseline
+            if delta >= 0:  # counter wrapped otherwise - skip this scan
+                self.kernel_opens += delta
+                self.observed_opens += new_connections
+        self._baseline = opens
+
+    @property
+    def coverage(self):
+        """Fraction of kernel opens the collector reported (None before any opens)."""
+        if not self.kernel_opens:
+            return None
+        return min(1.0, self.observed_opens / self.kernel_opens)
+
+    @property
+    def missed(self):
+        """Estimated number of connections opened and closed between scans."""
+        return max(0, self.kernel_opens - self.observed_opens)
+
+    def summary(self):
+        """Short text for the status line."""
+        if not self.available:
+            return "coverage n/a"
+        if self.coverage is None:
+            return "coverage -"
+        return f"coverage {self.coverage:.0%} (~{self.missed} missed)"
+
+    def metrics(self):
+        """Get coverage counters for monitoring."""
+        return {
+            'coverage_available': self.available,
+            'coverage_ratio': self.coverage,
+            'coverage_missed_estimate': self.missed,
+            'coverage_kernel_opens': self.kernel_opens,
+            'coverage_observed_opens': self.observed_opens,
+        }
@@ -0,0 +1,306 @@
+"""
+Event Queue - Bounded collector -> analyzer hand-off with explicit overload policies
+Counts every shed event by reason and by process
+"""
+
+import threading
+import time
+from collections import Counter, deque
+from queue import Empty, Full
+
+from config import is_safe_port, is_trusted_process
+from core.event_coalescer import coalesce_key, merge_into
+
+POLICIES = ("block", "drop_oldest", "drop_newest", "sample_safe", "coalesce")
+
+
+def looks_safe(event):
+    """Trusted process on a common port - the traffic shed first under sample_safe."""
+    return (event.get("event_type", "open") == "open"
+            and is_trusted_process(event.get("process") or "")
+            and is_safe_port(event.get("dest_port")))
+
+
+class EventQueue:
+    """
+    Queue of event batches bounded by the number of events it holds.
+
+    Drop-in for the queue.Queue the collectors and the analyzer share
+    (put/get/get_nowait/qsize/empty), with a policy for what happens when
+    a batch does not fit:
+
+    - block:       wait up to the put timeout for room, then refuse the batch
+    - drop_oldest: evict the oldest queued events to make room
+    - drop_newest: keep what fits of the new batch, shed the rest
+    - sample_safe: shed SAFE-looking events (trusted process, common port)
+                   first, keeping one in `sample_rate` of them, then fall
+                   back to drop_newest
+    - coalesce:    fold new open events into queued open events for the
+                   same (host, pid, process, dest_ip, dest_port) - kept in
+                   their `count`, which scoring and storage honour - then
+                   fall back to drop_newest
+
+    A batch always fits into an empty queue, so one oversized batch (e.g.
+    the startup snapshot of a busy host) is never shed.
+
+    Shedding is lossy beyond the event itself: the collector has already
+    recorded a shed connection as known in its ConnectionTable, so a shed
+    open event is not reported again while the connection stays open.
+    Shed open events are therefore counted on their own (`shed_open`).
+    A batch the block policy refuses is not shed: it goes back to the
+    producer (the polling collectors forget its connections and report
+    them again), so it is only counted in `refused`. Coalesced events are not shed
+    either - they are counted in `coalesced`.
+    """
+
+    def __init__(self, max_events=1000, policy="block", sample_rate=10):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown event queue policy: {policy}")
+        self.max_events = max_events
+        self.policy = policy
+        self.sample_rate = max(1, sample_rate)
+        self._batches = deque()
+        self._events = 0
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._safe_seen = 0
+
+        # Monitoring counters
+        self.accepted = 0
+        self.coalesced = 0
+        self.refused = 0
+        self.shed_open = 0
+        self.shed_by_reason = Counter()
+        self.shed_by_process = Counter()
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a queue from MONITORING_CONFIG-style settings."""
+        return cls(max_events=config.get('event_queue_max', 1000),
+                   policy=config.get('event_queue_policy', 'block'),
+                   sample_rate=config.get('event_queue_sample_rate', 10))
+
+    # -- producer side --------------------------------------------------
+
+    def put_batch(self, batch, timeout=None):
+        """
+        Add a batch under the queue's policy.
+
+        Under the block policy a batch that is still waiting for room after
+        `timeout` seconds is refused whole and counted in `refused`, not as
+        shed - the producer still holds it.
+
+        Returns:
+            int: events of `batch` that were queued (or merged, for coalesce)
+        """
+        accepted = self._offer(batch, timeout)
+        if accepted is None:
+            with self._lock:
+                self.refused += len(batch)
+            return 0
+        return accepted
+
+    def put(self, batch, block=True, timeout=None):
+        """
+        queue.Queue-style put: raises Full if the block policy timed out.
+
+        Unlike put_batch(), a timed-out batch is not counted at all - the
+        caller still holds it (and usually retries).
+
+        Returns:
+            int: events of `batch` that were queued or merged (the other
+            policies may shed the rest)
+        """
+        accepted = self._offer(batch, timeout if block else 0)
+        if accepted is None:
+            raise Full
+        return accepted
+
+    def _offer(self, batch, timeout):
+        """Apply the policy; None means the block policy ran out of time."""
+        if not batch:
+            return 0
+        with self._lock:
+            if self.policy == "block":
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while self._events and self._events + len(batch) > self.max_events:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return None
+                    self._not_full.wait(remaining)
+                return self._append(batch)
+
+            if self._events + len(batch) <= self.max_events or not self._events:
+                return self._append(batch)
+
+            if self.policy == "drop_oldest":
+                self._evict(len(batch) - self.max_events + self._events)
+                return self._append(batch)
+
+            merged = 0
+            if self.policy == "sample_safe":
+                batch = self._sample_safe(batch)
+            elif self.policy == "coalesce":
+                batch, merged = self._coalesce(batch)
+
+            room = max(0, self.max_events - self._events)
+            if len(batch) > room:
+                self._shed(batch[room:], "drop_newest")
+                batch = batch[:room]
+            return merged + (self._append(batch) if batch else 0)
+
+    def _append(self, batch):
+        self._batches.append(batch)
+        self._events += len(batch)
+        self.accepted += len(batch)
+        self._not_empty.notify()
+        return len(batch)
+
+    def _shed(self, events, reason):
+        self.shed_open += sum(1 for e in events if e.get("event_type", "open") == "open")
+        self.shed_by_reason[reason] += len(events)
+        self.shed_by_process.update(e.get("process") or "Unknown" for e in events)
+
+    def _evict(self, count):
+        """Drop `count` of the oldest queued events."""
+        while count > 0 and self._batches:
+            oldest = self._batches[0]
+            if len(oldest) <= count:
+                self._batches.popleft()
+                dropped = oldest
+            else:
+                dropped = oldest[:count]
+                self._batches[0] = oldest[count:]
+            self._events -= len(dropped)
+            count -= len(dropped)
+            self._shed(dropped, "drop_oldest")
+
+    def _sample_safe(self, batch):
+        """Shed SAFE-looking events of the new batch, keeping one in sample_rate."""
+        kept, shed = [], []
+        for event in batch:
+            if looks_safe(event):
+                self._safe_seen += 1
+                if self._safe_seen % self.sample_rate:
+                    shed.append(event)
+                    continue
+            kept.append(event)
+        if shed:
+            self._shed(shed, "sampled_safe")
+        if len(kept) > self.max_events - self._events:
+            self._evict_safe(len(kept) - (self.max_events - self._events))
+        return kept
+
+    def _evict_safe(self, count):
+        """Drop up to `count` queued SAFE-looking events, oldest first."""
+        for index, queued in enumerate(self._batches):
+            if count <= 0:
+                break
+            kept, shed = [], []
+            for event in queued:
+                if count > 0 and looks_safe(event):
+                    shed.append(event)
+                    count -= 1
+                else:
+                    kept.append(event)
+            if shed:
+                self._batches[index] = kept
+                self._events -= len(shed)
+                self._shed(shed, "sampled_safe")
+        while self._batches and not self._batches[0]:
+            self._batches.popleft()
+
+    def _coalesce(self, batch):
+        """Merge new open events into queued repeats; returns (unmerged events, merged count)."""
+        queued = {}
+        for events in self._batches:
+            for event in events:
+                if event.get("event_type", "open") == "open":
+                    queued.setdefault(coalesce_key(event), event)
+        rest, merged = [], 0
+        for event in batch:
+            target = queued.get(coalesce_key(event)) if event.get("event_type", "open") == "open" else None
+            if target is None:
+                rest.append(event)
+            else:
+                merge_into(target, event)
+                merged += 1
+        self.coalesced += merged
+        return rest, merged
+
+    # -- consumer side --------------------------------------------------
+
+    def get(self, block=True, timeout=None):
+        """Remove and return the oldest batch (raises Empty)."""
+        with self._lock:
+            if not block:
+                if not self._batches:
+                    raise Empty
+            elif not self._not_empty.wait_for(lambda: self._batches, timeout):
+                raise Empty
+            batch = self._batches.popleft()
+            self._events -= len(batch)
+            self._not_full.notify_all()
+            return batch
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def get_batch(self, max_events, timeout=None):
+        """Remove whole batches up to `max_events` events (at least one batch; raises Empty)."""
+        events = list(self.get(timeout=timeout))
+        with self._lock:
+            while self._batches and len(events) + len(self._batches[0]) <= max_events:
+                batch = self._batches.popleft()
+                self._events -= len(batch)
+                events.extend(batch)
+            self._not_full.notify_all()
+        return events
+
+    # -- state ----------------------------------------------------------
+
+    def qsize(self):
+        """Number of queued batches."""
+        return len(self._batches)
+
+    def __len__(self):
+        """Number of queued events."""
+        return self._events
+
+    def empty(self):
+        return not self._batches
+
+    def full(self):
+        return self._events >= self.max_events
+
+    def stats(self, top=5):
+        """Get queue fill and shed counters (top shed processes only)."""
+        with self._lock:
+            return {
+                'queue_policy': self.policy,
+                'queue_events': self._events,
+                'queue_max_events': self.max_events,
+                'queue_accepted': self.accepted,
+                'queue_coalesced': self.coalesced,
+                'queue_refused': self.refused,
+                'queue_shed': sum(self.shed_by_reason.values()),
+                'queue_shed_open': self.shed_open,
+                'queue_shed_by_reason': dict(self.shed_by_reason),
+                'queue_shed_by_process': dict(self.shed_by_process.most_common(top)),
+            }
+
+    def summary(self):
+        """One-line fill/shed summary for the status log."""
+        stats = self.stats(top=3)
+        text = f"queue {stats['queue_events']}/{stats['queue_max_events']} events ({self.policy})"
+        if stats['queue_coalesced']:
+            text += f", coalesced {stats['queue_coalesced']}"
+        if stats['queue_refused']:
+            text += f", refused {stats['queue_refused']}"
+        if stats['queue_shed']:
+            reasons = ", ".join(f"{r}={n}" for r, n in stats['queue_shed_by_reason'].items())
+            processes = ", ".join(f"{p}={n}" for p, n in stats['queue_shed_by_process'].items())
+            text += (f", shed {stats['queue_shed']} ({stats['queue_shed_open']} opens lost; "
+                     f"{reasons}; top: {processes})")
+        return text
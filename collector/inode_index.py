@@ -0,0 +1,225 @@
+"""
+Socket Inode Index - Incremental socket inode to process mapping for Linux
+Rescans /proc/<pid>/fd only for processes that are new or whose fd table changed
+"""
+
+import os
+import time
+
+
+def list_proc_pids(proc_root="/proc"):
+    """
+    List the processes in /proc with one scandir.
+
+    Returns:
+        dict: {pid: inode of /proc/<pid>}; the inode comes with the directory
+        entry (no stat) and is new for every process, so it exposes PID reuse
+    """
+    with os.scandir(proc_root) as entries:
+        return {int(entry.name): entry.inode() for entry in entries if entry.name.isdigit()}
+
+
+class SocketInodeIndex:
+    """
+    Maps socket inodes to (pid, create_time).
+
+    refresh() lists /proc once, drops PIDs that exited (or were reused,
+    detected by a changed start time) and re-reads the fd links only of
+    processes that are new or whose fd directory signature changed. The
+    signature is the inode of /proc/<pid>/fd (new for every process, which
+    also exposes PID reuse) plus the fd count Linux 6.2+ reports as its
+    size. Whether the kernel does is checked once, on /proc/self/fd; if it
+    does not, the signature counts the directory entries instead, which
+    costs one listdir per process per refresh.
+
+    `pid_source`, if given, is a callable returning the PIDs to index
+    instead of every process in /proc. `pid_filter`, if given, keeps /proc
+    listed but indexes only PIDs it accepts, so the listing (list_pids())
+    can be shared with others (both used by scoped collection).
+    """
+
+    def __init__(self, proc_root="/proc", full_rescan_interval=5.0, pid_source=None, pid_filter=None):
+        self.proc_root = proc_root
+        self.pid_source = pid_source
+        self.pid_filter = pid_filter
+        self.full_rescan_interval = full_rescan_interval
+        self._owners = {}  # {socket_inode: (pid, create_time)}
+        self._procs = {}   # {pid: [create_time, fd_signature, socket_inodes]}
+        self._generation = None
+        self._listed = {}
+        self._listed_generation = None
+        self._last_full_rescan = 0.0
+        self._clock_ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self._boot_time = self._read_boot_time()
+        self._fd_dir_sized = self._kernel_reports_fd_count()
+
+        # Monitoring counters
+        self.refreshes = 0
+        self.processes_scanned = 0
+        self.processes_dropped = 0
+
+    def __len__(self):
+        return len(self._owners)
+
+    def resolve(self, inode, generation=None):
+        """
+        Look up the owner of a socket inode.
+
+        On a miss the index is refreshed, at most once per generation
+        (e.g. once per collector scan).
+
+        Returns:
+            tuple: (pid, create_time), or None if the owner is unknown
+        """
+        owner = self._owners.get(inode)
+        if owner is not None or (generation is not None and generation == self._generation):
+            return owner
+
+        self._generation = generation
+        self.refresh(generation=generation)
+        owner = self._owners.get(inode)
+        if owner is None and time.time() - self._last_full_rescan >= self.full_rescan_interval:
+            # A process may have swapped one socket for another without
+            # changing its fd count - re-read everything, but rarely
+            self.refresh(full=True, generation=generation)
+            owner = self._owners.get(inode)
+        return owner
+
+    def list_pids(self, generation=None):
+        """
+        Get the live PIDs, listing /proc (or asking pid_source) at most once per generation.
+
+        Returns:
+            dict: {pid: inode of /proc/<pid>} (see list_proc_pids); the
+            inodes are None for PIDs from pid_source
+
+        Raises:
+            OSError: if /proc cannot be listed
+        """
+        if generation is None or generation != self._listed_generation:
+            if self.pid_source is not None:
+                self._listed = dict.fromkeys(self.pid_source())
+            else:
+                self._listed = list_proc_pids(self.proc_root)
+            self._listed_generation = generation
+        return self._listed
+
+    def refresh(self, full=False, generation=None):
+        """Bring the index up to date with the processes in /proc."""
+        self.refreshes += 1
+        if full:
+            self._last_full_rescan = time.time()
+        try:
+            live = self.list_pids(generation)
+        except OSError:
+            return
+        if self.pid_filter is not None:
+            live = {pid for pid in live if self.pid_filter(pid)}
+
+        for pid in [pid for pid in self._procs if pid not in live]:
+            self._drop(pid)
+
+        for pid in live:
+            fd_dir = f"{self.proc_root}/{pid}/fd"
+            entry = self._procs.get(pid)
+            signature = self._fd_signature(fd_dir)
+            if signature is None:
+                if entry is not None:
+                    self._drop(pid)
+                continue
+
+            if entry is not None and not full and entry[1] == signature:
+                continue
+
+            create_time = self._create_time(pid)
+            if create_time is None:
+                continue
+            if entry is not None and entry[0] != create_time:
+                # PID was reused by a new process
+                self._drop(pid)
+            self._scan_process(pid, create_time, signature, fd_dir)
+
+    def _scan_process(self, pid, create_time, signature, fd_dir):
+        """Re-read a process's fd links and update its socket inodes."""
+        self.processes_scanned += 1
+        inodes = set()
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            self._drop(pid)
+            return
+        for fd in fds:
+            try:
+                target = os.readlink(f"{fd_dir}/{fd}")
+            except OSError:
+                continue
+            if target.startswith("socket:["):
+                inodes.add(int(target[8:-1]))
+
+        entry = self._procs.get(pid)
+        if entry is not None:
+            for inode in entry[2] - inodes:
+                if self._owners.get(inode, (None,))[0] == pid:
+                    del self._owners[inode]
+
+        owner = (pid, create_time)
+        for inode in inodes:
+            self._owners[inode] = owner
+        self._procs[pid] = [create_time, signature, inodes]
+
+    def _drop(self, pid):
+        """Forget a process and the sockets it owned."""
+        entry = self._procs.pop(pid, None)
+        if entry is None:
+            return
+        self.processes_dropped += 1
+        for inode in entry[2]:
+            if self._owners.get(inode, (None,))[0] == pid:
+                del self._owners[inode]
+
+    def _fd_signature(self, fd_dir):
+        """Cheap change detector for a process's fd table."""
+        try:
+            st = os.stat(fd_dir)
+            if self._fd_dir_sized:
+                return st.st_ino, st.st_size
+            return st.st_ino, len(os.listdir(fd_dir))
+        except OSError:
+            return None
+
+    def _kernel_reports_fd_count(self):
+        """Whether fd directories report their fd count as size (our own always has fds open)."""
+        try:
+            return os.stat(f"{self.proc_root}/self/fd").st_size > 0
+        except OSError:
+            return False
+
+    def _create_time(self, pid):
+        """Process start time in epoch seconds (same value psutil reports)."""
+        try:
+            with open(f"{self.proc_root}/{pid}/stat", "rb") as f:
+                stat = f.read()
+            start_ticks = int(stat[stat.rindex(b")") + 2:].split()[19])
+            return self._boot_time + start_ticks / self._clock_ticks
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def _read_boot_time(self):
+        try:
+            with open(f"{self.proc_root}/stat", "rb") as f:
+                for line in f:
+                    if line.startswith(b"btime"):
+                        return float(line.split()[1])
+        except OSError:
+            pass
+        return 0.0
+
+    def stats(self):
+        """Get index counters for monitoring."""
+        return {
+            'sockets': len(self._owners),
+            'processes': len(self._procs),
+            'refreshes': self.refreshes,
+            'processes_scanned': self.processes_scanned,
+            'processes_dropped': self.processes_dropped,
+        }
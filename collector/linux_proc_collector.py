@@ -0,0 +1,133 @@
+"""
+Linux /proc/net Collector
+Detects outbound TCP connections by reading /proc/net/tcp and /proc/net/tcp6 directly
+"""
+
+import re
+import socket
+import struct
+
+from collector.inode_index import SocketInodeIndex
+from collector.traffic_sampler import TrafficSampler
+from collector.windows_net_collector import WindowsNetCollector
+from core.ip_classifier import is_local_address, v4_to_int
+
+# Socket tables, relative to the collector's proc_root
+PROC_NET_TCP = "net/tcp"
+PROC_NET_TCP6 = "net/tcp6"
+
+# Kernel TCP states worth reporting: 01 = ESTABLISHED, 02 = SYN_SENT.
+# The state filter is part of the pattern, so other sockets (LISTEN,
+# TIME_WAIT, ...) are skipped by the regex engine without creating objects.
+_TCP4_LINE = re.compile(
+    rb"^\s*\d+: ([0-9A-F]{8}):([0-9A-F]{4}) ([0-9A-F]{8}):([0-9A-F]{4}) 0[12] "
+    rb"(?:\S+\s+){5}(\d+)",
+    re.MULTILINE,
+)
+_TCP6_LINE = re.compile(
+    rb"^\s*\d+: ([0-9A-F]{32}):([0-9A-F]{4}) ([0-9A-F]{32}):([0-9A-F]{4}) 0[12] "
+    rb"(?:\S+\s+){5}(\d+)",
+    re.MULTILINE,
+)
+
+_V4_MAPPED_PREFIX = b"\x00" * 10 + b"\xff\xff"
+_WORD = struct.Struct("=I")
+
+
+def read_proc_table(path):
+    """Read a /proc/net table in one buffered read."""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return b""
+
+
+def parse_tcp4(data):
+    """
+    Yield outbound IPv4 connections from /proc/net/tcp contents.
+
+    Yields:
+        tuple: (inode, local_ip, local_port, remote_ip, remote_port)
+    """
+    for m in _TCP4_LINE.finditer(data):
+        # Addresses are printed as the raw __be32 in host byte order
+        remote = socket.ntohl(int(m.group(3), 16))
+        if is_local_address(v4_to_int(remote)):
+            continue
+        inode = int(m.group(5))
+        if not inode:
+            continue
+        local = socket.ntohl(int(m.group(1), 16))
+        yield (inode,
+               socket.inet_ntoa(struct.pack("!I", local)), int(m.group(2), 16),
+               socket.inet_ntoa(struct.pack("!I", remote)), int(m.group(4), 16))
+
+
+def parse_tcp6(data):
+    """
+    Yield outbound IPv6 connections from /proc/net/tcp6 contents.
+
+    IPv4-mapped peers are reported with their dotted IPv4 address.
+
+    Yields:
+        tuple: (inode, local_ip, local_port, remote_ip, remote_port)
+    """
+    for m in _TCP6_LINE.finditer(data):
+        remote = _hex_to_in6(m.group(3))
+        if is_local_address(int.from_bytes(remote, "big")):
+            continue
+        inode = int(m.group(5))
+        if not inode:
+            continue
+        yield (inode,
+               _in6_to_str(_hex_to_in6(m.group(1))), int(m.group(2), 16),
+               _in6_to_str(remote), int(m.group(4), 16))
+
+
+def _hex_to_in6(hex_addr):
+    """Convert a /proc/net/tcp6 address (four host-order words) to 16 bytes."""
+    return b"".join(_WORD.pack(int(hex_addr[i:i + 8], 16)) for i in range(0, 32, 8))
+
+
+def _in6_to_str(addr):
+    """Format 16 address bytes, unwrapping IPv4-mapped addresses."""
+    if addr.startswith(_V4_MAPPED_PREFIX):
+        return socket.inet_ntoa(addr[12:])
+    return socket.inet_ntop(socket.AF_INET6, addr)
+
+
+class LinuxProcNetCollector(WindowsNetCollector):
+    """
+    Linux collector backend reading the kernel socket tables directly.
+
+    psutil.net_connections() walks every process's fd table on each poll;
+    this backend reads /proc/net/tcp{,6} once per scan, so the cost tracks
+    the number of sockets. Sockets are keyed by inode and the owning PID is
+    only looked up for connections that are new.
+    """
+
+    name = "proc"
+
+    def __init__(self, event_queue, proc_root="/proc"):
+        super().__init__(event_queue)
+        self.proc_root = proc_root
+        self.inode_index = SocketInodeIndex(proc_root)
+        self.traffic = TrafficSampler(proc_root)
+        self._tcp4_path = f"{proc_root}/{PROC_NET_TCP}"
+        self._tcp6_path = f"{proc_root}/{PROC_NET_TCP6}"
+
+    def _snapshot(self):
+        """Yield outbound connections from <proc_root>/net/tcp and net/tcp6."""
+        yield from parse_tcp4(read_proc_table(self._tcp4_path))
+        yield from parse_tcp6(read_proc_table(self._tcp6_path))
+
+    def _resolve_pid(self, inode):
+        """Map a socket inode to its owning PID."""
+        # Refreshes the index at most once per scan; sockets of exited processes stay unresolved
+        owner = self.inode_index.resolve(inode, generation=self.scan_count)
+        return owner[0] if owner else None
+
+    def get_inode_index_stats(self):
+        """Get socket inode index counters."""
+        return self.inode_index.stats()
@@ -0,0 +1,91 @@
+"""
+Adaptive Poll Scheduler - Chooses the collector's scan interval
+Polls faster while the socket table churns and backs off while it is quiet
+"""
+
+import time
+
+
+class AdaptivePollScheduler:
+    """
+    Deadline-based scan scheduler with a churn-driven interval.
+
+    After every scan the caller reports when the scan started, when it
+    finished and how many connections appeared or disappeared. Heavy churn
+    halves the interval (short-lived connections are being missed), a
+    quiet table grows it by `backoff`, and moderate churn drifts it back
+    towards the configured base interval. The returned delay is measured
+    from the scan's start, so scan time is absorbed and scans never
+    overlap; a scan that overruns its slot starts the next one immediately.
+    """
+
+    def __init__(self, base_interval=0.5, min_interval=0.1, max_interval=2.0,
+                 high_churn=10, backoff=1.25):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.base_interval = self._clamp(base_interval)
+        self.high_churn = high_churn
+        self.backoff = backoff
+        self.interval = self.base_interval
+
+        # Metrics
+        self.last_scan_duration = 0.0
+        self.avg_scan_duration = 0.0
+        self.max_scan_duration = 0.0
+        self.last_churn = 0
+        self.overruns = 0
+
+    @classmethod
+    def from_config(cls, config):
+        """Create a scheduler from MONITORING_CONFIG-style settings."""
+        base = config.get('poll_interval', 0.5)
+        return cls(
+            base_interval=base,
+            min_interval=config.get('poll_interval_min', base),
+            max_interval=config.get('poll_interval_max', base),
+            high_churn=config.get('poll_high_churn', 10),
+        )
+
+    def _clamp(self, interval):
+        """Limit an interval to [min_interval, max_interval]."""
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def next_delay(self, scan_started, scan_finished, churn):
+        """
+        Update the interval after a scan and return how long to sleep.
+
+        Args:
+            scan_started: time.monotonic() when the scan began
+            scan_finished: time.monotonic() when the scan ended
+            churn: connections opened + closed during the scan
+        """
+        duration = scan_finished - scan_started
+        self.last_scan_duration = duration
+        self.max_scan_duration = max(self.max_scan_duration, duration)
+        self.avg_scan_duration = (self.avg_scan_duration * 0.9) + (duration * 0.1)
+        self.last_churn = churn
+
+        if churn >= self.high_churn:
+            interval = self.interval * 0.5
+        elif churn == 0:
+            interval = self.interval * self.backoff
+        else:
+            interval = (self.interval + self.base_interval) / 2
+        self.interval = self._clamp(interval)
+
+        delay = scan_started + self.interval - time.monotonic()
+        if delay <= 0:
+            self.overruns += 1
+            return 0.0
+        return delay
+
+    def metrics(self):
+        """Get scheduler metrics."""
+        return {
+            'poll_interval': self.interval,
+            'last_scan_ms': self.last_scan_duration * 1000,
+            'avg_scan_ms': self.avg_scan_duration * 1000,
+            'max_scan_ms': self.max_scan_duration * 1000,
+            'last_churn': self.last_churn,
+            'overruns': self.overruns,
+        }
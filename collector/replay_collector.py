@@ -0,0 +1,231 @@
+"""
+Replay Collector
+Feeds recorded events from CSV exports or the SQLite events table into the pipeline
+"""
+
+import csv
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from queue import Full
+
+from collector.base_collector import BaseCollector
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# CSV header -> event key, covering utils.py and activity_store.py exports
+_CSV_COLUMNS = {
+    'Timestamp': 'timestamp',
+    'Process': 'process',
+    'PID': 'pid',
+    'Destination IP': 'dest_ip',
+    'Dest IP': 'dest_ip',
+    'Port': 'dest_port',
+    'Protocol': 'protocol',
+    'Count': 'count',
+    'First Seen': 'first_seen',
+}
+
+
+def load_csv_events(path):
+    """Load events from a UBNAD CSV export."""
+    events = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            event = {key: row[column] for column, key in _CSV_COLUMNS.items() if row.get(column)}
+            if 'dest_ip' not in event or 'timestamp' not in event:
+                continue
+            event['pid'] = int(event['pid']) if event.get('pid', '').isdigit() else None
+            event['dest_port'] = int(event.get('dest_port') or 0)
+            event.setdefault('process', 'Unknown')
+            _coalesced(event, int(event['count']) if event.get('count', '').isdigit() else 1)
+            events.append(event)
+    return events
+
+
+def _coalesced(event, count):
+    """Keep a recorded aggregate's count (its timestamp is last_seen)."""
+    if count > 1:
+        event['count'] = count
+        event.setdefault('first_seen', event['timestamp'])
+        event['last_seen'] = event['timestamp']
+    else:
+        event.pop('count', None)
+        event.pop('first_seen', None)
+
+
+def load_db_events(path):
+    """Load events from the SQLite events table (aggregated rows keep their count)."""
+    conn = sqlite3.connect(str(path))
+    conn.row_factory = sqlite3.Row
+    try:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+        coalesced = ", count, first_seen" if 'count' in columns else ""
+        rows = conn.execute(f"""
+        SELECT timestamp, pid, process_name, dest_ip, dest_port, protocol{coalesced}
+        FROM events
+        ORDER BY timestamp ASC, id ASC
+        """).fetchall()
+    finally:
+        conn.close()
+    events = []
+    for row in rows:
+        event = {
+            'timestamp': row['timestamp'],
+            'pid': row['pid'],
+            'process': row['process_name'],
+            'dest_ip': row['dest_ip'],
+            'dest_port': row['dest_port'],
+            'protocol': row['protocol'] or 'TCP',
+        }
+        if coalesced:
+            if row['first_seen']:
+                event['first_seen'] = row['first_seen']
+            _coalesced(event, row['count'] or 1)
+        events.append(event)
+    return events
+
+
+def load_events(sources):
+    """Load and time-order events from one or more CSV / SQLite files."""
+    if isinstance(sources, (str, Path)):
+        sources = [sources]
+    events = []
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            for csv_path in sorted(path.glob('ubnad_events_*.csv')):
+                events.extend(load_csv_events(csv_path))
+        elif path.suffix.lower() == '.csv':
+            events.extend(load_csv_events(path))
+        else:
+            events.extend(load_db_events(path))
+    # Exports are newest-first; replay oldest-first (stable for equal timestamps)
+    events.sort(key=lambda e: e['timestamp'])
+    return events
+
+
+class ReplayCollector(BaseCollector):
+    """
+    Collector backend replaying recorded events.
+
+    With speed=0 events are published as fast as the analyzer accepts
+    them, in batches of `batch_size`; otherwise the recorded gaps between
+    events are reproduced divided by `speed` (2.0 = twice as fast).
+    Timestamps are rebased onto the replay clock so the engine's sliding
+    windows see the recorded spacing; the original value is kept in
+    `recorded_timestamp`. Recorded aggregates (coalesced rows) replay as
+    one event with their count, first_seen and last_seen. Replay waits
+    for queue space rather than dropping events; only a shedding queue
+    policy (anything but block) can drop some, counted in dropped_events.
+    """
+
+    name = "replay"
+
+    def __init__(self, event_queue, sources, speed=0.0, batch_size=500, loop=False):
+        super().__init__(event_queue)
+        self.sources = sources
+        self.speed = speed
+        self.batch_size = batch_size
+        self.loop = loop
+        self.events = self._load_events(sources)
+        first_ts = _parse_ts(self.events[0]['timestamp']) if self.events else 0.0
+        self._offsets = [_parse_ts(e['timestamp']) - first_ts for e in self.events]
+        self.started_at = None
+        self.finished_at = None
+
+    def _load_events(self, sources):
+        """Load the time-ordered events to replay."""
+        return load_events(sources)
+
+    def start(self):
+        """Start replaying in background thread."""
+        if not self.events:
+            print(f"[Collector] Replay source has no events: {self.sources}")
+            return False
+        super().start()
+        pace = "max speed" if not self.speed else f"{self.speed}x"
+        print(f"[Collector] Started - replaying {len(self.events)} events at {pace}")
+        return True
+
+    def _run(self):
+        self.started_at = time.monotonic()
+        while self.running:
+            self._replay_once()
+            if not self.loop:
+                break
+        self.finished_at = time.monotonic()
+        self.running = False
+        print(f"[Collector] Replay finished: {self.event_count} events in "
+              f"{self.finished_at - self.started_at:.2f}s")
+
+    def _replay_once(self):
+        replay_start = time.time()
+        batch = []
+        batch_offset = None
+        timestamp_str = None
+
+        for event, offset in zip(self.events, self._offsets):
+            if not self.running:
+                return
+            if self.speed:
+                offset /= self.speed
+                if batch and offset != batch_offset:
+                    self._publish_blocking(batch)
+                    batch = []
+                delay = replay_start + offset - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+            if offset != batch_offset or timestamp_str is None:
+                timestamp_str = datetime.fromtimestamp(replay_start + offset).strftime(TIMESTAMP_FORMAT)
+            batch_offset = offset
+
+            replayed = dict(event)
+            replayed['recorded_timestamp'] = event['timestamp']
+            replayed['timestamp'] = timestamp_str
+            if 'count' in event:
+                # Keep the aggregate's recorded span on the replay clock
+                span = _parse_ts(event['timestamp']) - _parse_ts(event['first_seen'])
+                first_seen = replay_start + offset - (span / self.speed if self.speed else span)
+                replayed['first_seen'] = datetime.fromtimestamp(first_seen).strftime(TIMESTAMP_FORMAT)
+                replayed['last_seen'] = timestamp_str
+            batch.append(replayed)
+            if len(batch) >= self.batch_size:
+                self._publish_blocking(batch)
+                batch = []
+
+        if batch:
+            self._publish_blocking(batch)
+
+    def _publish_blocking(self, batch):
+        """Publish a batch, waiting for queue space as long as we are running."""
+        self.scan_count += 1
+        while self.running:
+            try:
+                accepted = self.event_queue.put(batch, timeout=self.publish_timeout)
+            except Full:
+                continue
+            # queue.Queue returns None; an EventQueue reports what its policy kept
+            if accepted is None:
+                accepted = len(batch)
+            self.event_count += accepted
+            self.dropped_events += len(batch) - accepted
+            return
+
+    def get_metrics(self):
+        """Get replay metrics including achieved events/second."""
+        metrics = super().get_metrics()
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.monotonic()) - self.started_at
+            metrics['elapsed_secs'] = elapsed
+            metrics['events_per_sec'] = self.event_count / elapsed if elapsed > 0 else 0.0
+        metrics['finished'] = self.finished_at is not None
+        return metrics
+
+
+def _parse_ts(timestamp):
+    try:
+        return datetime.strptime(timestamp, TIMESTAMP_FORMAT).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
@@ -0,0 +1,207 @@
+"""
+Scope Membership - Incremental PID membership for watched cgroups and network namespaces
+Lets a collector work on the sockets of selected workloads instead of the whole host
+"""
+
+import os
+
+from collector.inode_index import list_proc_pids
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+class ScopeMembership:
+    """
+    Set of PIDs belonging to watched cgroups and/or network namespaces.
+
+    cgroups are given as paths relative to the cgroup root (as printed in
+    /proc/<pid>/cgroup, e.g. "/system.slice/docker-abc.scope") or as
+    absolute directories; on v1 hosts the first controller hierarchy
+    containing the path is used. Members are read from the cgroup.procs
+    files of the watched subtrees, so a refresh costs one small read per
+    watched cgroup. Network namespaces are given as nsfs paths
+    (/var/run/netns/<name> or /proc/<pid>/ns/net); /proc is listed once per
+    refresh, and the ns/net link is only stat'ed for PIDs that are new or
+    whose /proc/<pid> inode changed (a reused PID), so a steady host costs
+    no per-process system calls. The listing comes from `pid_source` (a
+    callable returning {pid: /proc/<pid> inode} like list_proc_pids(),
+    e.g. the collector's inode index, so /proc is listed once per scan)
+    or from listing /proc here. A None inode means unknown and is re-read.
+
+    Every member maps to its cgroup label, and the namespaces of the
+    members are tracked with one reader PID each, whose /proc/<pid>/net
+    tables show that namespace's sockets.
+    """
+
+    def __init__(self, cgroups=(), netns=(), proc_root="/proc", cgroup_root=CGROUP_ROOT, pid_source=None):
+        self.proc_root = proc_root
+        self.cgroup_root = cgroup_root
+        self.pid_source = pid_source
+        self.cgroups = []  # [(label, directory)]
+        self.missing = []
+        for path in cgroups:
+            directory = self._resolve_cgroup(path)
+            if directory is None:
+                self.missing.append(path)
+            else:
+                if path.startswith(cgroup_root):
+                    path = os.path.relpath(path, cgroup_root)
+                self.cgroups.append(('/' + path.strip('/'), directory))
+        self.netns = set()
+        for path in netns:
+            try:
+                self.netns.add(os.stat(path).st_ino)
+            except OSError:
+                self.missing.append(path)
+
+        self.members = {}      # {pid: cgroup_label}
+        self.namespaces = {}   # {netns_inode: reader_pid}
+        self._pid_netns = {}   # {pid: netns_inode} as of the last refresh
+        self._proc_inodes = {}  # {pid: /proc/<pid> inode} the netns inode was read for
+
+        # Monitoring counters
+        self.refreshes = 0
+        self.added = 0
+        self.removed = 0
+        self.netns_reads = 0
+
+    @property
+    def configured(self):
+        """True if at least one cgroup or namespace could be resolved."""
+        return bool(self.cgroups or self.netns)
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, pid):
+        return pid in self.members
+
+    def refresh(self):
+        """
+        Re-read membership and update the member set in place.
+
+        Returns:
+            tuple: (added_pids, removed_pids)
+        """
+        self.refreshes += 1
+        current = {}
+        for label, directory in self.cgroups:
+            self._read_cgroup_tree(label, directory, current)
+        if self.netns:
+            self._read_netns_members(current)
+        else:
+            self._pid_netns = {pid: self._read_netns(pid) for pid in current}
+
+        members = self.members
+        removed = [pid for pid in members if pid not in current]
+        added = [pid for pid in current if pid not in members]
+        for pid in removed:
+            del members[pid]
+        for pid in added:
+            label = current[pid]
+            members[pid] = label if label is not None else self._read_cgroup_label(pid)
+        if self.cgroups:
+            # Processes moved between watched cgroups keep their membership
+            for pid, label in current.items():
+                if label is not None and members[pid] != label:
+                    members[pid] = label
+        self.added += len(added)
+        self.removed += len(removed)
+
+        # Cheap (members only) - keeps a reader per namespace whatever changed
+        self._update_namespaces()
+        return added, removed
+
+    def netns_of(self, pid):
+        """Network namespace inode of a member (None if unknown)."""
+        return self._pid_netns.get(pid)
+
+    def _read_cgroup_tree(self, label, directory, current):
+        """Collect the PIDs of a cgroup and its descendants."""
+        for dirpath, _, _ in os.walk(directory):
+            try:
+                with open(os.path.join(dirpath, "cgroup.procs"), "rb") as f:
+                    pids = f.read().split()
+            except OSError:
+                continue
+            sub = os.path.relpath(dirpath, directory)
+            sub_label = label if sub == '.' else f"{label.rstrip('/')}/{sub}"
+            for pid in pids:
+                current[int(pid)] = sub_label
+
+    def _read_netns_members(self, current):
+        """Collect PIDs living in a watched network namespace."""
+        try:
+            live = self.pid_source() if self.pid_source is not None else list_proc_pids(self.proc_root)
+        except OSError:
+            return
+        known, pid_netns = self._proc_inodes, self._pid_netns
+        netns = {}
+        for pid, proc_inode in live.items():
+            ino = pid_netns.get(pid)
+            if ino is None or proc_inode is None or known.get(pid) != proc_inode:
+                ino = self._read_netns(pid)
+            netns[pid] = ino
+        self._pid_netns = pid_netns = netns
+        self._proc_inodes = live
+        watched = self.netns
+        for pid, ino in pid_netns.items():
+            if ino in watched and pid not in current:
+                current[pid] = None
+
+    def _update_namespaces(self):
+        """Keep one live reader PID per member namespace."""
+        namespaces = {}
+        for pid in self.members:
+            ino = self._pid_netns.get(pid)
+            if ino is None:
+                ino = self._pid_netns[pid] = self._read_netns(pid)
+            if ino and ino not in namespaces:
+                previous = self.namespaces.get(ino)
+                namespaces[ino] = previous if previous in self.members else pid
+        self.namespaces = namespaces
+
+    def _read_netns(self, pid):
+        self.netns_reads += 1
+        try:
+            return os.stat(f"{self.proc_root}/{pid}/ns/net").st_ino
+        except OSError:
+            return 0
+
+    def _read_cgroup_label(self, pid):
+        """cgroup path of a PID from /proc/<pid>/cgroup (unified hierarchy preferred)."""
+        try:
+            with open(f"{self.proc_root}/{pid}/cgroup", "r") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return None
+        for line in lines:
+            if line.startswith("0::"):
+                return line[3:]
+        return lines[0].split(":", 2)[2] if lines else None
+
+    def _resolve_cgroup(self, path):
+        """Find the cgroup directory for a configured path."""
+        candidates = [path] if os.path.isabs(path) else []
+        relative = path.strip('/')
+        candidates.append(os.path.join(self.cgroup_root, relative))
+        try:
+            controllers = sorted(os.listdir(self.cgroup_root))
+        except OSError:
+            controllers = []
+        candidates.extend(os.path.join(self.cgroup_root, c, relative) for c in controllers)
+        for candidate in candidates:
+            if os.path.isfile(os.path.join(candidate, "cgroup.procs")):
+                return candidate
+        return None
+
+    def stats(self):
+        """Get membership counters for monitoring."""
+        return {
+            'scope_members': len(self.members),
+            'scope_namespaces': len(self.namespaces),
+            'scope_refreshes': self.refreshes,
+            'scope_added': self.added,
+            'scope_removed': self.removed,
+            'scope_netns_reads': self.netns_reads,
+        }
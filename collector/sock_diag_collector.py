@@ -0,0 +1,180 @@
+"""
+Linux sock_diag Collector
+Detects outbound TCP connections with NETLINK_SOCK_DIAG (INET_DIAG) socket dumps
+"""
+
+import ipaddress
+import os
+import socket
+import struct
+
+from collector.linux_proc_collector import LinuxProcNetCollector, _in6_to_str
+from core.ip_classifier import LOCAL_CLASSIFIER
+
+NETLINK_SOCK_DIAG = 4
+SOCK_DIAG_BY_FAMILY = 20
+
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+
+INET_DIAG_REQ_BYTECODE = 1
+INET_DIAG_BC_JMP = 1
+INET_DIAG_BC_D_COND = 8
+
+TCP_ESTABLISHED = 1
+TCP_SYN_SENT = 2
+
+_NLMSGHDR = struct.Struct("=IHHII")
+_NLATTR = struct.Struct("=HH")
+_REQ_V2 = struct.Struct("=BBBxI48x")  # inet_diag_req_v2 with a wildcard sockid
+_BC_OP = struct.Struct("=BBH")
+_HOSTCOND = struct.Struct("=BBxxi")
+_DIAG_MSG = struct.Struct("=BBBBHH16s16sIQIIIII")  # inet_diag_msg
+_NLMSG_ERR = struct.Struct("=i")
+
+
+def local_dest_prefixes(classifier=LOCAL_CLASSIFIER):
+    """Destinations to reject in the kernel, as (family, packed network, prefix length)."""
+    prefixes = []
+    for cidr, _ in classifier.networks():
+        net = ipaddress.ip_network(cidr)
+        family = socket.AF_INET if net.version == 4 else socket.AF_INET6
+        prefixes.append((family, net.network_address.packed, net.prefixlen))
+    return prefixes
+
+
+def build_dest_filter(prefixes=None):
+    """
+    Compile an INET_DIAG bytecode program rejecting sockets whose destination
+    falls inside any of the given prefixes.
+
+    Each prefix becomes "D_COND(prefix) -> JMP reject", the same shape
+    `ss` emits for a negated condition. IPv4 conditions also match
+    IPv4-mapped peers of AF_INET6 sockets.
+    """
+    blocks = []
+    for family, addr, prefix_len in prefixes or local_dest_prefixes():
+        cond = _HOSTCOND.pack(family, prefix_len, -1) + addr
+        blocks.append(cond)
+
+    total = sum(_BC_OP.size + len(cond) + _BC_OP.size for cond in blocks)
+    program = bytearray()
+    for cond in blocks:
+        cond_len = _BC_OP.size + len(cond)
+        # Match -> fall into the JMP; no match -> skip over it to the next block
+        program += _BC_OP.pack(INET_DIAG_BC_D_COND, cond_len, cond_len + _BC_OP.size) + cond
+        # JMP always takes "no": jump 4 bytes past the end, which rejects
+        remaining = total - len(program)
+        program += _BC_OP.pack(INET_DIAG_BC_JMP, _BC_OP.size, remaining + 4)
+    return bytes(program)
+
+
+def build_dump_request(family, states, bytecode=b"", seq=1):
+    """Build a SOCK_DIAG_BY_FAMILY dump request for TCP sockets."""
+    body = _REQ_V2.pack(family, socket.IPPROTO_TCP, 0, states)
+    if bytecode:
+        attr_len = _NLATTR.size + len(bytecode)
+        body += _NLATTR.pack(attr_len, INET_DIAG_REQ_BYTECODE) + bytecode
+        body += b"\0" * (-attr_len % 4)
+    header = _NLMSGHDR.pack(_NLMSGHDR.size + len(body), SOCK_DIAG_BY_FAMILY,
+                            NLM_F_REQUEST | NLM_F_DUMP, seq, 0)
+    return header + body
+
+
+def parse_dump(buf, nbytes):
+    """
+    Parse one recv() worth of netlink messages.
+
+    Returns:
+        tuple: (records, done) where records are
+        (inode, family, src, sport, dst, dport) with raw 16-byte addresses
+    """
+    view = memoryview(buf)[:nbytes]
+    records = []
+    offset = 0
+    while offset + _NLMSGHDR.size <= nbytes:
+        msg_len, msg_type, _, _, _ = _NLMSGHDR.unpack_from(view, offset)
+        if msg_len < _NLMSGHDR.size:
+            break
+        if msg_type == NLMSG_DONE:
+            return records, True
+        if msg_type == NLMSG_ERROR:
+            (err,) = _NLMSG_ERR.unpack_from(view, offset + _NLMSGHDR.size)
+            if err:
+                raise OSError(-err, os.strerror(-err))
+            return records, True
+        if msg_type == SOCK_DIAG_BY_FAMILY:
+            (family, _, _, _, sport, dport, src, dst,
+             _, _, _, _, _, _, inode) = _DIAG_MSG.unpack_from(view, offset + _NLMSGHDR.size)
+            records.append((inode, family, src, socket.ntohs(sport), dst, socket.ntohs(dport)))
+        offset += (msg_len + 3) & ~3
+    return records, False
+
+
+class SockDiagCollector(LinuxProcNetCollector):
+    """
+    Linux collector backend using netlink socket dumps.
+
+    The kernel applies both the state filter (ESTABLISHED/SYN_SENT) and
+    the local/private destination filter, so only candidate sockets cross
+    into user space. Replies are decoded with struct over a reused buffer.
+    """
+
+    name = "sock_diag"
+    RECV_BUFFER = 256 * 1024
+
+    def __init__(self, event_queue, proc_root="/proc"):
+        super().__init__(event_queue, proc_root=proc_root)
+        self.states = (1 << TCP_ESTABLISHED) | (1 << TCP_SYN_SENT)
+        self._bytecode = build_dest_filter()
+        self._buffer = bytearray(self.RECV_BUFFER)
+        self._sock = None
+        self._seq = 0
+
+    def _snapshot(self):
+        """Yield outbound connections from kernel socket dumps."""
+        for family in (socket.AF_INET, socket.AF_INET6):
+            for inode, fam, src, sport, dst, dport in self._dump(family):
+                if not inode:
+                    continue
+                if fam == socket.AF_INET:
+                    yield (inode, socket.inet_ntoa(src[:4]), sport,
+                           socket.inet_ntoa(dst[:4]), dport)
+                else:
+                    yield inode, _in6_to_str(src), sport, _in6_to_str(dst), dport
+
+    def _dump(self, family):
+        """Run one filtered dump for an address family."""
+        sock = self._get_socket()
+        self._seq += 1
+        try:
+            sock.send(build_dump_request(family, self.states, self._bytecode, self._seq))
+            records = []
+            done = False
+            while not done:
+                nbytes = sock.recv_into(self._buffer)
+                batch, done = parse_dump(self._buffer, nbytes)
+                records.extend(batch)
+            return records
+        except OSError:
+            # Drop the socket so the next scan starts from a clean stream
+            self._close_socket()
+            raise
+
+    def _get_socket(self):
+        """Open the netlink socket on first use."""
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_SOCK_DIAG)
+        return self._sock
+
+    def _close_socket(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def stop(self):
+        """Stop the collector and release the netlink socket."""
+        super().stop()
+        self._close_socket()
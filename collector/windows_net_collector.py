@@ -4,136 +4,219 @@ Detects outbound TCP connections via socket polling and process mapping
 """
 
 import psutil
-import threading
 import time
 from datetime import datetime
 
-class WindowsNetCollector:
-    def __init__(self, event_queue):
-        """Initialize Windows network collector."""
-        self.event_queue = event_queue
-        self.running = False
-        self.known_connections = set()
-        self.poll_interval = 0.5  # Poll every 500ms
-        self.scan_count = 0
-        self.event_count = 0
-        self.last_status = None
+from collector.base_collector import BaseCollector
+from collector.connection_table import ConnectionTable, pack_connection_key
+from collector.coverage import CoverageMonitor
+from collector.poll_scheduler import AdaptivePollScheduler
+from collector.traffic_sampler import TrafficSampler
+from config import MONITORING_CONFIG
+from core.ip_classifier import is_local_address
+from core.process_table import ProcessTable, get_process_table
+
+class WindowsNetCollector(BaseCollector):
+    name = "psutil"
+    
+    def __init__(self, event_queue, provider=psutil):
+        """
+        Initialize Windows network collector.
+        
+        `provider` supplies net_connections(), process_iter() and Process() -
+        the psutil module by default, or a stand-in such as
+        simulators.synthetic_socket_table.SyntheticSocketTable.
+        """
+        super().__init__(event_queue)
+        self.provider = provider
+        self.known_connections = ConnectionTable(
+            max_entries=MONITORING_CONFIG.get('max_known_connections', 10000)
+        )
+        self.scheduler = AdaptivePollScheduler.from_config(MONITORING_CONFIG)
+        if provider is psutil:
+            self.processes = get_process_table()
+            self.traffic = TrafficSampler()
+            self.coverage = CoverageMonitor()
+        else:
+            self.processes = ProcessTable.from_config(MONITORING_CONFIG, process_api=provider)
+            self.traffic = TrafficSampler(process_api=provider)
+            self.coverage = CoverageMonitor(reader=getattr(provider, 'tcp_counters', dict))
         
     def start(self):
-        """Start the collector in background thread."""
+        """Record the connections already open, then start polling in background thread."""
+        # Connections open before monitoring are baseline, not new activity:
+        # they go out as one 'existing' batch before the first live scan
         self.running = True
         self.last_status = time.time()
-        thread = threading.Thread(target=self._poll_loop, daemon=True)
-        thread.start()
-        print("[Collector] Started - will scan every 0.5s")
+        self._scan_connections(event_type="existing")
+        existing = self.event_count
+        
+        super().start()
+        print(f"[Collector] Started - {existing} pre-existing connections recorded, "
+              f"will scan every {self.scheduler.min_interval}-{self.scheduler.max_interval}s (adaptive)")
         return True
     
-    def _poll_loop(self):
+    def _run(self):
         """Main polling loop - continuously detect new connections."""
+        table = self.known_connections
         while self.running:
+            started = time.monotonic()
+            changes_before = table.inserted + table.expired
             try:
                 self._scan_connections()
-                time.sleep(self.poll_interval)
             except Exception as e:
                 if self.running:
                     print(f"[Collector] Poll error: {e}")
-                time.sleep(0.5)
+            churn = table.inserted + table.expired - changes_before
+            time.sleep(self.scheduler.next_delay(started, time.monotonic(), churn))
     
-    def _scan_connections(self):
+    def _scan_connections(self, event_type="open"):
         """Scan for all TCP connections and detect new outbound ones."""
         try:
             self.scan_count += 1
-            connections = psutil.net_connections(kind='inet')
-            total_connections = len(connections)
-            new_events = 0
             
-            # Periodic status every 10 seconds (20 scans at 0.5s interval)
+            # Periodic status every 10 seconds
             now = time.time()
             if now - self.last_status >= 10:
+                table = self.known_connections.stats()
+                timing = self.scheduler.metrics()
                 print(f"[Collector] Status: {self.scan_count} scans, {self.event_count} events created, "
-                      f"tracking {len(self.known_connections)} known connections")
+                      f"{self.dropped_events} dropped, "
+                      f"tracking {table['size']} known connections "
+                      f"({table['expired']} expired, {table['overflow']} over capacity), "
+                      f"scan {timing['last_scan_ms']:.1f}ms, interval {timing['poll_interval']:.2f}s, "
+                      f"{self.coverage.summary()}")
                 self.last_status = now
             
-            for conn in connections:
-                # Skip if no remote address (not outbound)
-                if not conn.raddr:
-                    continue
-                
-                # Skip unwanted states
-                if conn.status in ('LISTEN', 'NONE', 'CLOSING', 'CLOSE_WAIT'):
-                    continue
-                
-                # Skip local/private destinations
-                if self._is_local_ip(conn.raddr.ip):
-                    continue
-                
+            # One timestamp and one queue hand-off per scan
+            timestamp_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            batch = []
+            new_keys = []
+            
+            self.known_connections.begin_scan()
+            for owner, local_ip, local_port, remote_ip, remote_port in self._snapshot():
                 # Create unique connection key
-                conn_key = (conn.pid, conn.laddr.ip, conn.laddr.port, conn.raddr.ip, conn.raddr.port)
+                conn_key = pack_connection_key(owner, local_ip, local_port, remote_ip, remote_port)
                 
-                # Only process if new
-                if conn_key in self.known_connections:
+                # Only process if new since the previous scan
+                if not self.known_connections.observe(conn_key):
                     continue
                 
-                # Mark as known
-                self.known_connections.add(conn_key)
-                
-                # Resolve process name
-                process_name = self._get_process_name(conn.pid)
+                # Resolve owning PID and process name
+                pid = self._resolve_pid(owner)
+                process_name = self._get_process_name(pid)
+                tags = self._event_tags(pid)
+                self.known_connections.set_info(conn_key, (pid, process_name, remote_ip, remote_port, tags))
+                self.traffic.track(pid)
+                new_keys.append(conn_key)
                 
-                # Create event with string timestamp
-                timestamp_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 event = {
+                    "event_type": event_type,
                     "timestamp": timestamp_str,
-                    "pid": conn.pid,
+                    "pid": pid,
                     "process": process_name,
-                    "dest_ip": conn.raddr.ip,
-                    "dest_port": conn.raddr.port
+                    "dest_ip": remote_ip,
+                    "dest_port": remote_port
                 }
-                
-                # Push to queue
-                try:
-                    self.event_queue.put(event, timeout=1.0)
-                    new_events += 1
-                    self.event_count += 1
-                    print(f"[Collector] NEW: {process_name} ({conn.pid}) -> {conn.raddr.ip}:{conn.raddr.port}")
-                except Exception as e:
-                    print(f"[Collector] Queue error: {e}")
+                if tags:
+                    event.update(tags)
+                batch.append(event)
+            
+            # Kernel open counters vs. what this scan caught
+            self.coverage.update(len(batch))
+            
+            # Connections missing from this snapshot have closed
+            if self.known_connections.end_scan():
+                for info, duration, polls_seen in self.known_connections.closed:
+                    if info is None:
+                        continue
+                    pid, process_name, remote_ip, remote_port, tags = info
+                    self.traffic.untrack(pid)
+                    event = {
+                        "event_type": "close",
+                        "timestamp": timestamp_str,
+                        "pid": pid,
+                        "process": process_name,
+                        "dest_ip": remote_ip,
+                        "dest_port": remote_port,
+                        "duration": duration,
+                        "polls_seen": polls_seen
+                    }
+                    if tags:
+                        event.update(tags)
+                    batch.append(event)
+            
+            # Byte counters of network-active PIDs, attributed once per PID
+            self.traffic.sample()
+            for event in batch:
+                event["bytes_recv"], event["bytes_sent"] = self.traffic.take(event["pid"])
+            
+            if batch and not self._publish(batch):
+                # Nothing was queued - report the still-open connections again next scan
+                for info in self.known_connections.forget(new_keys):
+                    self.traffic.untrack(info[0])
                     
         except Exception as e:
             if self.running:
                 print(f"[Collector] Scan error: {e}")
     
-    def _get_process_name(self, pid):
-        """Get process name from PID, handle errors gracefully."""
-        try:
-            proc = psutil.Process(pid)
-            return proc.name()
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.Error):
-            return f"PID_{pid}"
+    def _publish(self, batch):
+        """Hand a scan's events to the analyzer as a single queue item."""
+        # Never wait longer than one poll interval, so scans stay bounded
+        self.publish_timeout = self.scheduler.interval
+        return super()._publish(batch)
     
-    def _is_local_ip(self, ip):
-        """Check if IP is loopback or private."""
-        try:
-            # Loopback
-            if ip.startswith('127.') or ip == '::1':
-                return True
-            
-            # RFC 1918 private ranges
-            if ip.startswith('192.168.') or ip.startswith('10.') or ip.startswith('172.'):
-                return True
+    def _snapshot(self):
+        """
+        Yield outbound connections from the current socket table.
+        
+        Yields:
+            tuple: (owner, local_ip, local_port, remote_ip, remote_port), where
+            owner identifies the socket's process for _resolve_pid()
+        """
+        for conn in self.provider.net_connections(kind='inet'):
+            # Skip if no remote address (not outbound)
+            if not conn.raddr:
+                continue
             
-            # Link-local
-            if ip.startswith('169.254.'):
-                return True
+            # Skip unwanted states
+            if conn.status in ('LISTEN', 'NONE', 'CLOSING', 'CLOSE_WAIT'):
+                continue
             
-            # Localhost variants
-            if ip.lower() in ('localhost', '::'):
-                return True
+            # Skip local/private destinations
+            if self._is_local_ip(conn.raddr.ip):
+                continue
             
-            return False
-        except:
-            return True
+            yield conn.pid, conn.laddr.ip, conn.laddr.port, conn.raddr.ip, conn.raddr.port
+    
+    def _resolve_pid(self, owner):
+        """Map a snapshot owner to a PID (psutil already reports the PID)."""
+        return owner
+    
+    def _event_tags(self, pid):
+        """Extra fields to attach to a connection's events (None for none)."""
+        return None
+    
+    def _get_process_name(self, pid):
+        """Get process name from PID, handle errors gracefully."""
+        if pid is None:
+            return "Unknown"
+        # Shared snapshot cache - no per-connection Process() lookup
+        return self.processes.name(pid) or f"PID_{pid}"
+    
+    def _is_local_ip(self, ip):
+        """Check if IP is loopback, private, CGNAT, link-local or ULA."""
+        return is_local_address(ip)
+    
+    def get_connection_stats(self):
+        """Get connection table counters (size, expirations, evictions)."""
+        return self.known_connections.stats()
     
-    def stop(self):
-        """Stop the collector."""
-        self.running = False
+    def get_metrics(self):
+        """Get collector metrics: counts, scan duration, poll interval, process cache, traffic sampling and coverage."""
+        metrics = super().get_metrics()
+        metrics.update(self.scheduler.metrics())
+        metrics.update(self.processes.stats())
+        metrics.update(self.traffic.stats())
+        metrics.update(self.coverage.metrics())
+        return metrics
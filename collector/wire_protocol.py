@@ -0,0 +1,239 @@
+"""
+Wire Protocol - Compact binary framing of event batches between agents and the aggregator
+
+Every message is a frame: u32 payload length, u8 frame type, payload
+(network byte order throughout).
+
+HELLO payload:  b"UBNA", u8 version, UTF-8 hostname
+BATCH payload:  u32 event count, u16 string count,
+                strings as (u16 length, UTF-8 bytes),
+                one fixed-size EVENT record per event
+
+Strings (timestamps, process names, addresses, cgroups) are stored once
+per batch and referenced by index, so repeated values cost two bytes.
+Network namespaces travel as their inode number. Events coalesced by
+the agent's queue (see collector.event_queue) keep their count and
+first/last-seen times.
+"""
+
+import struct
+
+MAGIC = b"UBNA"
+VERSION = 3  # 2: netns inode in EVENT, 3: coalesced count and first/last seen
+DEFAULT_PORT = 9555
+
+FRAME_HELLO = 1
+FRAME_BATCH = 2
+
+FRAME_HEADER = struct.Struct("!IB")
+MAX_FRAME = 64 * 1024 * 1024
+MAX_BATCH_EVENTS = 16000  # keeps the string table below 65535 entries
+
+_U16 = struct.Struct("!H")
+_BATCH_HEADER = struct.Struct("!IH")
+# event_type, protocol, flags, pid (-1 = unknown), dest_port, timestamp/process/dest_ip/cgroup
+# string indexes, bytes_sent, bytes_recv, duration, polls_seen, netns inode,
+# count, first_seen/last_seen string indexes
+EVENT = struct.Struct("!BBBiHHHHHQQfIIIHH")
+
+EVENT_TYPES = ("open", "close", "existing")
+PROTOCOLS = ("TCP", "UDP")
+_EVENT_TYPE_CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+_PROTOCOL_CODES = {name: code for code, name in enumerate(PROTOCOLS)}
+
+HAS_BYTES = 0x01
+HAS_CLOSE = 0x02
+HAS_CGROUP = 0x04
+HAS_NETNS = 0x08
+HAS_COUNT = 0x10
+
+
+class ProtocolError(Exception):
+    """Raised for malformed or unexpected frames."""
+
+
+def encode_hello(hostname):
+    """Build the HELLO frame an agent sends after connecting."""
+    payload = MAGIC + bytes((VERSION,)) + hostname.encode("utf-8")
+    return FRAME_HEADER.pack(len(payload), FRAME_HELLO) + payload
+
+
+def decode_hello(payload):
+    """Get the agent hostname from a HELLO payload."""
+    if len(payload) < 5:
+        raise ProtocolError("Truncated HELLO")
+    if payload[:4] != MAGIC:
+        raise ProtocolError("Bad magic in HELLO")
+    if payload[4] != VERSION:
+        raise ProtocolError(f"Unsupported protocol version {payload[4]}")
+    return bytes(payload[5:]).decode("utf-8", "replace")
+
+
+def encode_batch(events):
+    """
+    Encode events into BATCH frames.
+
+    Returns:
+        list: frames (bytes); batches above MAX_BATCH_EVENTS are split
+    """
+    return [_encode_chunk(events[i:i + MAX_BATCH_EVENTS])
+            for i in range(0, len(events), MAX_BATCH_EVENTS)]
+
+
+def _encode_chunk(events):
+    strings = {}
+    records = bytearray(EVENT.size * len(events))
+    pack_into = EVENT.pack_into
+    offset = 0
+
+    for event in events:
+        ts = event.get("timestamp") or ""
+        ts_index = strings.get(ts)
+        if ts_index is None:
+            ts_index = strings[ts] = len(strings)
+        process = event.get("process") or "Unknown"
+        process_index = strings.get(process)
+        if process_index is None:
+            process_index = strings[process] = len(strings)
+        dest_ip = event["dest_ip"]
+        ip_index = strings.get(dest_ip)
+        if ip_index is None:
+            ip_index = strings[dest_ip] = len(strings)
+
+        flags = 0
+        sent = recv = polls = 0
+        duration = 0.0
+        if "bytes_sent" in event:
+            flags |= HAS_BYTES
+            sent, recv = event["bytes_sent"], event.get("bytes_recv", 0)
+        if "duration" in event:
+            flags |= HAS_CLOSE
+            duration, polls = event["duration"], event.get("polls_seen", 0)
+        cgroup = event.get("cgroup")
+        tag_index = 0
+        if cgroup is not None:
+            flags |= HAS_CGROUP
+            tag_index = strings.get(cgroup)
+            if tag_index is None:
+                tag_index = strings[cgroup] = len(strings)
+        netns = event.get("netns")
+        if netns is not None:
+            flags |= HAS_NETNS
+        else:
+            netns = 0
+        count = event.get("count", 1)
+        first_index = last_index = 0
+        if count != 1:
+            flags |= HAS_COUNT
+            first_seen = event.get("first_seen") or ts
+            first_index = strings.get(first_seen)
+            if first_index is None:
+                first_index = strings[first_seen] = len(strings)
+            last_seen = event.get("last_seen") or ts
+            last_index = strings.get(last_seen)
+            if last_index is None:
+                last_index = strings[last_seen] = len(strings)
+
+        pid = event.get("pid")
+        pack_into(records, offset,
+                  _EVENT_TYPE_CODES.get(event.get("event_type"), 0),
+                  _PROTOCOL_CODES.get(event.get("protocol"), 0),
+                  flags, -1 if pid is None else pid, event.get("dest_port") or 0,
+                  ts_index, process_index, ip_index, tag_index,
+                  sent, recv, duration, polls, netns, count, first_index, last_index)
+        offset += EVENT.size
+
+    parts = [b""]  # placeholder for the headers
+    for text in strings:
+        encoded = text.encode("utf-8")
+        parts.append(_U16.pack(len(encoded)))
+        parts.append(encoded)
+    parts.append(records)
+    body_len = _BATCH_HEADER.size + sum(len(p) for p in parts)
+    parts[0] = FRAME_HEADER.pack(body_len, FRAME_BATCH) + _BATCH_HEADER.pack(len(events), len(strings))
+    return b"".join(parts)
+
+
+def decode_batch(payload, host=None):
+    """
+    Decode a BATCH payload into event dicts.
+
+    `host`, if given, is added to every event.
+
+    Raises:
+        ProtocolError: if the payload is truncated or inconsistent
+    """
+    view = memoryview(payload)
+    try:
+        count, string_count = _BATCH_HEADER.unpack_from(view, 0)
+        offset = _BATCH_HEADER.size
+        strings = []
+        for _ in range(string_count):
+            length = _U16.unpack_from(view, offset)[0]
+            offset += 2
+            strings.append(str(view[offset:offset + length], "utf-8"))
+            offset += length
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ProtocolError(f"Bad string table: {e}")
+    if len(view) - offset != count * EVENT.size:
+        raise ProtocolError("Event records do not match the event count")
+
+    events = []
+    append = events.append
+    try:
+        for (event_type, protocol, flags, pid, port, ts_index, process_index,
+             ip_index, tag_index, sent, recv, duration, polls, netns,
+             count, first_index, last_index) in EVENT.iter_unpack(view[offset:]):
+            event = {
+                "event_type": EVENT_TYPES[event_type],
+                "timestamp": strings[ts_index],
+                "pid": None if pid < 0 else pid,
+                "process": strings[process_index],
+                "dest_ip": strings[ip_index],
+                "dest_port": port,
+                "protocol": PROTOCOLS[protocol],
+                "host": host,
+            }
+            if flags:
+                if flags & HAS_BYTES:
+                    event["bytes_sent"] = sent
+                    event["bytes_recv"] = recv
+                if flags & HAS_CLOSE:
+                    event["duration"] = duration
+                    event["polls_seen"] = polls
+                if flags & HAS_CGROUP:
+                    event["cgroup"] = strings[tag_index]
+                if flags & HAS_NETNS:
+                    event["netns"] = netns
+                if flags & HAS_COUNT:
+                    event["count"] = count
+                    event["first_seen"] = strings[first_index]
+                    event["last_seen"] = strings[last_index]
+            append(event)
+    except IndexError:
+        raise ProtocolError("Event references a missing string or code")
+    return events
+
+
+def read_frame(stream):
+    """
+    Read one frame from a binary stream (e.g. socket.makefile('rb')).
+
+    Returns:
+        tuple: (frame_type, payload), or None at end of stream
+
+    Raises:
+        ProtocolError: on a truncated or oversized frame
+    """
+    header = stream.read(FRAME_HEADER.size)
+    if not header:
+        return None
+    if len(header) < FRAME_HEADER.size:
+        raise ProtocolError("Truncated frame header")
+    length, frame_type = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME:
+        raise ProtocolError(f"Frame too large: {length} bytes")
+    payload = stream.read(length)
+    if len(payload) < length:
+        raise ProtocolError("Truncated frame")
+    return frame_type, payload
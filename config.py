@@ -3,6 +3,8 @@ Configuration and Whitelist Manager
 Centralized settings and trusted process definitions
 """
 
+from core.ip_classifier import IPClassifier
+
 # Trusted/Whitelisted Processes - Known safe applications
 TRUSTED_PROCESSES = {
     # System processes
@@ -38,6 +40,7 @@ TRUSTED_PROCESSES = {
 }
 
 # Trusted Destination IPs/Ranges - Known safe destinations
+# Keys may be single addresses or CIDR ranges (IPv4 or IPv6)
 TRUSTED_DESTINATIONS = {
     # Content Delivery Networks & CDNs
     '1.1.1.1': 'Cloudflare DNS',
@@ -82,6 +85,7 @@ SUSPICION_SCORING = {
     'beaconing_pattern': 15,            # Repetitive connections to same dest
     'connection_burst': 12,             # Many connections in very short window
     'multi_destination': 10,            # Connecting to many different IPs rapidly
+    'short_lived_connections': 10,      # Repeated connections closing within seconds
 }
 
 # Risk Level Thresholds
@@ -101,10 +105,37 @@ ALERT_CONFIG = {
 
 # Monitoring Configuration
 MONITORING_CONFIG = {
-    'poll_interval': 0.5,               # Network scan interval in seconds
-    'event_queue_max': 1000,            # Max events in queue
+    'poll_interval': 0.5,               # Base network scan interval in seconds
+    'poll_interval_min': 0.1,           # Fastest adaptive scan interval under high churn
+    'poll_interval_max': 2.0,           # Slowest adaptive scan interval when quiet
+    'poll_high_churn': 10,              # Opened + closed connections per scan that count as busy
+    'event_queue_max': 20000,           # Max events waiting for the analyzer
+    'event_queue_policy': 'block',      # block | drop_oldest | drop_newest | sample_safe | coalesce (when full)
+    'event_queue_sample_rate': 10,      # sample_safe: keep 1 in N SAFE-looking events while shedding
+    'event_coalesce_secs': 2.0,         # Merge repeats of a pid/destination within this window (0 = off)
+    'analyzer_batch_max': 500,          # Events scored and stored per analyzer transaction
+    'analyzer_batch_linger_ms': 20,     # Max wait for a micro-batch to fill (latency vs. throughput)
+    'analyzer_workers': 1,              # Threads scoring a micro-batch (events of one process stay on one)
+    'runtime': 'threads',               # threads | asyncio (bounded enrich/score/alert/persist stages)
+    'async_stage_queue': 8,             # Batches buffered between two asyncio pipeline stages
+    'analyzer_processes': 0,            # Analyzer processes fed by shared-memory rings (0 = score in-process)
+    'analyzer_ring_slots': 16384,       # Events per analyzer process ring (289 bytes each)
+    'scoring_shards': 16,               # Lock stripes of the scoring engine's per-process state
+    'scoring_event_time': False,        # Measure scoring windows at event timestamps (always on for replay/pcap)
     'cleanup_hours': 24,                # Clean old events after N hours
     'max_known_connections': 10000,     # Track up to N known connections
+    'process_cache_size': 4096,         # Processes kept in the shared process table (LRU)
+    'process_cache_refresh': 1.0,       # Re-read the process table at most every N seconds
+    'collector_backend': 'auto',        # auto | psutil | proc | sock_diag | ebpf | scoped | replay | pcap | aggregator
+    'scope_cgroups': [],                # cgroup paths watched by 'scoped' (e.g. '/system.slice/docker-<id>.scope')
+    'scope_netns': [],                  # network namespaces watched by 'scoped' (e.g. '/var/run/netns/tenant1')
+    'replay_source': 'exports',         # CSV export(s), exports dir or SQLite DB for 'replay'
+    'replay_speed': 0.0,                # Replay speed-up factor (0 = as fast as possible)
+    'pcap_source': None,                # pcap/pcapng capture(s) for 'pcap'
+    'pcap_attribution': None,           # Optional CSV mapping local_ip/port (+ remote) to pid/process
+    'pcap_local_nets': [],              # Capture host's addresses/CIDRs; SYNs to them are inbound, skipped
+    'aggregator_bind': '0.0.0.0:9555',  # Listen address for 'aggregator' (agents connect here)
+    'agent_hostname': None,             # Host name agents report (default: socket.gethostname())
 }
 
 def is_trusted_process(process_name):
@@ -118,13 +149,20 @@ def get_process_score_reduction(process_name):
         return TRUSTED_PROCESSES[process_lower]['score_reduction']
     return 0
 
+_trusted_classifier = IPClassifier(TRUSTED_DESTINATIONS)
+
+def reload_trusted_destinations():
+    """Rebuild the trusted destination table after TRUSTED_DESTINATIONS changes."""
+    global _trusted_classifier
+    _trusted_classifier = IPClassifier(TRUSTED_DESTINATIONS)
+
 def is_trusted_destination(ip_address):
-    """Check if destination IP is trusted."""
-    return ip_address in TRUSTED_DESTINATIONS
+    """Check if destination IP (string or ip_classifier int) is inside a trusted range."""
+    return _trusted_classifier.contains(ip_address)
 
 def get_destination_name(ip_address):
     """Get friendly name for trusted IP."""
-    return TRUSTED_DESTINATIONS.get(ip_address, 'Unknown')
+    return _trusted_classifier.classify(ip_address) or 'Unknown'
 
 def is_safe_port(port):
     """Check if port is in safe/common ports list."""
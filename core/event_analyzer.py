@@ -0,0 +1,188 @@
+"""
+Event Analyzer - Scores collector events into database rows
+Shared by every analyzer runtime (thread loop, analyzer processes, asyncio), with the run totals
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+
+from config import MONITORING_CONFIG
+from core.event_coalescer import EventCoalescer
+from core.intent_monitor import get_intent_score, get_idle_time
+from core.ip_classifier import ip_to_int
+from core.process_mapper import get_process_state
+from core.scoring_engine import get_default_engine
+from core.suspicion_engine import determine_risk_level
+
+logger = logging.getLogger(__name__)
+
+engine = get_default_engine()
+coalescer = EventCoalescer.from_config(MONITORING_CONFIG)
+
+# Run totals (connections scored, alerts raised) across all analyzer threads
+total_events_processed = 0
+total_alerts_generated = 0
+_totals_lock = threading.Lock()
+
+def add_totals(events, alerts):
+    """Add totals counted elsewhere (e.g. by an analyzer process)."""
+    global total_events_processed, total_alerts_generated
+    with _totals_lock:
+        total_events_processed += events
+        total_alerts_generated += alerts
+
+def _parse_timestamp(timestamp_str):
+    """Convert a collector timestamp string to epoch seconds (now if unparsable)."""
+    try:
+        return datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S").timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+def score_event(event, scoring_engine=None, report=True):
+    """
+    Run one network event through the analysis pipeline.
+    
+    Returns the database row for the event, or None if there is nothing
+    to store (close events, errors). Storing is left to the caller, and
+    so is logging alerts when `report` is False (see report_event).
+    `scoring_engine` defaults to the shared engine.
+    """
+    global total_events_processed
+    engine_ = scoring_engine or engine
+    
+    try:
+        # Close events only feed connection lifetimes (and the bytes sampled
+        # since the process' previous event) to the engine
+        if event.get("event_type") == "close":
+            engine_.record_connection_close(event["process"], event["dest_ip"], event["dest_port"],
+                                           event["duration"], _parse_timestamp(event["timestamp"]),
+                                           event.get("bytes_sent", 0) + event.get("bytes_recv", 0))
+            return None
+        
+        # A coalesced event stands for `count` connections (see core.event_coalescer)
+        count = event.get("count", 1)
+        with _totals_lock:
+            total_events_processed += count
+        
+        timestamp_str = event["timestamp"]  # Already formatted as string from collector
+        pid = event["pid"]
+        process_name = event["process"]
+        dest_ip = event["dest_ip"]
+        dest_port = event["dest_port"]
+        
+        # Get process metadata (cached by the enricher - may be partial, never waits)
+        proc = get_process_state(pid)
+        if not proc:
+            logger.debug(f"Process details for PID {pid} not sampled yet")
+        
+        # Get user activity metrics (measured by the dispatcher for analyzer processes)
+        intent = event.get("intent_score")
+        if intent is None:
+            intent = get_intent_score()
+        idle = event.get("idle_time")
+        if idle is None:
+            idle = get_idle_time()
+        
+        # Bytes the process transferred since its previous event (0 if the backend does not sample)
+        traffic = event.get("bytes_sent", 0) + event.get("bytes_recv", 0)
+        
+        # Convert timestamp string to float for suspicion calculation
+        ts_float = _parse_timestamp(timestamp_str)
+        
+        # Baseline update, suspicion score (0-100 scale) and alert decision,
+        # atomic for this process
+        score, reasons, alert = engine_.score(
+            process_name,
+            traffic,
+            intent,
+            idle,
+            dest_ip,
+            dest_port,
+            timestamp=ts_float,
+            dest_ip_int=ip_to_int(dest_ip),
+            count=count
+        )
+        
+        # Determine risk level using enhanced scoring
+        risk_level = determine_risk_level(score)
+        
+        # Determine severity for display
+        if score >= 76:
+            severity = "CRITICAL"
+        elif score >= 51:
+            severity = "HIGH"
+        elif score >= 26:
+            severity = "MEDIUM"
+        else:
+            severity = "SAFE"
+        
+        # Create event dictionary for database - BACKWARD COMPATIBLE
+        db_event = {
+            "timestamp": timestamp_str,
+            "pid": pid,
+            "process_name": process_name,
+            "dest_ip": dest_ip,
+            "dest_port": dest_port,
+            "intent_score": intent,
+            "suspicion_score": score,
+            "risk_level": risk_level,
+            "severity": severity,
+            "reasons": reasons,
+            "protocol": event.get("protocol", "TCP"),
+            "host": event.get("host"),
+            "count": count,
+            "first_seen": event.get("first_seen"),
+            "last_seen": event.get("last_seen")
+        }
+        should_generate_alert, alert_msg, alert_severity = alert
+        if should_generate_alert:
+            db_event["alert"] = alert_msg
+        
+        if report:
+            report_event(db_event)
+        return db_event
+        
+    except Exception as e:
+        logger.error(f"Error processing event: {e}", exc_info=True)
+        return None
+
+def report_event(db_event):
+    """Log the alert and the high-risk summary of a scored event."""
+    global total_alerts_generated
+    
+    if db_event.get("alert"):
+        logger.warning(f"🚨 ALERT: {db_event['alert']}")
+        with _totals_lock:
+            total_alerts_generated += 1
+    
+    # Log summary for high-risk events
+    score = db_event["suspicion_score"]
+    if score > 50:
+        reasons = db_event["reasons"]
+        count = db_event.get("count", 1)
+        repeats = f" x{count} since {db_event['first_seen']}" if count > 1 else ""
+        logger.info(f"⚠️  {db_event['risk_level']}: {db_event['process_name']} ({db_event['pid']}) -> "
+                    f"{db_event['dest_ip']}:{db_event['dest_port']}{repeats} (Score: {score:.1f})")
+        if reasons:
+            logger.info(f"   Reasons: {', '.join(reasons)}")
+
+def record_existing_connections(events, scoring_engine=None):
+    """Seed the engine with connections open at startup; returns their database rows."""
+    (scoring_engine or engine).seed_destinations((e["process"], e["dest_ip"], e["dest_port"]) for e in events)
+    processes = len({e["process"] for e in events})
+    logger.info(f"Baseline: {len(events)} pre-existing connections from {processes} processes")
+    return [{
+        "timestamp": e["timestamp"],
+        "pid": e["pid"],
+        "process_name": e["process"],
+        "dest_ip": e["dest_ip"],
+        "dest_port": e["dest_port"],
+        "suspicion_score": 0.0,
+        "risk_level": "SAFE",
+        "severity": "SAFE",
+        "reasons": ["Pre-existing connection at startup"],
+        "protocol": e.get("protocol", "TCP"),
+        "host": e.get("host")
+    } for e in events]
@@ -0,0 +1,220 @@
+"""
+Event Ring - Single-producer/single-consumer ring buffer of fixed-size event records
+Lives in multiprocessing.shared_memory, so analyzer processes read events without pickling
+"""
+
+import multiprocessing
+import struct
+import time
+from multiprocessing import shared_memory
+
+# Header: head (next slot to write) and tail (next slot to read) on separate
+# cache lines, then the closed flag and the slot count
+_U64 = struct.Struct("<Q")
+_HEAD = 0
+_TAIL = 64
+_CLOSED = 128
+_SLOTS = 136
+HEADER_SIZE = 192
+
+# event_type, protocol, flags, pid (-1 = unknown), dest_port, bytes_sent, bytes_recv,
+# duration, polls_seen, intent_score, idle_time, count (coalesced events), then
+# fixed-width UTF-8 strings: timestamp, first_seen, process, dest_ip, host, cgroup
+# (longer values are truncated)
+RECORD = struct.Struct("<BBBiHQQfIffI19s19s64s46s32s64s")
+
+EVENT_TYPES = ("open", "close", "existing")
+PROTOCOLS = ("TCP", "UDP")
+_EVENT_TYPE_CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+_PROTOCOL_CODES = {name: code for code, name in enumerate(PROTOCOLS)}
+
+HAS_BYTES = 0x01
+HAS_CLOSE = 0x02
+HAS_HOST = 0x04
+HAS_CGROUP = 0x08
+HAS_COUNT = 0x10
+
+
+def _text(value):
+    return value.rstrip(b"\0").decode("utf-8", "ignore")
+
+
+class EventRing:
+    """
+    Bounded SPSC queue of events in a shared memory segment.
+
+    One process put()s, one process get()s; head and tail are only ever
+    written by their own side. A record is written before head moves past
+    it and read before tail moves past it, and head, tail and the closed
+    flag are only read or written while holding the ring's lock. The lock
+    is a process-shared semaphore, so taking it is a full memory barrier:
+    record stores are visible before the new head on any CPU, not just on
+    x86/x64 where plain stores happen to stay in order. It is taken once
+    per put()/get() call, not per event.
+
+    Records have a fixed size (RECORD.size bytes), so strings are capped:
+    64 bytes of process name, 46 of address (any IPv6 text form), 32 of
+    host and 64 of cgroup.
+    """
+
+    def __init__(self, shm, lock, owner=False):
+        self.shm = shm
+        self.lock = lock
+        self.owner = owner
+        self.buf = shm.buf
+        self.slots = _U64.unpack_from(self.buf, _SLOTS)[0]
+
+    @classmethod
+    def create(cls, slots=65536, context=multiprocessing):
+        """
+        Create a new ring with room for `slots` events.
+
+        `context` is the multiprocessing context the consumer is started
+        with; the ring's lock must be passed to it along with the name.
+        """
+        shm = shared_memory.SharedMemory(create=True, size=HEADER_SIZE + slots * RECORD.size)
+        shm.buf[:HEADER_SIZE] = bytes(HEADER_SIZE)
+        _U64.pack_into(shm.buf, _SLOTS, slots)
+        return cls(shm, context.Lock(), owner=True)
+
+    @classmethod
+    def attach(cls, name, lock):
+        """Open a ring created by another process (`lock` is the creator's ring.lock)."""
+        return cls(shared_memory.SharedMemory(name=name), lock)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def __len__(self):
+        with self.lock:
+            return _U64.unpack_from(self.buf, _HEAD)[0] - _U64.unpack_from(self.buf, _TAIL)[0]
+
+    @property
+    def closed(self):
+        with self.lock:
+            return self.buf[_CLOSED] != 0
+
+    def put(self, events, intent_score=1.0, idle_time=0.0):
+        """
+        Append events (producer side).
+
+        `intent_score` and `idle_time` are stored with every event, since the
+        consumer cannot measure the user's activity itself.
+
+        Returns:
+            int: number of events written (less than len(events) when full)
+        """
+        buf = self.buf
+        with self.lock:
+            head = _U64.unpack_from(buf, _HEAD)[0]
+            free = self.slots - (head - _U64.unpack_from(buf, _TAIL)[0])
+        count = min(free, len(events))
+        pack_into = RECORD.pack_into
+        slots = self.slots
+
+        for event in events[:count]:
+            flags = 0
+            sent = recv = polls = 0
+            duration = 0.0
+            if "bytes_sent" in event:
+                flags |= HAS_BYTES
+                sent, recv = event["bytes_sent"], event.get("bytes_recv", 0)
+            if "duration" in event:
+                flags |= HAS_CLOSE
+                duration, polls = event["duration"], event.get("polls_seen", 0)
+            host = event.get("host")
+            if host is not None:
+                flags |= HAS_HOST
+            cgroup = event.get("cgroup")
+            if cgroup is not None:
+                flags |= HAS_CGROUP
+            count_ = event.get("count", 1)
+            if count_ != 1:
+                flags |= HAS_COUNT
+            pid = event.get("pid")
+
+            pack_into(buf, HEADER_SIZE + (head % slots) * RECORD.size,
+                      _EVENT_TYPE_CODES.get(event.get("event_type"), 0),
+                      _PROTOCOL_CODES.get(event.get("protocol"), 0),
+                      flags, -1 if pid is None else pid, event.get("dest_port") or 0,
+                      sent, recv, duration, polls, intent_score, idle_time, count_,
+                      (event.get("timestamp") or "").encode("utf-8"),
+                      (event.get("first_seen") or "").encode("utf-8"),
+                      (event.get("process") or "Unknown").encode("utf-8"),
+                      event["dest_ip"].encode("utf-8"),
+                      (host or "").encode("utf-8"),
+                      (cgroup or "").encode("utf-8"))
+            head += 1
+
+        with self.lock:
+            _U64.pack_into(buf, _HEAD, head)
+        return count
+
+    def put_all(self, events, intent_score=1.0, idle_time=0.0, keep_waiting=lambda: True):
+        """Append every event, waiting for room while `keep_waiting()` is true."""
+        written = self.put(events, intent_score, idle_time)
+        delay = 0.0001
+        while written < len(events) and keep_waiting():
+            time.sleep(delay)
+            delay = min(delay * 2, 0.01)
+            written += self.put(events[written:], intent_score, idle_time)
+        return written
+
+    def get(self, max_events=1000):
+        """Remove and return up to `max_events` events (consumer side)."""
+        buf = self.buf
+        with self.lock:
+            tail = _U64.unpack_from(buf, _TAIL)[0]
+            count = min(_U64.unpack_from(buf, _HEAD)[0] - tail, max_events)
+        unpack_from = RECORD.unpack_from
+        slots = self.slots
+
+        events = []
+        for index in range(tail, tail + count):
+            (event_type, protocol, flags, pid, port, sent, recv, duration, polls,
+             intent_score, idle_time, count_, timestamp, first_seen, process, dest_ip, host, cgroup) = \
+                unpack_from(buf, HEADER_SIZE + (index % slots) * RECORD.size)
+            event = {
+                "event_type": EVENT_TYPES[event_type],
+                "timestamp": _text(timestamp),
+                "pid": None if pid < 0 else pid,
+                "process": _text(process),
+                "dest_ip": _text(dest_ip),
+                "dest_port": port,
+                "protocol": PROTOCOLS[protocol],
+                "intent_score": intent_score,
+                "idle_time": idle_time,
+            }
+            if flags:
+                if flags & HAS_BYTES:
+                    event["bytes_sent"] = sent
+                    event["bytes_recv"] = recv
+                if flags & HAS_CLOSE:
+                    event["duration"] = duration
+                    event["polls_seen"] = polls
+                if flags & HAS_HOST:
+                    event["host"] = _text(host)
+                if flags & HAS_CGROUP:
+                    event["cgroup"] = _text(cgroup)
+                if flags & HAS_COUNT:
+                    event["count"] = count_
+                    event["first_seen"] = _text(first_seen)
+                    event["last_seen"] = event["timestamp"]
+            events.append(event)
+
+        with self.lock:
+            _U64.pack_into(buf, _TAIL, tail + count)
+        return events
+
+    def close(self):
+        """Tell the consumer no more events will come (producer side)."""
+        with self.lock:
+            self.buf[_CLOSED] = 1
+
+    def release(self):
+        """Detach from the segment; the creator also removes it."""
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,136 @@
+"""
+IP Classifier - Integer/CIDR based address classification
+Shared by the collectors (local/private filtering), config (trusted destinations)
+and the suspicion engine
+"""
+
+import ipaddress
+import socket
+
+# IPv4 addresses live in the IPv4-mapped part of one 128-bit space (::ffff:a.b.c.d),
+# so a single table answers for both families
+V4_MAPPED = 0xFFFF << 32
+_V4_MAPPED_PREFIX_LEN = 96
+
+# Destinations that never leave the host / local network
+LOCAL_RANGES = {
+    '0.0.0.0/8': 'unspecified',
+    '127.0.0.0/8': 'loopback',
+    '10.0.0.0/8': 'private',
+    '172.16.0.0/12': 'private',
+    '192.168.0.0/16': 'private',
+    '100.64.0.0/10': 'cgnat',
+    '169.254.0.0/16': 'link-local',
+    '::/128': 'unspecified',
+    '::1/128': 'loopback',
+    'fe80::/10': 'link-local',
+    'fc00::/7': 'ula',
+}
+
+
+def ip_to_int(ip):
+    """
+    Convert an address to its integer in the shared 128-bit space.
+
+    Accepts dotted IPv4, IPv6 (with optional %scope) or an int that is
+    already converted. Returns None for anything unparsable.
+    """
+    if isinstance(ip, int):
+        return ip
+    try:
+        if ':' not in ip:
+            return V4_MAPPED | int.from_bytes(socket.inet_aton(ip), 'big')
+        return int.from_bytes(socket.inet_pton(socket.AF_INET6, ip.split('%', 1)[0]), 'big')
+    except (OSError, TypeError, AttributeError):
+        return None
+
+
+def v4_to_int(addr):
+    """Map a host-order IPv4 integer into the shared space."""
+    return V4_MAPPED | addr
+
+
+def parse_network(cidr):
+    """
+    Parse a CIDR (or a bare address) into (network_int, prefix_len) in the shared space.
+
+    Raises:
+        ValueError: if the CIDR is invalid
+    """
+    net = ipaddress.ip_network(cidr, strict=False)
+    if net.version == 4:
+        return V4_MAPPED | int(net.network_address), _V4_MAPPED_PREFIX_LEN + net.prefixlen
+    return int(net.network_address), net.prefixlen
+
+
+class IPClassifier:
+    """
+    Longest-prefix-match table from CIDRs to labels.
+
+    Networks are stored in one hash table per prefix length, keyed by the
+    network bits. A lookup costs one shift and one dict probe per distinct
+    prefix length in the table (at most 129), independent of how many
+    CIDRs are configured.
+    """
+
+    def __init__(self, ranges=None):
+        self._tables = {}  # {prefix_len: {network_bits: label}}
+        self._lengths = ()
+        for cidr, label in (ranges or {}).items():
+            self.add(cidr, label)
+
+    def __len__(self):
+        return sum(len(table) for table in self._tables.values())
+
+    def add(self, cidr, label=True):
+        """Add a CIDR (or single address) with a label."""
+        network, prefix_len = parse_network(cidr)
+        shift = 128 - prefix_len
+        self._tables.setdefault(prefix_len, {})[network >> shift] = label
+        # Longest prefixes first so the most specific label wins
+        self._lengths = tuple((plen, 128 - plen, self._tables[plen])
+                              for plen in sorted(self._tables, reverse=True))
+
+    def classify(self, ip):
+        """
+        Get the label of the most specific range containing `ip`.
+
+        Returns:
+            The label, or None if no range matches
+        """
+        addr = ip_to_int(ip)
+        if addr is None:
+            return None
+        for _, shift, table in self._lengths:
+            label = table.get(addr >> shift)
+            if label is not None:
+                return label
+        return None
+
+    def contains(self, ip):
+        """Check if `ip` falls inside any range."""
+        return self.classify(ip) is not None
+
+    def networks(self):
+        """Yield (cidr_string, label) for every range in the table."""
+        for plen, shift, table in self._lengths:
+            for bits, label in table.items():
+                network = bits << shift
+                if plen >= _V4_MAPPED_PREFIX_LEN and network >> 32 == 0xFFFF:
+                    addr = ipaddress.IPv4Address(network & 0xFFFFFFFF)
+                    yield f"{addr}/{plen - _V4_MAPPED_PREFIX_LEN}", label
+                else:
+                    yield f"{ipaddress.IPv6Address(network)}/{plen}", label
+
+
+LOCAL_CLASSIFIER = IPClassifier(LOCAL_RANGES)
+
+
+def is_local_address(ip):
+    """Check if an address (string or shared-space int) is loopback, private, CGNAT, link-local or ULA."""
+    return LOCAL_CLASSIFIER.contains(ip)
+
+
+def classify_address(ip):
+    """Get the local range label for an address, or 'public'."""
+    return LOCAL_CLASSIFIER.classify(ip) or 'public'
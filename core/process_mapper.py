@@ -1,14 +1,16 @@
-﻿import psutil
+from core.process_table import get_process_table
 
 def get_process_state(pid):
-    try:
-        p = psutil.Process(pid)
-        return {
-            "name": p.name(),
-            "exe": p.exe(),
-            "status": p.status(),
-            "cpu": p.cpu_percent(interval=0.1),
-            "memory": p.memory_percent()
-        }
-    except:
+    # Never blocks: reads what the enricher last sampled. Fields not
+    # sampled yet (cpu until a second sample) are None; None overall if
+    # the process has not been seen by a refresh yet.
+    info = get_process_table().peek(pid)
+    if info is None:
         return None
+    return {
+        "name": info["name"],
+        "exe": info["exe"],
+        "status": info["status"],
+        "cpu": info["cpu_percent"],
+        "memory": info["memory_percent"]
+    }
@@ -0,0 +1,264 @@
+"""
+Process Table - Shared snapshot cache of running processes
+Refreshed in bulk with psutil.process_iter() instead of one Process() per event
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import psutil
+
+from config import MONITORING_CONFIG
+
+# Attributes read for every process in one process_iter() pass
+PROCESS_ATTRS = ['pid', 'name', 'exe', 'status', 'create_time', 'memory_percent', 'cpu_times']
+
+
+class ProcessTable:
+    """
+    LRU-bounded process cache keyed by (pid, create_time).
+
+    get() refreshes the whole table with one process_iter() pass when the
+    snapshot is older than `refresh_interval`, so lookups between two
+    refreshes cost a dict access and no syscalls. A refresh drops exited
+    processes and replaces entries whose PID was reused by a newer
+    process (different create_time). A PID missing from the snapshot (a
+    process started since the last refresh) is looked up on its own once;
+    a failed lookup is remembered until the next refresh.
+
+    peek() never reads the process table: it returns whatever the last
+    refresh saw, for callers that must not wait (the analyzer) while a
+    ProcessEnricher refreshes in the background. The process_iter() pass
+    runs outside the lookup lock, so a slow refresh does not stall peek().
+
+    cpu_percent is computed from the cpu_times delta between two
+    refreshes, so it is None until a process has been sampled twice.
+
+    `process_api` replaces psutil (process_iter() and Process()), e.g. for
+    a synthetic process table.
+    """
+
+    def __init__(self, max_entries=4096, refresh_interval=1.0, process_api=None):
+        self.max_entries = max_entries
+        self.refresh_interval = refresh_interval
+        self.process_api = process_api or psutil
+        self._entries = OrderedDict()  # {(pid, create_time): info}, least recently used first
+        self._by_pid = {}              # {pid: (pid, create_time)}
+        self._missing = set()          # PIDs that failed a lookup since the last refresh
+        self._last_refresh = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+        # Monitoring counters
+        self.refreshes = 0
+        self.last_refresh_ms = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.reused = 0
+        self.evicted = 0
+
+    @classmethod
+    def from_config(cls, config, process_api=None):
+        """Build a table from MONITORING_CONFIG-style settings."""
+        return cls(max_entries=config.get('process_cache_size', 4096),
+                   refresh_interval=config.get('process_cache_refresh', 1.0),
+                   process_api=process_api)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, pid):
+        """
+        Get process info for `pid`, refreshing or looking it up if needed.
+
+        Returns:
+            dict: pid, name, exe, status, create_time, memory_percent,
+            cpu_times, cpu_percent (fields not read yet or denied are
+            None), or None if the process does not exist
+        """
+        if pid is None:
+            return None
+        if self._is_stale():
+            self.refresh(if_stale=True)
+
+        with self._lock:
+            info = self._cached(pid)
+            if info is not None or pid in self._missing:
+                return info
+        info = self._lookup(pid)
+        with self._lock:
+            if info is None:
+                self._missing.add(pid)
+            else:
+                self._store(info)
+        return info
+
+    def peek(self, pid):
+        """Get the cached info for `pid` without any process reads (None if not cached)."""
+        if pid is None:
+            return None
+        with self._lock:
+            return self._cached(pid)
+
+    def name(self, pid):
+        """Get the process name for `pid` (None if unknown)."""
+        info = self.get(pid)
+        return info['name'] if info else None
+
+    def refresh(self, if_stale=False):
+        """Re-read the process table (only if still stale with `if_stale`)."""
+        with self._refresh_lock:
+            if if_stale and not self._is_stale():
+                return
+            started = time.perf_counter()
+            now = time.monotonic()
+            snapshot = [proc.info for proc in
+                        self.process_api.process_iter(attrs=PROCESS_ATTRS, ad_value=None)]
+            with self._lock:
+                self._merge(snapshot, now)
+            self.refreshes += 1
+            self.last_refresh_ms = (time.perf_counter() - started) * 1000
+
+    def _is_stale(self):
+        last = self._last_refresh
+        return last is None or time.monotonic() - last >= self.refresh_interval
+
+    def _cached(self, pid):
+        key = self._by_pid.get(pid)
+        if key is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def _merge(self, snapshot, now):
+        live = set()
+        for info in snapshot:
+            key = (info['pid'], info['create_time'])
+            live.add(key)
+            info['sampled_at'] = now
+            info['cpu_percent'] = _cpu_percent(self._entries.get(key), info)
+            if key in self._entries:
+                self._entries[key] = info
+            else:
+                self._store(info)
+
+        # Exited processes, and old owners of reused PIDs
+        for key in [key for key in self._entries if key not in live]:
+            del self._entries[key]
+            if self._by_pid.get(key[0]) == key:
+                del self._by_pid[key[0]]
+        self._missing.clear()
+        self._trim()
+        self._last_refresh = now
+
+    def _lookup(self, pid):
+        """Read one process outside a refresh (PID newer than the snapshot)."""
+        try:
+            proc = self.process_api.Process(pid)
+            with proc.oneshot():
+                info = proc.as_dict(attrs=PROCESS_ATTRS, ad_value=None)
+        except psutil.Error:
+            return None
+        info['sampled_at'] = time.monotonic()
+        info['cpu_percent'] = None
+        return info
+
+    def _store(self, info):
+        key = (info['pid'], info['create_time'])
+        previous = self._by_pid.get(key[0])
+        if previous is not None and previous != key:
+            # PID reused by a newer process
+            self._entries.pop(previous, None)
+            self.reused += 1
+        self._by_pid[key[0]] = key
+        self._entries[key] = info
+        self._trim()
+
+    def _trim(self):
+        while len(self._entries) > self.max_entries:
+            key, _ = self._entries.popitem(last=False)
+            if self._by_pid.get(key[0]) == key:
+                del self._by_pid[key[0]]
+            self.evicted += 1
+
+    def stats(self):
+        """Get cache counters."""
+        return {
+            'process_cache_size': len(self._entries),
+            'process_cache_hits': self.hits,
+            'process_cache_misses': self.misses,
+            'process_cache_refreshes': self.refreshes,
+            'process_cache_refresh_ms': round(self.last_refresh_ms, 3),
+            'process_cache_reused_pids': self.reused,
+            'process_cache_evicted': self.evicted,
+        }
+
+
+def _cpu_percent(previous, info):
+    """CPU use between two samples of the same process (None without a previous sample)."""
+    if previous is None or previous['cpu_times'] is None or info['cpu_times'] is None:
+        return None
+    elapsed = info['sampled_at'] - previous['sampled_at']
+    if elapsed <= 0:
+        return previous['cpu_percent']
+    used = (info['cpu_times'].user + info['cpu_times'].system
+            - previous['cpu_times'].user - previous['cpu_times'].system)
+    return round(max(used, 0.0) / elapsed * 100, 1)
+
+
+class ProcessEnricher:
+    """
+    Background stage that keeps a ProcessTable fresh.
+
+    Refreshes the table every `interval` seconds in its own thread, so
+    the per-process details (exe, status, CPU, memory) are sampled off
+    the analyzer's path; the analyzer reads them with peek() and scores
+    with whatever is available.
+    """
+
+    def __init__(self, table, interval=None):
+        self.table = table
+        self.interval = interval if interval is not None else table.refresh_interval
+        self.running = False
+        self.errors = 0
+        self._thread = None
+        self._wakeup = threading.Event()
+
+    def start(self):
+        """Start refreshing in a daemon thread."""
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="process-enricher", daemon=True)
+        self._thread.start()
+        return True
+
+    def _run(self):
+        while self.running:
+            try:
+                self.table.refresh()
+            except Exception as e:
+                self.errors += 1
+                print(f"[Enricher] Refresh error: {e}")
+            self._wakeup.wait(self.interval)
+
+    def stop(self):
+        """Stop the refresh thread."""
+        self.running = False
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+
+_shared_table = None
+_shared_lock = threading.Lock()
+
+
+def get_process_table():
+    """Get the process table shared by the collector and the analyzer."""
+    global _shared_table
+    with _shared_lock:
+        if _shared_table is None:
+            _shared_table = ProcessTable.from_config(MONITORING_CONFIG)
+        return _shared_table
@@ -0,0 +1,489 @@
+"""
+Scoring Engine - Per-process scoring state owned by one object
+Sharded by process name with one lock per shard, so several analyzer threads can score safely
+"""
+
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import deque
+
+from config import (
+    TRUSTED_PROCESSES,
+    get_process_score_reduction,
+    is_safe_port,
+    is_trusted_destination,
+    SUSPICION_SCORING,
+    MONITORING_CONFIG,
+)
+
+# Connection lifetimes reported by the collector's close events
+DURATION_BUCKETS = (0.5, 1, 2, 5, 10, 30, 60, 300, 900)  # upper edges (secs), last bucket is open-ended
+SHORT_LIVED_SECS = 2.0
+
+HISTORY_PER_PROCESS = 1000  # connections kept per process for the sliding windows
+ALERTS_PER_PROCESS = 100    # alert timestamps kept per process
+
+
+def shard_of(process_name, shards):
+    """Stable shard index of a process name (same in every thread, process and run)."""
+    return zlib.crc32(process_name.encode("utf-8", "replace")) % shards
+
+
+def _new_profile():
+    return {
+        'traffic_total': 0,
+        'connection_count': 0,
+        'avg_intent': 0.5
+    }
+
+
+class _Shard:
+    """State of the processes hashed to one shard, guarded by its lock."""
+
+    __slots__ = ("lock", "seen_destinations", "connection_history", "duration_histograms",
+                 "short_lived_closes", "profiles", "alert_history", "last_alert_time")
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.seen_destinations = {}    # {process_name: set of (ip, port)}
+        self.connection_history = {}   # {process_name: deque of (timestamp, ip, port, count)}
+        self.duration_histograms = {}  # {process_name: array('I') of len(DURATION_BUCKETS) + 1 counts}
+        self.short_lived_closes = {}   # {process_name: deque of close timestamps}
+        self.profiles = {}             # {process_name: behaviour profile}
+        self.alert_history = {}        # {process_name: deque of alert timestamps}
+        self.last_alert_time = {}      # {process_name: last alert timestamp}
+
+
+class ScoringEngine:
+    """
+    Owns the state behind suspicion scoring, behaviour baselines and alert
+    rate limiting.
+
+    The state is split into `shards` by a stable hash of the process name
+    (shard_of), each shard behind its own lock: threads working on
+    different processes rarely contend, and score() updates one process
+    atomically. Order between events of the same process is up to the
+    caller - route every event of a process to the same worker (e.g. by
+    shard_of(process_name, workers)) and it is preserved.
+
+    With `event_time`, the sliding windows (rates, bursts, beaconing,
+    short-lived closes, alert rate limiting) are measured at the event's
+    timestamp instead of the wall clock, which keeps replayed and pcap
+    events meaningful at any replay speed.
+
+    Independent instances share nothing, so tests and benchmarks can
+    each use a fresh engine.
+    """
+
+    def __init__(self, shards=16, event_time=False, clock=time.time):
+        self.shards = [_Shard() for _ in range(shards)]
+        self.event_time = event_time
+        self.clock = clock
+
+    @classmethod
+    def from_config(cls, config):
+        """Build an engine from MONITORING_CONFIG-style settings."""
+        return cls(shards=config.get('scoring_shards', 16),
+                   event_time=config.get('scoring_event_time', False))
+
+    def _shard(self, process_name):
+        return self.shards[shard_of(process_name, len(self.shards))]
+
+    def _now(self, timestamp=None):
+        if self.event_time and timestamp is not None:
+            return timestamp
+        return self.clock()
+
+    # -- connection tracking -------------------------------------------
+
+    def track_connection(self, process_name, dest_ip, dest_port, timestamp, count=1):
+        """Track network connection (`count` coalesced repeats of it) for pattern detection."""
+        shard = self._shard(process_name)
+        with shard.lock:
+            seen = shard.seen_destinations.get(process_name)
+            if seen is None:
+                seen = shard.seen_destinations[process_name] = set()
+            seen.add((dest_ip, dest_port))
+
+            history = shard.connection_history.get(process_name)
+            if history is None:
+                history = shard.connection_history[process_name] = deque(maxlen=HISTORY_PER_PROCESS)
+            history.append((timestamp, dest_ip, dest_port, count))
+
+    def seed_destinations(self, connections):
+        """
+        Mark destinations as already known in one bulk update.
+
+        Used for connections that were open before monitoring started: they
+        are not "new" later, and they do not count towards the rate windows.
+
+        Args:
+            connections: iterable of (process_name, dest_ip, dest_port)
+        """
+        for process_name, dest_ip, dest_port in connections:
+            shard = self._shard(process_name)
+            with shard.lock:
+                seen = shard.seen_destinations.get(process_name)
+                if seen is None:
+                    seen = shard.seen_destinations[process_name] = set()
+                seen.add((dest_ip, dest_port))
+
+    def is_new_destination(self, process_name, dest_ip, dest_port):
+        """Check if this is a new destination for the process."""
+        shard = self._shard(process_name)
+        with shard.lock:
+            seen = shard.seen_destinations.get(process_name)
+            return seen is None or (dest_ip, dest_port) not in seen
+
+    def _recent(self, process_name, time_window, now):
+        """(ip, port, count) connections of the process within the time window (caller holds the shard lock)."""
+        history = self._shard(process_name).connection_history.get(process_name)
+        if not history:
+            return []
+        return [(ip, port, count) for ts, ip, port, count in history if now - ts < time_window]
+
+    def get_recent_connection_count(self, process_name, time_window=60, now=None):
+        """Get connection count in recent time window (seconds)."""
+        shard = self._shard(process_name)
+        with shard.lock:
+            recent = self._recent(process_name, time_window, now if now is not None else self.clock())
+            return sum(count for _, _, count in recent)
+
+    # -- connection lifetimes ------------------------------------------
+
+    def record_connection_close(self, process_name, dest_ip, dest_port, duration, timestamp=None,
+                                traffic_bytes=0):
+        """Record a closed connection's observed lifetime (and last traffic) for the process."""
+        shard = self._shard(process_name)
+        with shard.lock:
+            if traffic_bytes:
+                profile = shard.profiles.get(process_name)
+                if profile is None:
+                    profile = shard.profiles[process_name] = _new_profile()
+                profile['traffic_total'] += traffic_bytes
+
+            histogram = shard.duration_histograms.get(process_name)
+            if histogram is None:
+                histogram = shard.duration_histograms[process_name] = \
+                    array('I', bytes(4 * (len(DURATION_BUCKETS) + 1)))
+            histogram[bisect_left(DURATION_BUCKETS, duration)] += 1
+
+            if duration < SHORT_LIVED_SECS:
+                closes = shard.short_lived_closes.get(process_name)
+                if closes is None:
+                    closes = shard.short_lived_closes[process_name] = deque(maxlen=1000)
+                closes.append(timestamp or self.clock())
+
+    def get_duration_histogram(self, process_name):
+        """Get {bucket_upper_edge: count} of connection lifetimes (None = open-ended)."""
+        shard = self._shard(process_name)
+        with shard.lock:
+            histogram = shard.duration_histograms.get(process_name)
+            if histogram is None:
+                return {}
+            return dict(zip(DURATION_BUCKETS + (None,), histogram))
+
+    def get_short_lived_count(self, process_name, time_window=60, now=None):
+        """Count short-lived connections that closed in the time window."""
+        shard = self._shard(process_name)
+        with shard.lock:
+            closes = shard.short_lived_closes.get(process_name)
+            if not closes:
+                return 0
+            now = now if now is not None else self.clock()
+            return sum(1 for ts in closes if now - ts < time_window)
+
+    # -- behaviour baseline --------------------------------------------
+
+    def update_profile(self, process_name, traffic_bytes, intent_score, count=1):
+        """Update behavior profile for process (`count` coalesced connections)."""
+        shard = self._shard(process_name)
+        with shard.lock:
+            profile = shard.profiles.get(process_name)
+            if profile is None:
+                profile = shard.profiles[process_name] = _new_profile()
+            profile['traffic_total'] += traffic_bytes
+            profile['connection_count'] += count
+            profile['avg_intent'] = (profile['avg_intent'] * 0.7) + (intent_score * 0.3)
+
+    def get_baseline(self, process_name):
+        """Get behavior baseline for process."""
+        shard = self._shard(process_name)
+        with shard.lock:
+            profile = shard.profiles.get(process_name)
+            return dict(profile) if profile is not None else _new_profile()
+
+    # -- scoring -------------------------------------------------------
+
+    def calculate_suspicion(self, process_name, traffic_bytes, intent_score, baseline,
+                            dest_ip=None, dest_port=None, timestamp=None, dest_ip_int=None, count=1):
+        """
+        Calculate comprehensive suspicion/risk score (0-100) for network activity.
+
+        Scoring factors:
+        - Unknown process: +20
+        - Frequent connections: +25
+        - User idle but active: +20
+        - New destination: +15
+        - Unusual port: +10
+        - Beaconing pattern: +15  (repeated connections to same dest)
+        - Connection burst: +12   (many connections in < 10 s)
+        - Multi-destination: +10  (contacting many different IPs)
+        - Short-lived connections: +10 (repeated connections closing within seconds)
+
+        dest_ip_int is the core.ip_classifier integer form of dest_ip; pass it
+        when already computed so the address is only parsed once per event.
+        `count` is the number of connections a coalesced event stands for;
+        the rate windows count every one of them.
+        """
+        shard = self._shard(process_name)
+        with shard.lock:
+            return self._calculate(process_name, traffic_bytes, intent_score, baseline,
+                                   dest_ip, dest_port, timestamp, dest_ip_int, count)
+
+    def _calculate(self, process_name, traffic_bytes, intent_score, baseline,
+                   dest_ip, dest_port, timestamp, dest_ip_int, count=1):
+        score = 0.0
+        reasons = []
+        now = self._now(timestamp)
+
+        # 1. UNKNOWN PROCESS CHECK (+20)
+        is_whitelisted = process_name.lower() in TRUSTED_PROCESSES
+        if is_whitelisted:
+            score_reduction = get_process_score_reduction(process_name)
+            # Reduce base score for trusted processes
+            score -= score_reduction
+        else:
+            score += SUSPICION_SCORING['unknown_process']
+            reasons.append("Unknown process not in whitelist")
+
+        # 2. FREQUENT CONNECTIONS CHECK (+25)
+        if dest_port and timestamp:
+            self.track_connection(process_name, dest_ip or 'unknown', dest_port, timestamp, count)
+
+        recent = self._recent(process_name, 60, now)
+        recent_connections = sum(n for _, _, n in recent)
+        if recent_connections > 10:
+            score += SUSPICION_SCORING['frequent_connections']
+            reasons.append(f"Frequent connections: {recent_connections} in 60 seconds")
+        elif recent_connections > 5:
+            score += 15  # Increased partial score (was 10)
+            reasons.append(f"Multiple connections: {recent_connections} in 60 seconds")
+        elif recent_connections > 3:
+            score += 8   # New: even 3-5 connections is mildly suspicious
+            reasons.append(f"Elevated connection rate: {recent_connections} in 60 seconds")
+
+        # 3. USER IDLE BUT ACTIVE CHECK (+20)
+        if intent_score < 0.2:  # User is idle
+            score += SUSPICION_SCORING['user_idle_active']
+            reasons.append("User is idle but process is active")
+        elif intent_score < 0.5:  # User is somewhat active
+            score += 8
+            reasons.append("Low user activity while process sends data")
+        elif intent_score < 0.8:  # User is active but process is still suspicious
+            score += 3
+
+        # 4. NEW DESTINATION CHECK (+15) - trusted destinations are never "new"
+        if dest_ip and dest_port:
+            trusted_dest = is_trusted_destination(dest_ip_int if dest_ip_int is not None else dest_ip)
+            if not trusted_dest and self.is_new_destination(process_name, dest_ip, dest_port):
+                score += SUSPICION_SCORING['new_destination']
+                reasons.append(f"New destination: {dest_ip}:{dest_port}")
+
+        # 5. UNUSUAL PORT CHECK (+10)
+        if dest_port:
+            if not is_safe_port(dest_port):
+                score += SUSPICION_SCORING['unusual_port']
+                reasons.append(f"Unusual port: {dest_port}")
+
+        # 6. TRAFFIC VOLUME ANALYSIS
+        baseline_traffic = baseline.get('traffic_total', 500)
+        if traffic_bytes > baseline_traffic * 3:
+            score += 5
+            reasons.append(f"Abnormal traffic volume: {traffic_bytes} bytes")
+        elif traffic_bytes > baseline_traffic * 2:
+            score += 2
+
+        # 7. CONNECTION FREQUENCY BASELINE
+        baseline_conn_count = baseline.get('connection_count', 0)
+        if baseline_conn_count > 20:
+            score += 5
+            reasons.append(f"High connection frequency baseline: {baseline_conn_count}")
+
+        # ── 8. BEACONING PATTERN CHECK (+15) ────────────────────────────
+        #   Detects repetitive connections to the *same* destination,
+        #   which is a hallmark of C2 beacons and automated scrapers.
+        if dest_ip and dest_port:
+            same_dest = sum(n for ip, port, n in recent if ip == dest_ip and port == dest_port)
+            if same_dest > 8:
+                score += SUSPICION_SCORING.get('beaconing_pattern', 15)
+                reasons.append(f"Beaconing pattern: {same_dest} hits to {dest_ip}:{dest_port}")
+            elif same_dest > 4:
+                score += 8
+                reasons.append(f"Repeated destination: {same_dest} hits to {dest_ip}:{dest_port}")
+
+        # ── 9. CONNECTION BURST CHECK (+12) ─────────────────────────────
+        #   Fires when many connections happen in a very short window.
+        burst = sum(n for _, _, n in self._recent(process_name, 10, now))
+        if burst > 5:
+            score += SUSPICION_SCORING.get('connection_burst', 12)
+            reasons.append(f"Connection burst: {burst} connections in 10 seconds")
+        elif burst > 3:
+            score += 6
+            reasons.append(f"Rapid connection rate: {burst} in 10 seconds")
+
+        # ── 10. MULTI-DESTINATION CHECK (+10) ───────────────────────────
+        #   Flags processes that contact many *different* IPs quickly,
+        #   resembling port scanning or domain enumeration.
+        unique_dests = len({(ip, port) for ip, port, _ in recent})
+        if unique_dests > 6:
+            score += SUSPICION_SCORING.get('multi_destination', 10)
+            reasons.append(f"Multi-destination activity: {unique_dests} unique endpoints")
+        elif unique_dests > 3:
+            score += 5
+            reasons.append(f"Multiple destinations: {unique_dests} unique endpoints")
+
+        # ── 11. SHORT-LIVED CONNECTIONS CHECK (+10) ──────────────────────
+        #   Beacons typically open, exchange a few bytes and close again;
+        #   many short lifetimes from close events are a strong hint.
+        short_lived = self.get_short_lived_count(process_name, 60, now)
+        if short_lived > 5:
+            score += SUSPICION_SCORING.get('short_lived_connections', 10)
+            reasons.append(f"Short-lived connections: {short_lived} closed within {SHORT_LIVED_SECS:g}s")
+        elif short_lived > 2:
+            score += 5
+            reasons.append(f"Repeated short connections: {short_lived} in 60 seconds")
+
+        # Ensure score is within bounds (0-100)
+        score = max(0, min(100, score))
+
+        return score, reasons
+
+    # -- alerts --------------------------------------------------------
+
+    def should_rate_limit(self, process_name, rate_limit_secs=60, now=None):
+        """Check if alert should be rate-limited for this process."""
+        shard = self._shard(process_name)
+        with shard.lock:
+            last_alert = shard.last_alert_time.get(process_name, 0)
+            now = now if now is not None else self.clock()
+            return now - last_alert < rate_limit_secs
+
+    def record_alert(self, process_name, now=None):
+        """Record alert timestamp for a process."""
+        shard = self._shard(process_name)
+        with shard.lock:
+            now = now if now is not None else self.clock()
+            shard.last_alert_time[process_name] = now
+            history = shard.alert_history.get(process_name)
+            if history is None:
+                history = shard.alert_history[process_name] = deque(maxlen=ALERTS_PER_PROCESS)
+            history.append(now)
+
+    def get_alert_count_in_window(self, process_name, window_secs=3600, now=None):
+        """Get alert count for process in recent time window."""
+        shard = self._shard(process_name)
+        with shard.lock:
+            now = now if now is not None else self.clock()
+            return sum(1 for ts in shard.alert_history.get(process_name, ())
+                       if now - ts < window_secs)
+
+    def generate_alert(self, process_name, dest_ip, dest_port, suspicion_score,
+                       idle_time, reasons, intent_score, timestamp=None):
+        """
+        Generate alert for suspicious network activity with detailed reasoning.
+
+        Returns:
+            tuple: (should_alert: bool, alert_message: str, severity: str)
+        """
+        try:
+            # Determine severity level
+            if suspicion_score >= 76:
+                severity = "CRITICAL"
+            elif suspicion_score >= 51:
+                severity = "HIGH"
+            else:
+                severity = "MEDIUM"
+
+            # Only create alerts for HIGH and CRITICAL
+            if severity not in ['HIGH', 'CRITICAL']:
+                return False, "", severity
+
+            now = self._now(timestamp)
+            shard = self._shard(process_name)
+            with shard.lock:
+                # Rate limiting to prevent spam
+                if self.should_rate_limit(process_name, rate_limit_secs=60, now=now):
+                    return False, "", severity
+                # Record this alert
+                self.record_alert(process_name, now)
+
+            # Build detailed alert message
+            alert_parts = [
+                f"{severity}",
+                f"Process: {process_name}",
+                f"IP: {dest_ip}:{dest_port}",
+                f"Score: {suspicion_score:.1f}/100",
+                f"Idle: {idle_time:.0f}s"
+            ]
+
+            if reasons:
+                alert_parts.append(f"Reasons: {'; '.join(reasons)}")
+
+            return True, " | ".join(alert_parts), severity
+
+        except Exception as e:
+            print(f"[AlertMgr] Error generating alert: {e}")
+            return False, "", "UNKNOWN"
+
+    def get_alert_summary(self):
+        """Get summary of current alerts."""
+        total = processes = recent = 0
+        for shard in self.shards:
+            with shard.lock:
+                total += sum(len(v) for v in shard.alert_history.values())
+                processes += len(shard.alert_history)
+                recent += sum(1 for v in shard.alert_history.values() if len(v) > 0)
+        return {
+            'total_alerts': total,
+            'unique_processes': processes,
+            'recent_alerts': recent
+        }
+
+    # -- one event -----------------------------------------------------
+
+    def score(self, process_name, traffic_bytes, intent_score, idle_time,
+              dest_ip, dest_port, timestamp=None, dest_ip_int=None, count=1):
+        """
+        Profile update, scoring and alert decision for one event, atomic per process.
+
+        `count` > 1 scores a coalesced event standing for that many connections.
+
+        Returns:
+            tuple: (score, reasons, (should_alert, alert_message, alert_severity))
+        """
+        shard = self._shard(process_name)
+        with shard.lock:
+            self.update_profile(process_name, traffic_bytes, intent_score, count)
+            baseline = self.get_baseline(process_name)
+            score, reasons = self._calculate(process_name, traffic_bytes, intent_score, baseline,
+                                             dest_ip, dest_port, timestamp, dest_ip_int, count)
+            alert = self.generate_alert(process_name, dest_ip, dest_port, score,
+                                        idle_time, reasons, intent_score, timestamp)
+        return score, reasons, alert
+
+
+_default_engine = None
+_default_lock = threading.Lock()
+
+
+def get_default_engine():
+    """Get the engine behind the module-level scoring functions."""
+    global _default_engine
+    with _default_lock:
+        if _default_engine is None:
+            _default_engine = ScoringEngine.from_config(MONITORING_CONFIG)
+        return _default_engine
@@ -25,10 +25,6 @@ def init_db():
             conn = get_connection()
             cursor = conn.cursor()
             
-            # Check if new columns exist
-            cursor.execute("PRAGMA table_info(events)")
-            columns = [col[1] for col in cursor.fetchall()]
-            
             # Create table if it doesn't exist
             cursor.execute("""
             CREATE TABLE IF NOT EXISTS events (
@@ -43,10 +39,18 @@ def init_db():
                 risk_level TEXT,
                 reason TEXT,
                 severity TEXT,
-                protocol TEXT
+                protocol TEXT,
+                host TEXT,
+                count INTEGER DEFAULT 1,
+                first_seen TEXT,
+                last_seen TEXT
             )
             """)
             
+            # Check if new columns exist (after CREATE, so a fresh table has them all)
+            cursor.execute("PRAGMA table_info(events)")
+            columns = [col[1] for col in cursor.fetchall()]
+            
             # Add missing columns if they don't exist
             if 'reason' not in columns:
                 cursor.execute("ALTER TABLE events ADD COLUMN reason TEXT")
@@ -54,6 +58,14 @@ def init_db():
                 cursor.execute("ALTER TABLE events ADD COLUMN severity TEXT")
             if 'protocol' not in columns:
                 cursor.execute("ALTER TABLE events ADD COLUMN protocol TEXT DEFAULT 'TCP'")
+            if 'host' not in columns:
+                cursor.execute("ALTER TABLE events ADD COLUMN host TEXT")
+            if 'count' not in columns:
+                cursor.execute("ALTER TABLE events ADD COLUMN count INTEGER DEFAULT 1")
+            if 'first_seen' not in columns:
+                cursor.execute("ALTER TABLE events ADD COLUMN first_seen TEXT")
+            if 'last_seen' not in columns:
+                cursor.execute("ALTER TABLE events ADD COLUMN last_seen TEXT")
             
             conn.commit()
             conn.close()
@@ -62,35 +74,45 @@ def init_db():
             print(f"[DB] Init error: {e}")
             return False
 
+_INSERT_EVENT_SQL = """
+INSERT INTO events 
+(timestamp, pid, process_name, dest_ip, dest_port, intent_score, 
+ suspicion_score, risk_level, reason, severity, protocol, host,
+ count, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+def _event_row(event_dict):
+    """Convert an event dictionary to an events table row."""
+    # Handle reasons - if list, join with semicolon
+    reasons = event_dict.get("reasons", [])
+    reason_str = "; ".join(reasons) if isinstance(reasons, list) else str(reasons)
+    
+    return (
+        event_dict.get("timestamp"),
+        event_dict.get("pid"),
+        event_dict.get("process_name"),
+        event_dict.get("dest_ip"),
+        event_dict.get("dest_port"),
+        event_dict.get("intent_score"),
+        event_dict.get("suspicion_score"),
+        event_dict.get("risk_level"),
+        reason_str,
+        event_dict.get("severity"),
+        event_dict.get("protocol", "TCP"),
+        event_dict.get("host"),
+        event_dict.get("count", 1),
+        event_dict.get("first_seen"),
+        event_dict.get("last_seen")
+    )
+
 def insert_event(event_dict):
     """Insert event into database from dictionary."""
     with DB_LOCK:
         try:
             conn = get_connection()
             cursor = conn.cursor()
-            
-            # Handle reasons - if list, join with semicolon
-            reasons = event_dict.get("reasons", [])
-            reason_str = "; ".join(reasons) if isinstance(reasons, list) else str(reasons)
-            
-            cursor.execute("""
-            INSERT INTO events 
-            (timestamp, pid, process_name, dest_ip, dest_port, intent_score, 
-             suspicion_score, risk_level, reason, severity, protocol)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                event_dict.get("timestamp"),
-                event_dict.get("pid"),
-                event_dict.get("process_name"),
-                event_dict.get("dest_ip"),
-                event_dict.get("dest_port"),
-                event_dict.get("intent_score"),
-                event_dict.get("suspicion_score"),
-                event_dict.get("risk_level"),
-                reason_str,
-                event_dict.get("severity"),
-                event_dict.get("protocol", "TCP")
-            ))
+            cursor.execute(_INSERT_EVENT_SQL, _event_row(event_dict))
             
             conn.commit()
             conn.close()
@@ -99,6 +121,19 @@ def insert_event(event_dict):
             print(f"[DB] Insert error: {e}")
             return False
 
+def insert_events(event_dicts):
+    """Insert many events in a single transaction."""
+    with DB_LOCK:
+        try:
+            conn = get_connection()
+            with conn:
+                conn.executemany(_INSERT_EVENT_SQL, [_event_row(e) for e in event_dicts])
+            conn.close()
+            return True
+        except Exception as e:
+            print(f"[DB] Bulk insert error: {e}")
+            return False
+
 def fetch_recent_events(limit=50):
     """Fetch recent events from database."""
     with DB_LOCK:
@@ -191,13 +226,13 @@ def get_process_events(process_name, limit=50):
             return []
 
 def get_event_count():
-    """Get total event count."""
+    """Get total event count (a coalesced row counts its `count` connections)."""
     with DB_LOCK:
         try:
             conn = get_connection()
             cursor = conn.cursor()
             
-            cursor.execute("SELECT COUNT(*) FROM events")
+            cursor.execute("SELECT COALESCE(SUM(COALESCE(count, 1)), 0) FROM events")
             count = cursor.fetchone()[0]
             conn.close()
             
@@ -214,7 +249,7 @@ def get_risk_distribution():
             cursor = conn.cursor()
             
             cursor.execute("""
-            SELECT risk_level, COUNT(*) as count 
+            SELECT risk_level, SUM(COALESCE(count, 1)) as total 
             FROM events 
             GROUP BY risk_level
             """)
@@ -222,7 +257,7 @@ def get_risk_distribution():
             rows = cursor.fetchall()
             conn.close()
             
-            return {dict(row)['risk_level']: dict(row)['count'] for row in rows}
+            return {dict(row)['risk_level']: dict(row)['total'] for row in rows}
         except Exception as e:
             print(f"[DB] Distribution error: {e}")
             return {}
@@ -235,17 +270,17 @@ def get_top_processes(limit=10):
             cursor = conn.cursor()
             
             cursor.execute("""
-            SELECT process_name, COUNT(*) as count 
+            SELECT process_name, SUM(COALESCE(count, 1)) as total 
             FROM events 
             GROUP BY process_name 
-            ORDER BY count DESC 
+            ORDER BY total DESC 
             LIMIT ?
             """, (limit,))
             
             rows = cursor.fetchall()
             conn.close()
             
-            return [{'process': dict(row)['process_name'], 'count': dict(row)['count']} for row in rows]
+            return [{'process': dict(row)['process_name'], 'count': dict(row)['total']} for row in rows]
         except Exception as e:
             print(f"[DB] Top processes error: {e}")
             return []
@@ -277,7 +312,8 @@ def export_to_csv(filepath, filter_severity=None):
                 writer = csv.writer(f)
                 # Write header
                 writer.writerow(['Timestamp', 'Process', 'PID', 'Dest IP', 'Port', 
-                               'Suspicion Score', 'Risk Level', 'Severity', 'Reason'])
+                               'Suspicion Score', 'Risk Level', 'Severity', 'Reason',
+                               'Count', 'First Seen'])
                 
                 # Write rows
                 for row in rows:
@@ -291,7 +327,9 @@ def export_to_csv(filepath, filter_severity=None):
                         round(r['suspicion_score'], 2),
                         r['risk_level'],
                         r['severity'],
-                        r['reason']
+                        r['reason'],
+                        r.get('count') or 1,
+                        r.get('first_seen') or ''
                     ])
             
             return True
@@ -0,0 +1,223 @@
+// UBNAD eBPF connect tracer
+// Reports outbound TCP (IPv4/IPv6) and connected UDP sockets through a ring
+// buffer. Loopback, private, CGNAT, link-local and ULA destinations are
+// dropped in the kernel so user space only sees candidate events. Keep the
+// ranges in sync with LOCAL_RANGES in core/ip_classifier.py.
+//
+// Compiled by bcc at load time (see collector/ebpf_collector.py).
+// Requires Linux 5.8+ for BPF ring buffers.
+
+#include <uapi/linux/ptrace.h>
+#include <uapi/linux/in.h>
+#include <uapi/linux/in6.h>
+#include <net/sock.h>
+#include <bcc/proto.h>
+
+#define PROTO_TCP 6
+#define PROTO_UDP 17
+
+struct conn_event_t {
+    u64 ts_ns;
+    u32 pid;
+    u32 uid;
+    u16 family;
+    u16 protocol;
+    u16 sport;
+    u16 dport;
+    u8 saddr[16];
+    u8 daddr[16];
+    char comm[TASK_COMM_LEN];
+};
+
+BPF_RINGBUF_OUTPUT(events, 64);        // 64 pages per CPU-shared ring
+BPF_HASH(connecting, u64, struct sock *);  // tid -> socket in tcp_v*_connect
+
+// ---------------------------------------------------------------------------
+// Destination filters
+// ---------------------------------------------------------------------------
+
+static __always_inline u32 v4_host_order(u32 be_addr)
+{
+#if __BYTE_ORDER__ == __ORDER_LITTLE_ENDIAN__
+    return __builtin_bswap32(be_addr);
+#else
+    return be_addr;
+#endif
+}
+
+static __always_inline int is_local_v4(u32 be_addr)
+{
+    u32 a = v4_host_order(be_addr);
+    u8 first = a >> 24;
+
+    if (first == 0 || first == 127 || first == 10)
+        return 1;
+    if ((a & 0xFFF00000) == 0xAC100000)    // 172.16.0.0/12
+        return 1;
+    if ((a & 0xFFFF0000) == 0xC0A80000)    // 192.168.0.0/16
+        return 1;
+    if ((a & 0xFFC00000) == 0x64400000)    // 100.64.0.0/10
+        return 1;
+    if ((a & 0xFFFF0000) == 0xA9FE0000)    // 169.254.0.0/16
+        return 1;
+    return 0;
+}
+
+static __always_inline int is_local_v6(const u8 *addr)
+{
+    u32 words[4];
+    __builtin_memcpy(words, addr, sizeof(words));
+
+    if (words[0] == 0 && words[1] == 0) {
+        // ::ffff:a.b.c.d - apply the IPv4 rules
+        if (v4_host_order(words[2]) == 0x0000FFFF)
+            return is_local_v4(words[3]);
+        // :: and ::1
+        if (words[2] == 0 && (v4_host_order(words[3]) & 0xFFFFFFFE) == 0)
+            return 1;
+    }
+    if (addr[0] == 0xFE && (addr[1] & 0xC0) == 0x80)    // fe80::/10
+        return 1;
+    if ((addr[0] & 0xFE) == 0xFC)                       // fc00::/7
+        return 1;
+    return 0;
+}
+
+static __always_inline void fill_task(struct conn_event_t *ev)
+{
+    ev->ts_ns = bpf_ktime_get_ns();
+    ev->pid = bpf_get_current_pid_tgid() >> 32;
+    ev->uid = bpf_get_current_uid_gid();
+    bpf_get_current_comm(&ev->comm, sizeof(ev->comm));
+}
+
+// ---------------------------------------------------------------------------
+// TCP: remember the socket on entry, report it once connect() succeeded
+// ---------------------------------------------------------------------------
+
+static __always_inline int connect_entry(struct sock *sk)
+{
+    u64 tid = bpf_get_current_pid_tgid();
+    connecting.update(&tid, &sk);
+    return 0;
+}
+
+static __always_inline int connect_return(struct pt_regs *ctx, u16 family)
+{
+    u64 tid = bpf_get_current_pid_tgid();
+    struct sock **skpp = connecting.lookup(&tid);
+    if (skpp == 0)
+        return 0;
+    struct sock *sk = *skpp;
+    connecting.delete(&tid);
+
+    if (PT_REGS_RC(ctx) != 0)
+        return 0;
+
+    u8 daddr[16] = {};
+    if (family == AF_INET) {
+        u32 d4 = 0;
+        bpf_probe_read_kernel(&d4, sizeof(d4), &sk->__sk_common.skc_daddr);
+        if (is_local_v4(d4))
+            return 0;
+        __builtin_memcpy(daddr, &d4, sizeof(d4));
+    } else {
+        bpf_probe_read_kernel(daddr, sizeof(daddr),
+                              sk->__sk_common.skc_v6_daddr.in6_u.u6_addr8);
+        if (is_local_v6(daddr))
+            return 0;
+    }
+
+    struct conn_event_t *ev = events.ringbuf_reserve(sizeof(struct conn_event_t));
+    if (!ev)
+        return 0;
+
+    fill_task(ev);
+    ev->family = family;
+    ev->protocol = PROTO_TCP;
+    __builtin_memcpy(ev->daddr, daddr, sizeof(daddr));
+    __builtin_memset(ev->saddr, 0, sizeof(ev->saddr));
+    if (family == AF_INET)
+        bpf_probe_read_kernel(ev->saddr, 4, &sk->__sk_common.skc_rcv_saddr);
+    else
+        bpf_probe_read_kernel(ev->saddr, 16, sk->__sk_common.skc_v6_rcv_saddr.in6_u.u6_addr8);
+
+    u16 dport = 0;
+    bpf_probe_read_kernel(&dport, sizeof(dport), &sk->__sk_common.skc_dport);
+    ev->dport = ntohs(dport);
+    bpf_probe_read_kernel(&ev->sport, sizeof(ev->sport), &sk->__sk_common.skc_num);
+
+    events.ringbuf_submit(ev, 0);
+    return 0;
+}
+
+int trace_tcp_v4_connect(struct pt_regs *ctx, struct sock *sk)
+{
+    return connect_entry(sk);
+}
+
+int trace_tcp_v4_connect_return(struct pt_regs *ctx)
+{
+    return connect_return(ctx, AF_INET);
+}
+
+int trace_tcp_v6_connect(struct pt_regs *ctx, struct sock *sk)
+{
+    return connect_entry(sk);
+}
+
+int trace_tcp_v6_connect_return(struct pt_regs *ctx)
+{
+    return connect_return(ctx, AF_INET6);
+}
+
+// ---------------------------------------------------------------------------
+// UDP: connect() on a datagram socket carries the peer in its arguments
+// ---------------------------------------------------------------------------
+
+int trace_udp_v4_connect(struct pt_regs *ctx, struct sock *sk, struct sockaddr *uaddr)
+{
+    struct sockaddr_in sin = {};
+    bpf_probe_read_kernel(&sin, sizeof(sin), uaddr);
+    if (sin.sin_family != AF_INET || is_local_v4(sin.sin_addr.s_addr))
+        return 0;
+
+    struct conn_event_t *ev = events.ringbuf_reserve(sizeof(struct conn_event_t));
+    if (!ev)
+        return 0;
+
+    fill_task(ev);
+    ev->family = AF_INET;
+    ev->protocol = PROTO_UDP;
+    __builtin_memset(ev->saddr, 0, sizeof(ev->saddr));
+    __builtin_memset(ev->daddr, 0, sizeof(ev->daddr));
+    __builtin_memcpy(ev->daddr, &sin.sin_addr.s_addr, 4);
+    bpf_probe_read_kernel(&ev->sport, sizeof(ev->sport), &sk->__sk_common.skc_num);
+    ev->dport = ntohs(sin.sin_port);
+
+    events.ringbuf_submit(ev, 0);
+    return 0;
+}
+
+int trace_udp_v6_connect(struct pt_regs *ctx, struct sock *sk, struct sockaddr *uaddr)
+{
+    struct sockaddr_in6 sin6 = {};
+    bpf_probe_read_kernel(&sin6, sizeof(sin6), uaddr);
+    if (sin6.sin6_family != AF_INET6 || is_local_v6(sin6.sin6_addr.in6_u.u6_addr8))
+        return 0;
+
+    struct conn_event_t *ev = events.ringbuf_reserve(sizeof(struct conn_event_t));
+    if (!ev)
+        return 0;
+
+    fill_task(ev);
+    ev->family = AF_INET6;
+    ev->protocol = PROTO_UDP;
+    __builtin_memset(ev->saddr, 0, sizeof(ev->saddr));
+    __builtin_memcpy(ev->daddr, sin6.sin6_addr.in6_u.u6_addr8, 16);
+    bpf_probe_read_kernel(&ev->sport, sizeof(ev->sport), &sk->__sk_common.skc_num);
+    ev->dport = ntohs(sin6.sin6_port);
+
+    events.ringbuf_submit(ev, 0);
+    return 0;
+}
@@ -1,23 +1,28 @@
-from bcc import BPF
-import socket
-import struct
+"""
+Stand-alone eBPF connect monitor
+Prints the events the eBPF collector backend produces (run as root)
+"""
 
-bpf = BPF(src_file="ebpf/net_monitor.c")
-bpf.attach_kprobe(event="tcp_v4_connect", fn_name="trace_connect")
+import os
+import sys
+from queue import Queue, Empty
 
-def ip_to_str(ip):
-    return socket.inet_ntoa(struct.pack("I", ip))
+# Add parent to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-def print_event(cpu, data, size):
-    event = bpf["events"].event(data)
-    print({
-        "pid": event.pid,
-        "process": event.comm.decode(),
-        "dest_ip": ip_to_str(event.daddr),
-        "port": event.dport
-    })
+from collector.ebpf_collector import EbpfCollector
 
-bpf["events"].open_perf_buffer(print_event)
+events = Queue()
+collector = EbpfCollector(events)
+if not collector.start():
+    sys.exit(1)
 
-while True:
-    bpf.perf_buffer_poll()
+try:
+    while True:
+        try:
+            for event in events.get(timeout=1.0):
+                print(event)
+        except Empty:
+            continue
+except KeyboardInterrupt:
+    collector.stop()
@@ -4,22 +4,27 @@ Main event orchestration and analysis loop
 Enhanced with advanced suspicion scoring, reasoning, and alerts
 """
 
+import argparse
+import multiprocessing
 import signal
 import sys
-import threading
 import time
-from queue import Queue, Empty
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty
 import logging
-from datetime import datetime
 
-from collector.windows_net_collector import WindowsNetCollector
+from collector import BACKENDS, create_collector, fallback_backend
+from collector.agent import AgentForwarder
+from collector.event_queue import POLICIES, EventQueue
+from core import event_analyzer
+from core.event_analyzer import engine, record_existing_connections, score_event
 from core.intent_monitor import get_intent_score, get_idle_time
-from core.process_mapper import get_process_state
-from core.behavior_model import update_profile, get_baseline
-from core.suspicion_engine import calculate_suspicion, determine_risk_level
-from core.alert_manager import generate_alert
-from database.activity_store import init_db, insert_event
-from config import should_alert, is_trusted_process, is_safe_port
+from core.process_table import ProcessEnricher, get_process_table
+from core.scoring_engine import shard_of
+from database import activity_store
+from database.activity_store import init_db, insert_event, insert_events
+from core.event_ring import EventRing
+from config import should_alert, is_trusted_process, is_safe_port, MONITORING_CONFIG
 
 # Setup logging
 logging.basicConfig(
@@ -29,158 +34,435 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Global state
-event_queue = Queue(maxsize=1000)
+event_queue = EventQueue.from_config(MONITORING_CONFIG)
 running = True
 collector = None
-total_events_processed = 0
-total_alerts_generated = 0
+enricher = None
+analyzer_workers = 1
+analyzer_pool = None  # ThreadPoolExecutor when analyzer_workers > 1
+
+def log_totals():
+    """Log the run totals kept by core.event_analyzer."""
+    logger.info(f"Total events processed: {event_analyzer.total_events_processed}")
+    logger.info(f"Total alerts generated: {event_analyzer.total_alerts_generated}")
 
 def signal_handler(signum, frame):
     """Handle graceful shutdown on Ctrl+C."""
     global running
     logger.info("Shutdown signal received, stopping...")
-    logger.info(f"Total events processed: {total_events_processed}")
-    logger.info(f"Total alerts generated: {total_alerts_generated}")
     running = False
     
     if collector:
         collector.stop()
+    if enricher:
+        enricher.stop()
     
     sys.exit(0)
 
 def process_event(event):
     """Process a single network event through comprehensive analysis pipeline."""
-    global total_events_processed, total_alerts_generated
+    db_event = score_event(event)
+    if db_event is not None:
+        insert_event(db_event)
+
+def _score_events(events):
+    """Score events in order; returns their database rows."""
+    rows = []
+    for event in events:
+        db_event = score_event(event)
+        if db_event is not None:
+            rows.append(db_event)
+    return rows
+
+def score_batch(events):
+    """Score a micro-batch; returns the database rows to store."""
+    # Startup snapshots ('existing') seed the engine before anything is scored
+    existing = [e for e in events if e.get("event_type") == "existing"]
+    if existing:
+        rows = record_existing_connections(existing)
+        events = [e for e in events if e.get("event_type") != "existing"]
+    else:
+        rows = []
+    if analyzer_pool is None:
+        rows.extend(_score_events(events))
+    else:
+        # One partition per worker; a process always lands in the same
+        # partition, so its events are scored in arrival order
+        partitions = [[] for _ in range(analyzer_workers)]
+        for event in events:
+            partitions[shard_of(event["process"], analyzer_workers)].append(event)
+        for partition_rows in analyzer_pool.map(_score_events, partitions):
+            rows.extend(partition_rows)
+    return rows
+
+def process_batch(events):
+    """
+    Score a micro-batch and persist it in one transaction.
     
-    try:
-        total_events_processed += 1
-        
-        timestamp_str = event["timestamp"]  # Already formatted as string from collector
-        pid = event["pid"]
-        process_name = event["process"]
-        dest_ip = event["dest_ip"]
-        dest_port = event["dest_port"]
-        
-        # Get process metadata
-        proc = get_process_state(pid)
-        if not proc:
-            logger.debug(f"Could not resolve process for PID {pid}")
-        
-        # Get user activity metrics
-        intent = get_intent_score()
-        idle = get_idle_time()
-        
-        # Traffic estimate (placeholder for now)
-        traffic = 500
-        
-        # Update behavior baseline
-        update_profile(process_name, traffic, intent)
-        baseline = get_baseline(process_name)
-        
-        # Convert timestamp string to float for suspicion calculation
+    Returns:
+        tuple: (score_ms, store_ms) for the batch
+    """
+    started = time.perf_counter()
+    rows = score_batch(events)
+    scored = time.perf_counter()
+    
+    if rows:
+        insert_events(rows)
+    return (scored - started) * 1000, (time.perf_counter() - scored) * 1000
+
+def next_micro_batch(max_events, linger_secs):
+    """
+    Take queued collector batches until `max_events` events or `linger_secs` elapse.
+    
+    Waits up to one second for the first batch (raises Empty). Collector
+    batches are never split, so a micro-batch can exceed max_events.
+    """
+    events = list(event_queue.get(timeout=1.0))
+    deadline = time.monotonic() + linger_secs
+    while len(events) < max_events:
         try:
-            from datetime import datetime
-            ts_float = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S").timestamp()
-        except:
-            ts_float = time.time()
-        
-        # Calculate comprehensive suspicion score (0-100 scale)
-        score, reasons = calculate_suspicion(
-            process_name, 
-            traffic, 
-            intent, 
-            baseline,
-            dest_ip=dest_ip,
-            dest_port=dest_port,
-            timestamp=ts_float
-        )
-        
-        # Determine risk level using enhanced scoring
-        risk_level = determine_risk_level(score)
-        
-        # Determine severity for display
-        if score >= 76:
-            severity = "CRITICAL"
-        elif score >= 51:
-            severity = "HIGH"
-        elif score >= 26:
-            severity = "MEDIUM"
-        else:
-            severity = "SAFE"
-        
-        # Generate alert if needed
-        should_generate_alert, alert_msg, alert_severity = generate_alert(
-            process_name,
-            dest_ip,
-            dest_port,
-            score,
-            idle,
-            reasons,
-            intent
-        )
-        
-        if should_generate_alert:
-            logger.warning(f"🚨 ALERT: {alert_msg}")
-            total_alerts_generated += 1
-        
-        # Create event dictionary for database - BACKWARD COMPATIBLE
-        db_event = {
-            "timestamp": timestamp_str,
-            "pid": pid,
-            "process_name": process_name,
-            "dest_ip": dest_ip,
-            "dest_port": dest_port,
-            "intent_score": intent,
-            "suspicion_score": score,
-            "risk_level": risk_level,
-            "severity": severity,
-            "reasons": reasons,
-            "protocol": "TCP"
-        }
-        
-        # Store to database
-        insert_event(db_event)
-        
-        # Log summary for high-risk events
-        if score > 50:
-            logger.info(f"⚠️  {risk_level}: {process_name} ({pid}) -> {dest_ip}:{dest_port} (Score: {score:.1f})")
-            if reasons:
-                logger.info(f"   Reasons: {', '.join(reasons)}")
-        
-    except Exception as e:
-        logger.error(f"Error processing event: {e}", exc_info=True)
+            events.extend(event_queue.get_nowait())
+            continue
+        except Empty:
+            pass
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            events.extend(event_queue.get(timeout=remaining))
+        except Empty:
+            break
+    return events
+
+def next_coalesced_batch(max_events, linger_secs):
+    """
+    next_micro_batch() passed through the coalescer.
+    
+    Returns [] instead of raising Empty, and also when every queued event
+    was a repeat held for its aggregate; aggregates whose window closed
+    are returned even if nothing new was queued.
+    """
+    try:
+        events = next_micro_batch(max_events, linger_secs)
+    except Empty:
+        events = []
+    return event_analyzer.coalescer.push(events)
 
 def analyzer_loop():
-    """Main analyzer loop - consume events from queue."""
-    logger.info("Analyzer loop started - waiting for network events")
+    """Main analyzer loop - score micro-batches of queued events, one DB transaction each."""
+    max_events = MONITORING_CONFIG.get('analyzer_batch_max', 500)
+    linger_secs = MONITORING_CONFIG.get('analyzer_batch_linger_ms', 20) / 1000.0
+    logger.info(f"Analyzer loop started - waiting for network events "
+                f"(batches of up to {max_events} events, {linger_secs * 1000:.0f}ms linger)")
     event_count = 0
     last_status = time.time()
     
-    while running:
-        try:
-            event = event_queue.get(timeout=1.0)
-            process_event(event)
-            event_count += 1
+    # Micro-batch timing since the last status line
+    batches = batch_events = 0
+    score_ms = store_ms = max_batch_ms = 0.0
+    
+    try:
+        while running:
+            try:
+                events = next_coalesced_batch(max_events, linger_secs)
+                if events:
+                    batch_score_ms, batch_store_ms = process_batch(events)
+                    
+                    batches += 1
+                    batch_events += len(events)
+                    score_ms += batch_score_ms
+                    store_ms += batch_store_ms
+                    max_batch_ms = max(max_batch_ms, batch_score_ms + batch_store_ms)
+                    
+                    # Periodic status
+                    previous = event_count
+                    event_count += len(events)
+                    if event_count // 50 > previous // 50:
+                        logger.info(f"Processed {event_count} events")
+                
+            except Exception as e:
+                logger.error(f"Analyzer error: {e}")
             
-            # Periodic status
-            if event_count % 50 == 0:
-                logger.info(f"Processed {event_count} events")
+            # Periodic status message
+            now = time.time()
+            if now - last_status >= 15:
+                coalesced = event_analyzer.coalescer.stats()
+                if batches:
+                    logger.info(f"Status: {event_count} events processed, {event_queue.summary()}, "
+                                f"coalesced {coalesced['coalesce_ratio']}:1, "
+                                f"{batches} micro-batches (avg {batch_events / batches:.1f} events, "
+                                f"score {score_ms / batches:.1f}ms, store {store_ms / batches:.1f}ms, "
+                                f"max {max_batch_ms:.1f}ms)")
+                else:
+                    logger.debug(f"Status: {event_count} events processed, {event_queue.summary()}")
+                batches = batch_events = 0
+                score_ms = store_ms = max_batch_ms = 0.0
+                last_status = now
+    finally:
+        # Repeats still held by the coalescer are part of the true counts
+        held = event_analyzer.coalescer.flush()
+        if held:
+            process_batch(held)
+            event_count += len(held)
+        logger.info(f"Analyzer stopped. Total events processed: {event_count}")
+
+def _analyzer_process(ring_name, ring_lock, results, totals, event_time):
+    """
+    Analyzer process: score one partition's events from its ring and send rows to the writer.
+    
+    Its run totals go back to the parent on `totals` when the ring is closed.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the parent handles Ctrl+C
+    engine.event_time = event_time
+    max_events = MONITORING_CONFIG.get('analyzer_batch_max', 500)
+    ring = EventRing.attach(ring_name, ring_lock)
+    delay = 0.0001
+    try:
+        while True:
+            # Closed is read first: everything put before close() is then visible
+            closed = ring.closed
+            events = ring.get(max_events)
+            if events:
+                rows = score_batch(events)
+                if rows:
+                    results.put(rows)
+                delay = 0.0001
+            elif closed:
+                break
+            else:
+                time.sleep(delay)
+                delay = min(delay * 2, 0.01)
+    finally:
+        ring.release()
+        totals.put((event_analyzer.total_events_processed, event_analyzer.total_alerts_generated))
+        results.put(None)  # this analyzer is done
+
+def _writer_process(results, analyzers, db_path):
+    """Writer process: store the analyzers' rows, merging what is queued into one transaction."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    activity_store.DB_PATH = db_path
+    while analyzers:
+        rows = results.get()
+        if rows is None:
+            analyzers -= 1
+            continue
+        while len(rows) < 5000:
+            try:
+                more = results.get_nowait()
+            except Empty:
+                break
+            if more is None:
+                analyzers -= 1
+            else:
+                rows.extend(more)
+        insert_events(rows)
+
+def multiprocess_analyzer_loop(processes):
+    """
+    Analyzer loop that scores in `processes` worker processes.
+    
+    Micro-batches are split by process-name hash into one shared-memory
+    ring per analyzer process, so every process' scoring state lives in
+    exactly one analyzer and its events stay in order. Analyzers send
+    their rows to a single writer process that owns the SQLite writes,
+    and their run totals back to this process when they stop.
+    """
+    max_events = MONITORING_CONFIG.get('analyzer_batch_max', 500)
+    linger_secs = MONITORING_CONFIG.get('analyzer_batch_linger_ms', 20) / 1000.0
+    slots = MONITORING_CONFIG.get('analyzer_ring_slots', 16384)
+    
+    # spawn, not fork: the collector thread may hold locks at fork time
+    context = multiprocessing.get_context("spawn")
+    rings = [EventRing.create(slots, context) for _ in range(processes)]
+    results = context.Queue(maxsize=processes * 64)
+    totals = context.Queue()
+    analyzers = [context.Process(target=_analyzer_process,
+                                 args=(ring.name, ring.lock, results, totals, engine.event_time),
+                                 name=f"ubnad-analyzer-{n}")
+                 for n, ring in enumerate(rings)]
+    writer = context.Process(target=_writer_process, args=(results, processes, activity_store.DB_PATH),
+                             name="ubnad-writer")
+    for proc in analyzers + [writer]:
+        proc.start()
+    logger.info(f"Analyzer started - {processes} analyzer processes, 1 writer process, "
+                f"{slots} event slots per ring")
+    
+    def dispatch(events, keep_waiting=lambda: running):
+        # Analyzer processes cannot see user input - measure it once per batch here
+        intent, idle = get_intent_score(), get_idle_time()
+        partitions = [[] for _ in rings]
+        for event in events:
+            partitions[shard_of(event["process"], processes)].append(event)
+        for ring, partition in zip(rings, partitions):
+            if partition:
+                ring.put_all(partition, intent, idle, keep_waiting=keep_waiting)
+    
+    event_count = 0
+    last_status = time.time()
+    try:
+        while running:
+            events = next_coalesced_batch(max_events, linger_secs)
+            if events:
+                dispatch(events)
+                event_count += len(events)
             
-        except Empty:
             # Periodic status message
             now = time.time()
             if now - last_status >= 15:
-                queue_size = event_queue.qsize()
-                logger.debug(f"Status: {event_count} events processed, queue size: {queue_size}")
+                logger.info(f"Status: {event_count} events dispatched, {event_queue.summary()}, "
+                            f"ring backlog: {[len(ring) for ring in rings]}")
                 last_status = now
-        except Exception as e:
-            logger.error(f"Analyzer error: {e}")
+    finally:
+        held = event_analyzer.coalescer.flush()
+        if held:
+            dispatch(held, keep_waiting=lambda: all(proc.is_alive() for proc in analyzers))
+            event_count += len(held)
+        for ring in rings:
+            ring.close()
+        for _ in analyzers:
+            try:
+                event_analyzer.add_totals(*totals.get(timeout=10))
+            except Empty:
+                logger.warning("An analyzer process did not report its totals")
+                break
+        for proc in analyzers + [writer]:
+            proc.join(timeout=10)
+        for ring in rings:
+            ring.release()
+        logger.info(f"Analyzer stopped. Total events dispatched: {event_count}")
+
+def parse_args():
+    """Parse command-line options (defaults come from MONITORING_CONFIG)."""
+    parser = argparse.ArgumentParser(description="UBNAD network activity detector")
+    parser.add_argument("--collector", choices=BACKENDS,
+                        default=MONITORING_CONFIG.get('collector_backend', 'auto'),
+                        help="Collector backend (default: from config)")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="Replay events from a CSV export, exports dir or SQLite DB")
+    parser.add_argument("--pcap", action="append", metavar="PATH",
+                        help="Analyze connections from a pcap/pcapng capture (repeatable)")
+    parser.add_argument("--attribution", metavar="CSV",
+                        help="Process attribution side file for --pcap")
+    parser.add_argument("--local-net", action="append", metavar="CIDR",
+                        help="Address or network of the capture host for --pcap; "
+                             "connections to it are inbound and skipped (repeatable)")
+    parser.add_argument("--speed", type=float, default=MONITORING_CONFIG.get('replay_speed', 0.0),
+                        help="Replay/pcap speed-up factor, 0 = as fast as possible")
+    parser.add_argument("--agent", metavar="HOST:PORT",
+                        help="Agent mode: run only the collector and stream events to an aggregator")
+    parser.add_argument("--aggregate", nargs="?", metavar="[HOST:]PORT",
+                        const=MONITORING_CONFIG.get('aggregator_bind', '0.0.0.0:9555'),
+                        help="Aggregator mode: analyze events streamed by agents")
+    parser.add_argument("--runtime", choices=("threads", "asyncio"),
+                        default=MONITORING_CONFIG.get('runtime', 'threads'),
+                        help="Analyzer runtime: polling thread or asyncio stage pipeline")
+    parser.add_argument("--analyzer-processes", type=int, metavar="N",
+                        default=MONITORING_CONFIG.get('analyzer_processes', 0),
+                        help="Score in N analyzer processes fed by shared-memory rings (0 = in-process)")
+    parser.add_argument("--queue-policy", choices=POLICIES,
+                        default=MONITORING_CONFIG.get('event_queue_policy', 'block'),
+                        help="What the event queue sheds when the analyzer falls behind")
+    parser.add_argument("--cgroup", action="append", metavar="PATH",
+                        help="Only monitor this cgroup (repeatable, implies --collector scoped)")
+    parser.add_argument("--netns", action="append", metavar="PATH",
+                        help="Only monitor this network namespace (repeatable, implies --collector scoped)")
+    args = parser.parse_args()
+    if args.analyzer_processes > 0 and args.runtime == 'asyncio':
+        parser.error("--analyzer-processes only applies to --runtime threads")
+    return args
+
+def start_collector(backend, config):
+    """Create and start a collector, falling back to simpler backends on failure."""
+    while backend:
+        candidate = create_collector(event_queue, backend, config)
+        if candidate.start():
+            return candidate
+        fallback = fallback_backend(candidate.name)
+        if fallback:
+            logger.warning(f"{candidate.name} collector unavailable - falling back to {fallback}")
+        backend = fallback
+    return None
+
+def run_agent(args, config):
+    """Agent mode: collect locally and forward every batch to the aggregator."""
+    global collector
+    
+    logger.info(f"UBNAD agent - forwarding to {args.agent}")
+    forwarder = AgentForwarder(event_queue, args.agent, config.get('agent_hostname'))
     
-    logger.info(f"Analyzer stopped. Total events processed: {event_count}")
+    def stop_agent(signum, frame):
+        logger.info("Shutdown signal received, stopping agent...")
+        forwarder.stop()
+        if collector:
+            collector.stop()
+    
+    signal.signal(signal.SIGINT, stop_agent)
+    signal.signal(signal.SIGTERM, stop_agent)
+    
+    collector = start_collector(args.collector, config)
+    if collector is None:
+        logger.error("Failed to start collector")
+        sys.exit(1)
+    logger.info(f"{collector.name} network collector started")
+    
+    forwarder.run()
+    logger.info(f"Agent stopped: {forwarder.get_metrics()}")
+
+def run_async(per_host, enrich):
+    """Run the asyncio pipeline runtime until a shutdown signal, then drain it."""
+    import asyncio
+    from async_runtime import AsyncRuntime
+    
+    def stop_runtime(signum, frame):
+        global running
+        logger.info("Shutdown signal received, draining pipelines...")
+        running = False
+    
+    signal.signal(signal.SIGINT, stop_runtime)
+    signal.signal(signal.SIGTERM, stop_runtime)
+    
+    runtime = AsyncRuntime(event_queue, per_host=per_host, enrich=enrich, is_running=lambda: running,
+                           coalescer=event_analyzer.coalescer)
+    logger.info(f"asyncio runtime started ({'one pipeline per host' if per_host else 'one pipeline'})")
+    asyncio.run(runtime.run())
+    
+    if collector:
+        collector.stop()
+    if enricher:
+        enricher.stop()
+    log_totals()
 
 def main():
     """Main entry point."""
-    global collector, running
+    global collector, enricher, analyzer_pool, analyzer_workers, running
+    
+    args = parse_args()
+    config = dict(MONITORING_CONFIG)
+    if args.replay:
+        args.collector = 'replay'
+        config['replay_source'] = args.replay
+    if args.pcap:
+        args.collector = 'pcap'
+        config['pcap_source'] = args.pcap
+        config['pcap_attribution'] = args.attribution
+        if args.local_net:
+            config['pcap_local_nets'] = args.local_net
+    config['replay_speed'] = args.speed
+    if args.cgroup or args.netns:
+        args.collector = 'scoped'
+        config['scope_cgroups'] = args.cgroup or []
+        config['scope_netns'] = args.netns or []
+    if args.aggregate:
+        args.collector = 'aggregator'
+        config['aggregator_bind'] = args.aggregate
+    event_queue.policy = config['event_queue_policy'] = args.queue_policy
+    # Replayed events arrive faster than they happened - score them on their own clock
+    if args.collector in ('replay', 'pcap'):
+        engine.event_time = event_analyzer.coalescer.event_time = True
+    
+    if args.agent:
+        run_agent(args, config)
+        return
     
     logger.info("=" * 60)
     logger.info("UBNAD - Unauthorized Background Network Activity Detector")
@@ -198,18 +480,40 @@ def main():
     signal.signal(signal.SIGTERM, signal_handler)
     
     # Start network collector
-    collector = WindowsNetCollector(event_queue)
-    if collector.start():
-        logger.info("Windows network collector started")
-    else:
+    collector = start_collector(args.collector, config)
+    if collector is None:
         logger.error("Failed to start collector")
         sys.exit(1)
+    logger.info(f"{collector.name} network collector started")
+    
+    # Process details are sampled in the background, off the analyzer's path
+    # (only for local backends - replayed and remote PIDs are not ours)
+    local_pids = collector.name not in ('replay', 'pcap', 'aggregator')
+    if local_pids:
+        enricher = ProcessEnricher(get_process_table())
+        enricher.start()
+    
+    if args.runtime == 'asyncio':
+        run_async(per_host=collector.name == 'aggregator', enrich=local_pids)
+        return
+    
+    # Analyzer workers share the sharded scoring engine
+    analyzer_workers = config.get('analyzer_workers', 1)
+    if analyzer_workers > 1:
+        analyzer_pool = ThreadPoolExecutor(max_workers=analyzer_workers, thread_name_prefix="analyzer")
+        logger.info(f"Scoring with {analyzer_workers} analyzer workers")
     
     # Run analyzer
     try:
-        analyzer_loop()
+        if args.analyzer_processes > 0:
+            multiprocess_analyzer_loop(args.analyzer_processes)
+        else:
+            analyzer_loop()
     except KeyboardInterrupt:
         signal_handler(signal.SIGINT, None)
+    finally:
+        # After the analyzer has flushed held events and collected process totals
+        log_totals()
 
 if __name__ == "__main__":
     main()
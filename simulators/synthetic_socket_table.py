@@ -0,0 +1,167 @@
+"""
+UBNAD Synthetic Socket Table
+============================
+Deterministic stand-in for psutil.net_connections(), process_iter() and
+Process() so the collectors can be run against socket tables of any size
+(100 to 500k sockets) with a chosen churn rate and process mix - no real
+sockets, no privileges, reproducible on a laptop.
+
+Usage:
+    from simulators.synthetic_socket_table import SyntheticSocketTable
+    table = SyntheticSocketTable(sockets=100000, churn=0.02, seed=1)
+    collector = WindowsNetCollector(queue, provider=table)
+
+Every net_connections() call is one tick: a `churn` fraction of the
+connections close and as many new ones open. `flash` connections per tick
+open and close between two calls, so they are counted by tcp_counters()
+(the ActiveOpens equivalent) but never appear in a table - exactly what a
+polling collector misses.
+"""
+
+import random
+from collections import namedtuple
+from contextlib import nullcontext
+
+import psutil
+
+from core.ip_classifier import is_local_address
+
+addr = namedtuple("addr", ["ip", "port"])
+sconn = namedtuple("sconn", ["fd", "family", "type", "laddr", "raddr", "status", "pid"])
+pio = namedtuple("pio", ["read_count", "write_count", "read_bytes", "write_bytes",
+                         "read_chars", "write_chars"])
+
+PROCESS_NAMES = (
+    "chrome.exe", "svchost.exe", "msedge.exe", "Teams.exe", "OneDrive.exe",
+    "python.exe", "node.exe", "Code.exe", "slack.exe", "outlook.exe",
+    "java.exe", "postgres", "nginx", "curl", "updater.exe",
+)
+COMMON_PORTS = (443, 443, 443, 443, 80, 80, 53, 8080, 8443, 22, 993, 5222)
+# (status, share) of table rows; only ESTABLISHED/SYN_SENT rows are reportable
+STATUS_MIX = (("ESTABLISHED", 0.80), ("TIME_WAIT", 0.08), ("LISTEN", 0.05),
+              ("CLOSE_WAIT", 0.04), ("SYN_SENT", 0.03))
+
+
+class _SyntheticProcess:
+    """The subset of psutil.Process the collectors use."""
+
+    def __init__(self, table, pid):
+        self._table = table
+        self.pid = pid
+
+    def name(self):
+        return self._table.process_names[self.pid]
+
+    def create_time(self):
+        return 1_700_000_000.0 + self.pid
+
+    def oneshot(self):
+        return nullcontext()
+
+    def as_dict(self, attrs, ad_value=None):
+        values = {
+            "pid": self.pid, "name": self.name(), "exe": None, "status": "running",
+            "create_time": self.create_time(), "memory_percent": 0.1, "cpu_percent": 0.0,
+        }
+        return {attr: values.get(attr, ad_value) for attr in attrs}
+
+    def io_counters(self):
+        # Grows with every tick and with the process' share of connections
+        chars = self._table.ticks * 4096 * (self.pid % 7 + 1)
+        return pio(0, 0, chars, chars // 4, chars, chars // 4)
+
+
+class SyntheticSocketTable:
+    """
+    Generated socket table with psutil's net_connections()/process_iter()/Process() API.
+
+    Args:
+        sockets: number of rows in the table
+        churn: fraction of rows replaced per tick
+        processes: number of distinct PIDs (Zipf-weighted: a few busy ones)
+        local_fraction: share of connections to loopback/private peers
+        destinations: size of the public destination pool
+        flash: connections per tick that open and close between ticks
+        seed: random seed - equal arguments give equal tables
+    """
+
+    def __init__(self, sockets=1000, churn=0.01, processes=50, local_fraction=0.3,
+                 destinations=5000, flash=0, seed=0):
+        self.rng = random.Random(seed)
+        self.churn = churn
+        self.local_fraction = local_fraction
+        self.flash = flash
+        self.pids = list(range(1000, 1000 + 4 * processes, 4))
+        self.process_names = {
+            pid: PROCESS_NAMES[i % len(PROCESS_NAMES)] for i, pid in enumerate(self.pids)
+        }
+        self._pid_weights = [1.0 / (i + 1) for i in range(len(self.pids))]
+        self.destinations = [self._public_ip() for _ in range(destinations)]
+        self._statuses = [s for s, _ in STATUS_MIX]
+        self._status_weights = [w for _, w in STATUS_MIX]
+
+        self.ticks = 0
+        self.active_opens = 0
+        self._next_port = 0
+        self._rows = [self._new_row() for _ in range(sockets)]
+
+    def __len__(self):
+        return len(self._rows)
+
+    # -- psutil API ---------------------------------------------------
+
+    def net_connections(self, kind="inet"):
+        """Advance one tick and return the table like psutil.net_connections()."""
+        self.ticks += 1
+        rows = self._rows
+        replaced = int(len(rows) * self.churn)
+        if replaced:
+            for index in self.rng.sample(range(len(rows)), replaced):
+                rows[index] = self._new_row()
+        self.active_opens += self.flash
+        return list(rows)
+
+    def Process(self, pid):
+        """Return a process handle like psutil.Process()."""
+        if pid not in self.process_names:
+            raise psutil.NoSuchProcess(pid)
+        return _SyntheticProcess(self, pid)
+
+    def process_iter(self, attrs=None, ad_value=None):
+        """Iterate processes like psutil.process_iter(), with .info filled in."""
+        for pid in self.process_names:
+            proc = _SyntheticProcess(self, pid)
+            proc.info = proc.as_dict(attrs, ad_value)
+            yield proc
+
+    def tcp_counters(self):
+        """Kernel-style open counters for collector coverage tracking."""
+        return {"ActiveOpens": self.active_opens, "AttemptFails": 0}
+
+    # -- generation ---------------------------------------------------
+
+    def _public_ip(self):
+        rng = self.rng
+        while True:
+            ip = f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+            if not is_local_address(ip):
+                return ip
+
+    def _new_row(self):
+        rng = self.rng
+        n = self._next_port
+        self._next_port += 1
+        laddr = addr(f"10.{n // 16_000_000 % 256}.{n // 64000 % 250}.{n % 250 + 1}",
+                     1024 + n % 64000)
+        status = rng.choices(self._statuses, self._status_weights)[0]
+        pid = rng.choices(self.pids, self._pid_weights)[0]
+
+        if status == "LISTEN":
+            return sconn(-1, 2, 1, laddr, (), status, pid)
+        if rng.random() < self.local_fraction:
+            raddr = addr(f"127.0.0.{rng.randint(1, 254)}", rng.randint(1024, 65535))
+        else:
+            raddr = addr(rng.choice(self.destinations), rng.choice(COMMON_PORTS))
+        if status in ("ESTABLISHED", "SYN_SENT"):
+            self.active_opens += 1
+        return sconn(-1, 2, 1, laddr, raddr, status, pid)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Test the agent wire protocol and the aggregator over localhost."""
+
+import threading
+import time
+from queue import Queue
+
+from collector.agent import AgentForwarder
+from collector.aggregator_collector import AggregatorCollector
+from collector.wire_protocol import FRAME_HEADER, ProtocolError, decode_batch, decode_hello, encode_batch
+
+
+EVENTS = [
+    {"event_type": "open", "timestamp": "2025-01-15 14:30:00", "pid": 4242, "process": "beacon.exe",
+     "dest_ip": "93.184.216.34", "dest_port": 443, "bytes_sent": 1200, "bytes_recv": 5400},
+    {"event_type": "close", "timestamp": "2025-01-15 14:30:00", "pid": None, "process": "Unknown",
+     "dest_ip": "2606:4700::1111", "dest_port": 53, "protocol": "UDP", "duration": 0.5, "polls_seen": 2,
+     "cgroup": "/tenant", "netns": 4026532281},
+    {"timestamp": "2025-01-15 14:30:01", "pid": 7, "process": "curl", "dest_ip": "93.184.216.34",
+     "dest_port": 80, "protocol": "TCP"},
+    {"event_type": "open", "timestamp": "2025-01-15 14:30:09", "pid": 7, "process": "curl",
+     "dest_ip": "93.184.216.34", "dest_port": 80, "count": 5,
+     "first_seen": "2025-01-15 14:30:02", "last_seen": "2025-01-15 14:30:09"},
+]
+
+
+def test_agent_aggregator():
+    """Events survive encoding and arrive at the aggregator tagged with the agent host."""
+    frame = encode_batch(EVENTS)[0]
+    decoded = decode_batch(frame[FRAME_HEADER.size:], host="web-01")
+    assert decoded[0]["bytes_recv"] == 5400 and decoded[0]["host"] == "web-01"
+    assert decoded[1]["pid"] is None and decoded[1]["cgroup"] == "/tenant"
+    assert decoded[1]["netns"] == 4026532281 and "netns" not in decoded[0]
+    assert decoded[1]["protocol"] == "UDP" and decoded[1]["polls_seen"] == 2
+    assert decoded[2]["event_type"] == "open" and "bytes_sent" not in decoded[2]
+    assert "count" not in decoded[2]
+    assert (decoded[3]["count"], decoded[3]["first_seen"], decoded[3]["last_seen"]) == \
+        (5, "2025-01-15 14:30:02", "2025-01-15 14:30:09")
+    print(f"✓ {len(EVENTS)} events in {len(frame)} bytes")
+
+    try:
+        decode_hello(b"UBNA")
+        assert False, "a truncated HELLO must be rejected"
+    except ProtocolError:
+        pass
+
+    analyzer_queue = Queue()
+    aggregator = AggregatorCollector(analyzer_queue, "127.0.0.1:0")
+    assert aggregator.start()
+    port = aggregator.address[1]
+
+    agents = []
+    for host in ("web-01", "db-01"):
+        local_queue = Queue()
+        forwarder = AgentForwarder(local_queue, f"127.0.0.1:{port}", hostname=host)
+        threading.Thread(target=forwarder.run, daemon=True).start()
+        local_queue.put(EVENTS)
+        agents.append(forwarder)
+
+    received = []
+    deadline = time.time() + 5
+    while len(received) < 2 * len(EVENTS) and time.time() < deadline:
+        received.extend(analyzer_queue.get(timeout=5))
+    for forwarder in agents:
+        forwarder.stop()
+    aggregator.stop()
+
+    assert sorted({e["host"] for e in received}) == ["db-01", "web-01"]
+    assert len(received) == 2 * len(EVENTS)
+    print(f"✓ Aggregator received {len(received)} events from 2 agents")
+
+
+if __name__ == "__main__":
+    test_agent_aggregator()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Test the asyncio runtime: per-host pipelines, stage metrics and draining."""
+
+import asyncio
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from queue import Queue
+
+import database.activity_store as store
+from async_runtime import STAGES, AsyncRuntime
+
+
+def _batch(host, n):
+    return [{"event_type": "open", "timestamp": "2025-01-15 14:30:00", "pid": 4242, "process": "agent.exe",
+             "dest_ip": f"93.184.216.{i}", "dest_port": 443, "host": host} for i in range(n)]
+
+
+def test_async_runtime():
+    """Batches from two hosts run through separate pipelines and are all stored."""
+    original = store.DB_PATH
+    store.DB_PATH = Path(tempfile.mkdtemp()) / "async.db"
+    try:
+        store.init_db()
+        source = Queue()
+        for _ in range(3):
+            source.put(_batch("web-01", 20))
+            source.put(_batch("db-01", 10))
+        deadline = time.time() + 30
+        runtime = AsyncRuntime(source, per_host=True, enrich=False,
+                               is_running=lambda: not source.empty() and time.time() < deadline)
+        asyncio.run(runtime.run())
+
+        # Repeats of a host's connections are coalesced, their count is kept
+        count, connections = sqlite3.connect(str(store.DB_PATH)).execute(
+            "SELECT COUNT(*), SUM(count) FROM events").fetchone()
+        assert count == 60 and connections == 90
+        assert sorted(runtime.pipelines) == ["db-01", "web-01"]
+        web, db = runtime.pipelines["web-01"], runtime.pipelines["db-01"]
+        assert web.engine is not db.engine
+        assert web.engine.get_baseline("agent.exe")["connection_count"] == 60
+        metrics = web.metrics()
+        assert set(metrics) == set(STAGES) and metrics["score"]["events"] == 40
+        print(f"✓ {connections} events stored as {count} rows via per-host pipelines: {web.summary()}")
+    finally:
+        store.DB_PATH = original
+
+
+if __name__ == "__main__":
+    test_async_runtime()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Test generational connection tracking used by the collector."""
+
+from collector.connection_table import ConnectionTable, pack_connection_key, unpack_connection_key
+
+
+def test_connection_table():
+    """Closed connections expire and reused 5-tuples are reported again."""
+    a = pack_connection_key(100, "10.0.0.5", 50000, "93.184.216.34", 443)
+    b = pack_connection_key(100, "10.0.0.5", 50001, "93.184.216.34", 443)
+    assert len(a) == 16
+    assert unpack_connection_key(a) == (100, "10.0.0.5", 50000, "93.184.216.34", 443)
+
+    v6 = pack_connection_key(None, "::1", 1, "2001:db8::1", 80)
+    assert unpack_connection_key(v6) == (None, "::1", 1, "2001:db8::1", 80)
+
+    table = ConnectionTable(max_entries=10)
+    table.begin_scan()
+    assert table.observe(a) is True
+    assert table.observe(a) is False
+    assert table.observe(b) is True
+    table.end_scan()
+
+    # b closes
+    table.begin_scan()
+    assert table.observe(a) is False
+    assert table.end_scan() == 1
+    assert b not in table
+
+    # b's 5-tuple is reused after the close
+    table.begin_scan()
+    table.observe(a)
+    assert table.observe(b) is True
+    table.end_scan()
+    print("✓ Expiry and reuse detection")
+
+    # Past the capacity limit new keys overflow; tracked ones are never re-reported
+    small = ConnectionTable(max_entries=100)
+    live = [pack_connection_key(1, "10.0.0.5", port, "1.2.3.4", 80) for port in range(150)]
+    small.begin_scan()
+    assert sum(small.observe(key) for key in live) == 100
+    small.end_scan()
+    for _ in range(2):
+        small.begin_scan()
+        assert sum(small.observe(key) for key in live) == 0
+        assert small.end_scan() == 0
+    stats = small.stats()
+    assert stats['size'] == 100 and stats['overflow'] == 150
+    print(f"✓ Capacity counters: {stats}")
+
+    # Forgotten keys are new again on the next scan
+    table.begin_scan()
+    table.observe(a)
+    table.set_info(a, "a")
+    table.observe(b)
+    assert table.forget([a, b]) == ["a", None]
+    table.end_scan()
+    table.begin_scan()
+    assert table.observe(a) is True
+    table.end_scan()
+    print("✓ Forgotten connections reported again")
+
+    # Closes report the observed lifetime and number of polls seen
+    life = ConnectionTable()
+    for now in (100.0, 101.0, 102.0):
+        life.begin_scan(now)
+        if life.observe(a, info="a"):
+            assert now == 100.0
+        life.end_scan()
+    life.begin_scan(103.0)
+    assert life.end_scan() == 1
+    assert life.closed == [("a", 2.0, 3)]
+    print("✓ Close lifetime: 2.0s over 3 polls")
+
+
+if __name__ == "__main__":
+    test_connection_table()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Test collector coverage estimation against kernel TCP counters."""
+
+import os
+import tempfile
+from queue import Queue
+
+from collector.coverage import CoverageMonitor, read_snmp_tcp
+from collector.scoped_collector import ScopedCollector
+
+
+def _write_snmp(proc, pid, active_opens):
+    with open(os.path.join(proc, str(pid), "net", "snmp"), "w") as f:
+        f.write(f"Tcp: ActiveOpens AttemptFails\nTcp: {active_opens} 0\n")
+
+
+def test_coverage():
+    """Coverage compares emitted connections with successful active opens."""
+    counters = iter([
+        {"ActiveOpens": 100, "AttemptFails": 5},   # baseline
+        {"ActiveOpens": 110, "AttemptFails": 5},
+        {"ActiveOpens": 125, "AttemptFails": 10},
+    ])
+    monitor = CoverageMonitor(reader=lambda: next(counters))
+    monitor.update(40)  # pre-existing connections are not counted
+    monitor.update(8)
+    monitor.update(7)
+    assert monitor.kernel_opens == 20
+    assert monitor.observed_opens == 15
+    assert monitor.coverage == 0.75
+    assert monitor.missed == 5
+    print(f"✓ {monitor.summary()}")
+
+    unsupported = CoverageMonitor(reader=dict)
+    unsupported.update(3)
+    assert unsupported.available is False
+    assert unsupported.metrics()['coverage_ratio'] is None
+    print(f"✓ Unsupported platform: {unsupported.summary()}")
+
+    snmp = read_snmp_tcp()
+    if snmp:
+        assert "ActiveOpens" in snmp
+        print(f"✓ /proc/net/snmp ActiveOpens = {snmp['ActiveOpens']}")
+
+    # Scoped to a namespace, coverage counts that namespace's opens only
+    proc = tempfile.mkdtemp()
+    os.makedirs(os.path.join(proc, "11", "ns"))
+    os.makedirs(os.path.join(proc, "11", "net"))
+    open(os.path.join(proc, "11", "ns", "net"), "w").close()
+    collector = ScopedCollector(Queue(), netns=[os.path.join(proc, "11", "ns", "net")], proc_root=proc)
+    collector.scope.refresh()
+    for opens, emitted in ((500, 0), (504, 3), (510, 6)):
+        _write_snmp(proc, 11, opens)
+        collector.coverage.update(emitted)
+    assert collector.coverage.kernel_opens == 10 and collector.coverage.coverage == 0.9
+    print(f"✓ Namespace-scoped {collector.coverage.summary()}")
+
+    cgroup_scoped = ScopedCollector(Queue(), cgroups=["/tenant"], cgroup_root=proc, proc_root=proc)
+    cgroup_scoped.coverage.update(1)
+    assert not cgroup_scoped.coverage.available
+    assert cgroup_scoped.coverage_scope.startswith("off")
+    print(f"✓ cgroup scope: {cgroup_scoped.coverage.summary()} ({cgroup_scoped.coverage_scope})")
+
+
+if __name__ == "__main__":
+    test_coverage()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Test event coalescing: aggregated repeats, window release and count-weighted scoring."""
+
+from core.event_coalescer import EventCoalescer
+from core.scoring_engine import ScoringEngine
+
+
+def _event(second, port=80, pid=0, event_type="open"):
+    return {"event_type": event_type, "timestamp": f"2025-01-15 14:30:{second:02d}", "pid": pid,
+            "process": "System Idle Process", "dest_ip": "98.84.87.4", "dest_port": port,
+            "bytes_sent": 10, "bytes_recv": 5}
+
+
+def test_event_coalescer():
+    """Repeats within the window become one aggregate; the engine still counts every connection."""
+    coalescer = EventCoalescer(window_secs=5, event_time=True)
+    ready = coalescer.push([_event(0)] + [_event(s) for s in (1, 1, 2, 3)] + [_event(1, port=443)])
+    assert len(ready) == 2 and "count" not in ready[0]  # first occurrences pass straight through
+    assert coalescer.push([_event(4, event_type="close")])[0]["event_type"] == "close"
+
+    ready = coalescer.push([_event(6)])
+    aggregate, first = ready
+    assert aggregate["count"] == 4 and first["timestamp"].endswith(":06")
+    assert (aggregate["first_seen"], aggregate["last_seen"]) == ("2025-01-15 14:30:01", "2025-01-15 14:30:03")
+    assert aggregate["timestamp"] == aggregate["last_seen"] and aggregate["bytes_sent"] == 40
+    assert coalescer.flush() == [] and coalescer.stats()["coalesce_events_in"] == 8
+    print(f"✓ 4 repeats aggregated into one event: {coalescer.stats()}")
+
+    exact, weighted = ScoringEngine(event_time=True), ScoringEngine(event_time=True)
+    for second in range(12):
+        expected = exact.score("beacon.exe", 0, 1.0, 0.0, "198.51.100.7", 8443, timestamp=1000.0 + second)[0]
+    weighted.score("beacon.exe", 0, 1.0, 0.0, "198.51.100.7", 8443, timestamp=1000.0)
+    score, reasons, _ = weighted.score("beacon.exe", 0, 1.0, 0.0, "198.51.100.7", 8443,
+                                       timestamp=1011.0, count=11)
+    assert score == expected
+    assert weighted.get_recent_connection_count("beacon.exe", 60, now=1011.0) == 12
+    assert weighted.get_baseline("beacon.exe")["connection_count"] == 12
+    assert any("Beaconing pattern: 12 hits" in reason for reason in reasons)
+    print(f"✓ Coalesced event scored with its true count (score {score:.0f}, as if scored one by one)")
+
+
+if __name__ == "__main__":
+    test_event_coalescer()
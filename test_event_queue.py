@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Test the event queue's overload policies and shed counters."""
+
+from queue import Full
+
+from collector.event_queue import EventQueue
+
+
+def _event(process="tool.exe", ip="203.0.113.5", port=4444, pid=7):
+    return {"event_type": "open", "timestamp": "2025-01-15 14:30:00", "pid": pid,
+            "process": process, "dest_ip": ip, "dest_port": port, "protocol": "TCP"}
+
+
+def _batch(n, **kwargs):
+    return [_event(ip=f"203.0.113.{i}", **kwargs) for i in range(n)]
+
+
+def test_event_queue():
+    """Each policy keeps the queue bounded and accounts for every shed event."""
+    queue = EventQueue(max_events=5, policy="block")
+    assert queue.put_batch(_batch(8)) == 8  # an empty queue always takes the batch
+    assert queue.put_batch(_batch(1), timeout=0.01) == 0
+    try:
+        queue.put(_batch(1), timeout=0.01)
+        raise AssertionError("block policy should time out")
+    except Full:
+        pass
+    assert len(queue.get()) == 8 and queue.empty()
+    stats = queue.stats()
+    assert stats['queue_refused'] == 1 and stats['queue_shed'] == 0 and queue.shed_open == 0
+    print("✓ block: waits, then refuses on timeout without counting the batch as lost")
+
+    queue = EventQueue(max_events=5, policy="drop_oldest")
+    queue.put_batch(_batch(3, process="old.exe"))
+    queue.put_batch(_batch(4, process="new.exe"))
+    events = queue.get_batch(100)
+    assert len(events) == 5 and [e["process"] for e in events].count("old.exe") == 1
+    assert queue.shed_by_process == {"old.exe": 2}
+    print("✓ drop_oldest: oldest events evicted")
+
+    queue = EventQueue(max_events=5, policy="drop_newest")
+    queue.put_batch(_batch(3))
+    assert queue.put_batch(_batch(4, process="late.exe")) == 2
+    assert len(queue) == 5 and queue.shed_by_reason == {"drop_newest": 2}
+    print("✓ drop_newest: keeps what fits")
+
+    queue = EventQueue(max_events=5, policy="sample_safe", sample_rate=3)
+    queue.put_batch(_batch(3, process="chrome.exe", port=443))
+    queue.put_batch([_event(port=4444 + i) for i in range(3)]
+                    + [_event("svchost.exe", f"198.51.100.{i}", 443) for i in range(3)])
+    events = queue.get_batch(100)
+    assert len(events) == 5
+    assert sum(e["process"] == "tool.exe" for e in events) == 3  # suspicious events kept
+    assert queue.shed_by_reason == {"sampled_safe": 4}
+    print(f"✓ sample_safe: shed {dict(queue.shed_by_process)} before anything suspicious")
+
+    queue = EventQueue(max_events=2, policy="coalesce")
+    queue.put_batch([_event(), _event(port=53)])
+    closed = dict(_event(), event_type="close", duration=1.0)
+    assert queue.put_batch([_event(), _event(), closed, _event(port=80)]) == 2
+    first = queue.get()[0]
+    assert first["count"] == 3 and first["first_seen"] == first["last_seen"]
+    assert queue.stats()["queue_coalesced"] == 2 and queue.shed_by_reason == {"drop_newest": 2}
+    assert queue.shed_open == 1  # the close is shed too, but only the open is lost for good
+    summary = queue.summary()
+    assert "coalesced 2" in summary and "1 opens lost" in summary
+    print(f"✓ coalesce: repeats folded into queued events ({summary})")
+
+
+if __name__ == "__main__":
+    test_event_queue()
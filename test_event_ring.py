@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Test the shared-memory event ring and the multiprocess analyzer."""
+
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import database.activity_store as store
+import main as ubnad
+from core import event_analyzer
+from core.event_ring import EventRing
+
+
+def _events(n, process="ring.exe"):
+    return [{"event_type": "open", "timestamp": "2025-01-15 14:30:00", "pid": 7, "process": process,
+             "dest_ip": f"2001:db8::{i:x}", "dest_port": 443, "bytes_sent": i, "bytes_recv": 2 * i}
+            for i in range(n)]
+
+
+def test_event_ring():
+    """Records survive the ring, including wrap-around and a full ring."""
+    ring = EventRing.create(slots=8)
+    reader = EventRing.attach(ring.name, ring.lock)
+    try:
+        assert ring.put(_events(5)) == 5
+        assert len(reader.get(3)) == 3
+        written = ring.put(_events(10, process="p" * 100) + [{"dest_ip": "1.2.3.4", "pid": None, "host": "web-01",
+                                                              "event_type": "close", "duration": 0.5}])
+        assert written == 6  # 2 still queued + 6 = 8 slots
+        events = reader.get(100)
+        assert len(events) == 8 and not ring.put([])
+        assert events[2]["process"] == "p" * 64 and events[2]["bytes_recv"] == 0
+        assert events[0]["dest_ip"] == "2001:db8::3"
+        print(f"✓ Ring round-trip with wrap-around ({len(events)} events)")
+    finally:
+        reader.release()
+        ring.release()
+
+
+def test_multiprocess_analyzer():
+    """Events reach the database through analyzer and writer processes."""
+    original = store.DB_PATH
+    store.DB_PATH = Path(tempfile.mkdtemp()) / "multiprocess.db"
+    try:
+        store.init_db()
+        processed = event_analyzer.total_events_processed
+        for n in range(4):
+            ubnad.event_queue.put(_events(50, process=f"proc{n}.exe"))
+        ubnad.running = True
+        loop = threading.Thread(target=ubnad.multiprocess_analyzer_loop, args=(2,))
+        loop.start()
+        deadline = time.time() + 60
+        count = 0
+        while count < 200 and time.time() < deadline:
+            time.sleep(0.2)
+            count = sqlite3.connect(str(store.DB_PATH)).execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        ubnad.running = False
+        loop.join(timeout=30)
+        assert count == 200
+        assert event_analyzer.total_events_processed - processed == 200
+        print(f"✓ {count} events scored by 2 analyzer processes and stored by the writer")
+    finally:
+        ubnad.running = True
+        store.DB_PATH = original
+
+
+if __name__ == "__main__":
+    test_event_ring()
+    test_multiprocess_analyzer()
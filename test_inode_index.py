@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Test the incremental socket inode index against a fake /proc."""
+
+import os
+import tempfile
+from pathlib import Path
+
+from collector.inode_index import SocketInodeIndex
+
+
+def _process(root, pid, start_ticks, inodes):
+    """Create /proc/<pid> with a stat file and one socket fd link per inode."""
+    fd_dir = root / str(pid) / "fd"
+    fd_dir.mkdir(parents=True)
+    fields = ["S"] + ["0"] * 18 + [str(start_ticks)]
+    (root / str(pid) / "stat").write_text(f"{pid} (fake proc) {' '.join(fields)}\n")
+    for fd, inode in enumerate(inodes, start=3):
+        os.symlink(f"socket:[{inode}]", fd_dir / str(fd))
+    return fd_dir
+
+
+def test_inode_index():
+    """Unchanged processes are not rescanned; exits and PID reuse update the owners."""
+    root = Path(tempfile.mkdtemp())
+    (root / "stat").write_text("cpu 0 0 0\nbtime 1700000000\n")
+    fd_dir = _process(root, 100, 500, [1001, 1002])
+    _process(root, 200, 600, [2001])
+    os.symlink("/dev/null", fd_dir / "0")  # not a socket
+
+    index = SocketInodeIndex(proc_root=str(root))
+    assert index.resolve(1001, generation=1) == (100, 1700000000 + 500 / index._clock_ticks)
+    assert index.resolve(2001, generation=1)[0] == 200
+    assert len(index) == 3 and index.processes_scanned == 2
+
+    # Nothing changed: refresh re-reads no fd links
+    index.refresh()
+    assert index.processes_scanned == 2
+
+    # A new socket changes PID 100's fd count - only it is rescanned
+    os.symlink("socket:[1003]", fd_dir / "9")
+    assert index.resolve(1003, generation=2)[0] == 100
+    assert index.processes_scanned == 3
+    print(f"✓ Incremental refresh: {index.stats()}")
+
+    # PID 200 exits
+    (root / "200" / "fd" / "3").unlink()
+    (root / "200" / "fd").rmdir()
+    (root / "200" / "stat").unlink()
+    (root / "200").rmdir()
+    index.refresh()
+    assert index.resolve(2001, generation=3) is None
+    assert index.processes_dropped == 1
+    print("✓ Exited process dropped with its sockets")
+
+    # PID 100 is reused by a new process with a new fd directory and start time
+    (root / "100").rename(root / "old-100")
+    _process(root, 100, 900, [1001, 4001])
+    index.refresh()
+    assert index.resolve(4001, generation=4) == (100, 1700000000 + 900 / index._clock_ticks)
+    assert index.resolve(1001)[1] == index.resolve(4001)[1]
+    assert index.resolve(1002, generation=4) is None
+    print("✓ Reused PID rescanned with its new start time")
+
+
+if __name__ == "__main__":
+    test_inode_index()
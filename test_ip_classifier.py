@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Test CIDR-based IP classification."""
+
+import config
+from core.ip_classifier import IPClassifier, classify_address, ip_to_int, is_local_address
+
+
+def test_ip_classifier():
+    """Local ranges, trusted CIDRs and longest-prefix labels."""
+    # 172.* is only private inside 172.16.0.0/12
+    assert is_local_address("172.16.5.4")
+    assert not is_local_address("172.217.3.110")
+    assert classify_address("100.64.1.1") == "cgnat"
+    assert classify_address("fd12:3456::1") == "ula"
+    assert classify_address("fe80::1%eth0") == "link-local"
+    assert classify_address("::ffff:10.1.2.3") == "private"
+    assert classify_address("2606:4700::1111") == "public"
+    assert not is_local_address("not-an-ip")
+    print("✓ Local range classification")
+
+    table = IPClassifier({"1.0.0.0/8": "wide", "1.1.1.0/24": "narrow", "2001:db8::/32": "doc"})
+    assert table.classify("1.1.1.1") == "narrow"
+    assert table.classify("1.2.3.4") == "wide"
+    assert table.classify(ip_to_int("2001:db8::5")) == "doc"
+    assert table.classify("8.8.8.8") is None
+    assert sorted(table.networks()) == [
+        ("1.0.0.0/8", "wide"), ("1.1.1.0/24", "narrow"), ("2001:db8::/32", "doc")]
+
+    # Thousands of CIDRs still resolve through a handful of prefix lengths
+    big = IPClassifier({f"20.{i // 256}.{i % 256}.0/24": i for i in range(5000)})
+    assert big.classify("20.3.7.9") == 3 * 256 + 7
+    print("✓ Longest-prefix lookups")
+
+    config.TRUSTED_DESTINATIONS["140.82.112.0/20"] = "GitHub"
+    config.reload_trusted_destinations()
+    assert config.is_trusted_destination("140.82.114.4")
+    assert config.get_destination_name("140.82.114.4") == "GitHub"
+    assert config.is_trusted_destination("8.8.8.8")
+    del config.TRUSTED_DESTINATIONS["140.82.112.0/20"]
+    config.reload_trusted_destinations()
+    print("✓ Trusted destination CIDRs")
+
+
+if __name__ == "__main__":
+    test_ip_classifier()
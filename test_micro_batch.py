@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Test the analyzer's micro-batching: queue draining and one transaction per batch."""
+
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+import database.activity_store as store
+import main as ubnad
+
+
+def _events(n, event_type="open"):
+    return [{"event_type": event_type, "timestamp": "2025-01-15 14:30:00", "pid": 10,
+             "process": "batch.exe", "dest_ip": f"93.184.216.{i}", "dest_port": 443}
+            for i in range(n)]
+
+
+def test_micro_batch():
+    """Queued collector batches merge up to the limit; the batch is stored in one call."""
+    for _ in range(4):
+        ubnad.event_queue.put(_events(3))
+    started = time.monotonic()
+    events = ubnad.next_micro_batch(max_events=7, linger_secs=1.0)
+    assert len(events) == 9  # collector batches are not split
+    assert time.monotonic() - started < 0.5
+    assert len(ubnad.next_micro_batch(max_events=100, linger_secs=0.05)) == 3
+    print("✓ Micro-batch filled from queued batches without lingering")
+
+    original = store.DB_PATH
+    store.DB_PATH = Path(tempfile.mkdtemp()) / "batch.db"
+    try:
+        store.init_db()
+        with mock.patch.object(ubnad, "insert_events", wraps=store.insert_events) as insert:
+            ubnad.process_batch(_events(2, "existing") + events)
+        assert insert.call_count == 1
+        count = sqlite3.connect(str(store.DB_PATH)).execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        assert count == 11
+        print(f"✓ {count} rows stored in a single transaction")
+    finally:
+        store.DB_PATH = original
+
+
+if __name__ == "__main__":
+    test_micro_batch()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Test connection extraction from pcap and pcapng captures."""
+
+import socket
+import struct
+import tempfile
+import time
+from pathlib import Path
+from queue import Queue
+
+from collector.pcap_collector import PcapCollector, PcapReader, load_attribution
+
+
+def _ipv4(src, dst, protocol, l4):
+    header = struct.pack("!BBHHHBBH4s4s", 0x45, 0, 20 + len(l4), 0, 0, 64, protocol, 0,
+                         socket.inet_aton(src), socket.inet_aton(dst))
+    return b"\x00" * 12 + b"\x08\x00" + header + l4  # Ethernet + IPv4
+
+
+def _ipv6(src, dst, protocol, l4):
+    header = struct.pack("!IHBB16s16s", 6 << 28, len(l4), protocol, 64,
+                         socket.inet_pton(socket.AF_INET6, src), socket.inet_pton(socket.AF_INET6, dst))
+    return b"\x00" * 12 + b"\x86\xdd" + header + l4
+
+
+def _tcp(sport, dport, flags):
+    return struct.pack("!HHIIBBHHH", sport, dport, 0, 0, 0x50, flags, 0, 0, 0)
+
+
+def _udp(sport, dport):
+    return struct.pack("!HHHH", sport, dport, 8, 0)
+
+
+PACKETS = [
+    (1700000000.0, _ipv4("10.0.0.5", "93.184.216.34", 6, _tcp(50000, 443, 0x02))),    # SYN
+    (1700000000.1, _ipv4("93.184.216.34", "10.0.0.5", 6, _tcp(443, 50000, 0x12))),    # SYN-ACK
+    (1700000000.2, _ipv4("10.0.0.5", "93.184.216.34", 6, _tcp(50000, 443, 0x10))),    # ACK
+    (1700000001.0, _ipv4("10.0.0.5", "8.8.8.8", 17, _udp(40000, 53))),                # new UDP flow
+    (1700000001.5, _ipv4("10.0.0.5", "8.8.8.8", 17, _udp(40000, 53))),                # same flow
+    (1700000002.0, _ipv4("10.0.0.5", "192.168.1.1", 6, _tcp(50001, 22, 0x02))),      # local, skipped
+    (1700000003.0, _ipv6("2001:db8::5", "2606:4700::1111", 6, _tcp(50002, 443, 0x02))),
+    (1700000004.0, _ipv4("198.51.100.9", "203.0.113.5", 6, _tcp(61000, 22, 0x02))),   # inbound to host
+]
+
+
+def _write_pcap(path, packets=PACKETS):
+    with open(path, "wb") as f:
+        f.write(struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, 1))
+        for ts, data in packets:
+            f.write(struct.pack("<IIII", int(ts), round(ts % 1 * 1e6), len(data), len(data)))
+            f.write(data)
+
+
+def _write_pcapng(path):
+    def block(block_type, body):
+        body += b"\x00" * (-len(body) % 4)
+        return struct.pack("<II", block_type, len(body) + 12) + body + struct.pack("<I", len(body) + 12)
+
+    with open(path, "wb") as f:
+        f.write(block(0x0A0D0D0A, struct.pack("<IHHq", 0x1A2B3C4D, 1, 0, -1)))
+        tsresol = struct.pack("<HHB3x", 9, 1, 9) + struct.pack("<HH", 0, 0)  # nanoseconds
+        f.write(block(1, struct.pack("<HHI", 1, 0, 65535) + tsresol))
+        for ts, data in PACKETS:
+            ns = round(ts * 1e9)
+            f.write(block(6, struct.pack("<IIIII", 0, ns >> 32, ns & 0xFFFFFFFF, len(data), len(data)) + data))
+
+
+def test_pcap_collector():
+    """SYNs and new UDP flows become events in both capture formats."""
+    tmp = Path(tempfile.mkdtemp())
+    side = tmp / "owners.csv"
+    side.write_text("local_ip,local_port,remote_ip,remote_port,pid,process\n"
+                    "10.0.0.5,50000,,,4242,beacon.exe\n"
+                    "2001:db8::5,,,,77,curl\n")
+    attribution = load_attribution(side)
+
+    for name, writer in (("capture.pcap", _write_pcap), ("capture.pcapng", _write_pcapng)):
+        capture = tmp / name
+        writer(capture)
+        reader = PcapReader(attribution, local_nets=["203.0.113.5/32"])
+        events = reader.read(capture)
+        summary = [(e["process"], e["dest_ip"], e["dest_port"], e["protocol"]) for e in events]
+        assert summary == [
+            ("beacon.exe", "93.184.216.34", 443, "TCP"),
+            ("Unknown", "8.8.8.8", 53, "UDP"),
+            ("curl", "2606:4700::1111", 443, "TCP"),
+        ], summary
+        assert reader.stats() == {'packets': 8, 'tcp_syns': 4, 'udp_flows': 1, 'skipped_local': 1,
+                                  'skipped_inbound': 1}
+        print(f"✓ {name}: {len(events)} events from {reader.packets} packets")
+
+    # Without the capture host's address an inbound SYN looks outbound
+    assert len(PcapReader().read(capture)) == 4
+
+    # Capture paths may be pathlib.Path objects
+    collector = PcapCollector(Queue(), capture, local_nets=["203.0.113.5"])
+    assert len(collector.events) == 3
+    print("✓ Inbound connections skipped, Path source accepted")
+
+    # 120k concurrent UDP flows stay linear; an idle flow starts over after the timeout
+    flows = [(1700000000.0 + n * 1e-4, _ipv4("10.0.0.5", f"8.{n >> 16}.{n >> 8 & 255}.{n & 255}", 17,
+                                          _udp(40000, 53))) for n in range(120000)]
+    flows.append((1700000100.0, flows[0][1]))
+    busy = tmp / "udp.pcap"
+    _write_pcap(busy, flows)
+    started = time.perf_counter()
+    reader = PcapReader(udp_idle_timeout=60.0)
+    assert len(reader.read(busy)) == 120001 and reader.udp_flows == 120001
+    elapsed = time.perf_counter() - started
+    assert elapsed < 10
+    print(f"✓ {reader.udp_flows} UDP flows parsed in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    test_pcap_collector()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Test the adaptive poll scheduler with synthetic churn."""
+
+import time
+
+from collector.poll_scheduler import AdaptivePollScheduler
+from config import MONITORING_CONFIG
+
+
+def test_poll_scheduler():
+    """Churn bursts drive the interval to the minimum, quiet periods to the maximum."""
+    scheduler = AdaptivePollScheduler.from_config(MONITORING_CONFIG)
+    low, high = MONITORING_CONFIG['poll_interval_min'], MONITORING_CONFIG['poll_interval_max']
+    assert scheduler.interval == MONITORING_CONFIG['poll_interval']
+
+    def scan(churn):
+        now = time.monotonic()
+        delay = scheduler.next_delay(now, now, churn)
+        assert low <= scheduler.interval <= high and delay <= scheduler.interval
+        return scheduler.interval
+
+    intervals = [scan(50) for _ in range(10)]
+    assert intervals == sorted(intervals, reverse=True) and intervals[-1] == low
+    intervals = [scan(0) for _ in range(30)]
+    assert intervals == sorted(intervals) and intervals[-1] == high
+    print(f"✓ Interval moved {low}s <-> {high}s with churn")
+
+    # Moderate churn drifts back towards the base interval
+    for _ in range(20):
+        scan(3)
+    assert abs(scheduler.interval - scheduler.base_interval) < 0.01
+
+    # A scan longer than its slot starts the next one immediately
+    started = time.monotonic() - 10
+    assert scheduler.next_delay(started, started + 10, 3) == 0.0
+    assert scheduler.metrics()['overruns'] == 1
+    print(f"✓ Drift to base and overrun: {scheduler.metrics()}")
+
+
+if __name__ == "__main__":
+    test_poll_scheduler()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Test /proc/net/tcp{,6} parsing for the Linux collector backend."""
+
+import tempfile
+from pathlib import Path
+
+from collector.linux_proc_collector import LinuxProcNetCollector, parse_tcp4, parse_tcp6
+
+HEADER = b"  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n"
+
+
+def _line(sl, local, remote, state, inode):
+    return (f"{sl:4d}: {local} {remote} {state} 00000000:00000000 00:00000000 00000000  "
+            f"1000        0 {inode} 1 0000000000000000 20 4 30 10 -1\n").encode()
+
+
+def test_proc_net_parser():
+    """Only ESTABLISHED/SYN_SENT sockets to public addresses are reported."""
+    tcp4 = HEADER + b"".join([
+        _line(0, "0500000A:C350", "22D8B85D:01BB", "01", 1001),   # 93.184.216.34:443
+        _line(1, "0500000A:C351", "0100007F:01BB", "01", 1002),   # loopback
+        _line(2, "0500000A:C352", "22D8B85D:01BB", "0A", 1003),   # LISTEN
+        _line(3, "0500000A:C353", "0100A8C0:0050", "02", 1004),   # 192.168.0.1
+        _line(12345, "0500000A:C354", "08080808:0035", "02", 1005),  # wide sl column
+    ])
+    assert list(parse_tcp4(tcp4)) == [
+        (1001, "10.0.0.5", 50000, "93.184.216.34", 443),
+        (1005, "10.0.0.5", 50004, "8.8.8.8", 53),
+    ]
+    print("✓ IPv4 table parsed")
+
+    mapped = "0000000000000000FFFF000022D8B85D"
+    loopback = "00000000000000000000000001000000"
+    tcp6 = HEADER + _line(0, loopback + ":C350", mapped + ":0050", "01", 2001) \
+        + _line(1, loopback + ":C351", loopback + ":0050", "01", 2002)
+    assert list(parse_tcp6(tcp6)) == [(2001, "::1", 50000, "93.184.216.34", 80)]
+    print("✓ IPv6 table parsed")
+
+    # The collector reads the tables under its own proc_root, not the host /proc
+    root = Path(tempfile.mkdtemp())
+    (root / "net").mkdir()
+    (root / "net" / "tcp").write_bytes(tcp4)
+    (root / "net" / "tcp6").write_bytes(tcp6)
+    collector = LinuxProcNetCollector(None, proc_root=str(root))
+    assert [conn[0] for conn in collector._snapshot()] == [1001, 1005, 2001]
+    print("✓ Tables read from the configured proc_root")
+
+
+if __name__ == "__main__":
+    test_proc_net_parser()
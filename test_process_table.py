@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Test the shared process table cache."""
+
+import time
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import psutil
+
+from core.process_table import ProcessEnricher, ProcessTable
+
+
+class FakeProcessApi:
+    """process_iter()/Process() over a dict of {pid: (name, create_time)}."""
+
+    def __init__(self, processes):
+        self.processes = processes
+        self.cpu_seconds = 0.0
+        self.iterations = 0
+        self.lookups = 0
+
+    def _info(self, pid, attrs):
+        name, create_time = self.processes[pid]
+        values = {"pid": pid, "name": name, "create_time": create_time,
+                  "cpu_times": SimpleNamespace(user=self.cpu_seconds, system=0.0)}
+        return {attr: values.get(attr) for attr in attrs}
+
+    def process_iter(self, attrs=None, ad_value=None):
+        self.iterations += 1
+        for pid in list(self.processes):
+            yield SimpleNamespace(info=self._info(pid, attrs))
+
+    def Process(self, pid):
+        self.lookups += 1
+        if pid not in self.processes:
+            raise psutil.NoSuchProcess(pid)
+        return SimpleNamespace(oneshot=nullcontext,
+                               as_dict=lambda attrs, ad_value=None: self._info(pid, attrs))
+
+
+def test_process_table():
+    """One bulk read per tick, new PIDs looked up once, PID reuse and exits handled."""
+    api = FakeProcessApi({100: ("chrome.exe", 1.0), 200: ("curl", 2.0)})
+    table = ProcessTable(max_entries=3, refresh_interval=3600, process_api=api)
+
+    assert [table.name(100) for _ in range(50)] == ["chrome.exe"] * 50
+    assert api.iterations == 1 and api.lookups == 0
+    print("✓ 50 lookups served from one process_iter() pass")
+
+    api.processes[300] = ("beacon.exe", 3.0)
+    assert table.name(300) == "beacon.exe" and table.name(300) == "beacon.exe"
+    assert table.get(999) is None and table.get(999) is None
+    assert api.lookups == 2
+    print("✓ New and missing PIDs cost one lookup each")
+
+    api.processes[100] = ("malware.exe", 5.0)  # PID 100 reused
+    del api.processes[200]
+    table.refresh()
+    assert table.name(100) == "malware.exe"
+    assert table.get(200) is None
+    assert table.stats()['process_cache_reused_pids'] == 1
+    print("✓ Reused PID resolved to the new process, exited PID dropped")
+
+    for pid in (400, 500):
+        api.processes[pid] = (f"p{pid}", 9.0)
+        table.get(pid)
+    assert len(table) == 3 and table.stats()['process_cache_evicted'] == 1
+    print(f"✓ LRU bound kept {len(table)} entries")
+
+
+
+def test_process_enricher():
+    """peek() never reads processes; CPU comes from deltas between refreshes."""
+    api = FakeProcessApi({100: ("chrome.exe", 1.0)})
+    table = ProcessTable(refresh_interval=0.02, process_api=api)
+    assert table.peek(100) is None and api.iterations == 0
+    print("✓ peek() before any refresh is an empty, non-blocking miss")
+
+    enricher = ProcessEnricher(table)
+    enricher.start()
+    deadline = time.time() + 5
+    while table.refreshes < 2 and time.time() < deadline:
+        api.cpu_seconds += 0.01
+        time.sleep(0.01)
+    enricher.stop()
+    info = table.peek(100)
+    assert info["name"] == "chrome.exe" and info["cpu_percent"] is not None
+    assert info["cpu_percent"] > 0
+    print(f"✓ Enricher sampled CPU from deltas: {info['cpu_percent']}%")
+
+
+if __name__ == "__main__":
+    test_process_table()
+    test_process_enricher()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Test the replay collector against the bundled CSV exports."""
+
+import tempfile
+import time
+from pathlib import Path
+from queue import Queue
+
+import database.activity_store as store
+from collector import create_collector
+from collector.event_queue import EventQueue
+from collector.replay_collector import ReplayCollector
+
+EXPORT = Path(__file__).parent / "exports" / "ubnad_events_20260422_092922.csv"
+
+
+def test_replay_collector():
+    """Recorded events are replayed oldest-first in the collector event format."""
+    queue = Queue()
+    replay = create_collector(queue, "replay", {"replay_source": str(EXPORT), "replay_speed": 0.0})
+    assert replay.events, "export should contain events"
+    timestamps = [e["timestamp"] for e in replay.events]
+    assert timestamps == sorted(timestamps)
+
+    assert replay.start()
+    deadline = time.time() + 5
+    while not replay.get_metrics()["finished"] and time.time() < deadline:
+        time.sleep(0.05)
+
+    events = []
+    while not queue.empty():
+        events.extend(queue.get_nowait())
+    assert len(events) == len(replay.events)
+    first = events[0]
+    assert set(first) >= {"timestamp", "pid", "process", "dest_ip", "dest_port", "recorded_timestamp"}
+    assert isinstance(first["dest_port"], int)
+    print(f"✓ Replayed {len(events)} events: {replay.get_metrics()}")
+
+    # A shedding queue policy may drop events; replay counts them instead of claiming them sent
+    shedding = EventQueue(max_events=100, policy="drop_newest")
+    replay = ReplayCollector(shedding, EXPORT, batch_size=60)
+    assert replay.start()
+    deadline = time.time() + 5
+    while not replay.get_metrics()["finished"] and time.time() < deadline:
+        time.sleep(0.05)
+    assert replay.event_count == len(shedding) == 100
+    assert replay.event_count + replay.dropped_events == len(replay.events)
+    print(f"✓ drop_newest queue: {replay.event_count} queued, {replay.dropped_events} counted as dropped")
+
+    # A coalesced database replays its aggregates with their counts
+    original = store.DB_PATH
+    store.DB_PATH = Path(tempfile.mkdtemp()) / "coalesced.db"
+    try:
+        store.init_db()
+        row = {"timestamp": "2025-01-15 14:30:00", "pid": 4, "process_name": "System",
+               "dest_ip": "98.84.87.4", "dest_port": 80, "suspicion_score": 0.0, "risk_level": "SAFE"}
+        store.insert_events([row, dict(row, timestamp="2025-01-15 14:30:09", count=40,
+                                       first_seen="2025-01-15 14:30:01", last_seen="2025-01-15 14:30:09")])
+        assert store.get_event_count() == 41 and store.get_top_processes()[0]["count"] == 41
+        coalesced = ReplayCollector(Queue(), store.DB_PATH).events
+        assert [e.get("count", 1) for e in coalesced] == [1, 40]
+        assert coalesced[1]["first_seen"] == "2025-01-15 14:30:01"
+    finally:
+        store.DB_PATH = original
+    print("✓ Coalesced rows counted and replayed with their count")
+
+
+if __name__ == "__main__":
+    test_replay_collector()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Test incremental cgroup membership used by the scoped collector."""
+
+import os
+import tempfile
+
+from collector.scope_membership import ScopeMembership
+
+
+def test_scope_membership():
+    """Members follow cgroup.procs of the watched subtree and are labelled."""
+    root = tempfile.mkdtemp()
+    tenant = os.path.join(root, "tenant")
+    os.makedirs(os.path.join(tenant, "worker"))
+    pid = os.getpid()
+    with open(os.path.join(tenant, "cgroup.procs"), "w") as f:
+        f.write(f"{pid}\n")
+    with open(os.path.join(tenant, "worker", "cgroup.procs"), "w") as f:
+        f.write("")
+
+    scope = ScopeMembership(cgroups=["/tenant", "/missing"], cgroup_root=root)
+    assert scope.configured and scope.missing == ["/missing"]
+    added, removed = scope.refresh()
+    assert added == [pid] and removed == []
+    assert scope.members[pid] == "/tenant"
+    assert scope.namespaces == {scope.netns_of(pid): pid}
+    print(f"✓ Members: {scope.members}")
+
+    # Move the process into the child cgroup: label changes, set is unchanged
+    with open(os.path.join(tenant, "cgroup.procs"), "w") as f:
+        f.write("")
+    with open(os.path.join(tenant, "worker", "cgroup.procs"), "w") as f:
+        f.write(f"{pid}\n")
+    assert scope.refresh() == ([], [])
+    assert scope.members[pid] == "/tenant/worker"
+    print("✓ Move between watched cgroups relabels without re-adding")
+
+    with open(os.path.join(tenant, "worker", "cgroup.procs"), "w") as f:
+        f.write("")
+    assert scope.refresh() == ([], [pid])
+    assert len(scope) == 0 and scope.namespaces == {}
+    print(f"✓ Removal tracked: {scope.stats()}")
+
+    # Namespace members come from the given PIDs; a reused PID gets its new namespace
+    proc = tempfile.mkdtemp()
+    for member, ns in ((11, "tenant"), (12, "host")):
+        os.makedirs(os.path.join(proc, str(member), "ns"))
+        with open(os.path.join(proc, str(member), "ns", "net"), "w") as f:
+            f.write(ns)
+    listing = {11: 1011, 12: 1012}  # {pid: /proc/<pid> inode}
+    scope = ScopeMembership(netns=[os.path.join(proc, "11", "ns", "net")], proc_root=proc,
+                            pid_source=lambda: dict(listing))
+    assert scope.refresh() == ([11], []) and scope.netns_reads == 2
+    tenant_ns = scope.netns_of(11)
+    assert scope.refresh() == ([], []) and scope.netns_reads == 2  # nothing new, nothing stat'ed
+    os.replace(os.path.join(proc, "11", "ns", "net"), os.path.join(proc, "12", "ns", "net"))
+    with open(os.path.join(proc, "11", "ns", "net"), "w") as f:
+        f.write("other")
+    listing.update({11: 2011, 12: 2012})  # both PIDs reused by new processes
+    assert scope.refresh() == ([12], [11]) and scope.netns_reads == 4
+    assert scope.netns_of(12) == tenant_ns and scope.namespaces == {tenant_ns: 12}
+    print("✓ Namespace members re-read from the shared PID listing")
+
+
+if __name__ == "__main__":
+    test_scope_membership()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Test the sock_diag bytecode filter and dump parsing with canned netlink data."""
+
+import ipaddress
+import socket
+import struct
+
+from collector.sock_diag_collector import (
+    INET_DIAG_BC_D_COND, INET_DIAG_BC_JMP, NLMSG_DONE, NLMSG_ERROR, SOCK_DIAG_BY_FAMILY,
+    _BC_OP, _DIAG_MSG, _HOSTCOND, _NLMSGHDR, build_dest_filter, parse_dump,
+)
+
+PREFIXES = [
+    (socket.AF_INET, ipaddress.ip_address("10.0.0.0").packed, 8),
+    (socket.AF_INET6, ipaddress.ip_address("fc00::").packed, 7),
+]
+
+
+def _run_filter(program, family, dest):
+    """Evaluate a D_COND/JMP program the way inet_diag_bc_run() does; True = socket kept."""
+    dest_bits = int.from_bytes(dest, "big")
+    offset, remaining = 0, len(program)
+    while remaining > 0:
+        code, yes, no = _BC_OP.unpack_from(program, offset)
+        matched = False
+        if code == INET_DIAG_BC_D_COND:
+            cond_family, prefix_len, _ = _HOSTCOND.unpack_from(program, offset + _BC_OP.size)
+            addr = program[offset + _BC_OP.size + _HOSTCOND.size:offset + yes]
+            shift = len(addr) * 8 - prefix_len
+            matched = (cond_family == family and len(addr) == len(dest)
+                       and int.from_bytes(addr, "big") >> shift == dest_bits >> shift)
+        step = yes if matched else no
+        offset += step
+        remaining -= step
+    return remaining == 0
+
+
+def _message(msg_type, body):
+    return _NLMSGHDR.pack(_NLMSGHDR.size + len(body), msg_type, 0, 1, 0) + body
+
+
+def _diag(family, src, sport, dst, dport, inode):
+    return _message(SOCK_DIAG_BY_FAMILY, _DIAG_MSG.pack(
+        family, 1, 0, 0, socket.htons(sport), socket.htons(dport),
+        src.ljust(16, b"\0"), dst.ljust(16, b"\0"), 0, 0, 0, 0, 0, 1000, inode))
+
+
+def test_build_dest_filter():
+    """Each prefix is a D_COND whose match falls into a rejecting JMP."""
+    program = build_dest_filter(PREFIXES)
+    # IPv4 block: 4 op + 8 hostcond + 4 addr, then a 4-byte JMP (20 bytes);
+    # IPv6 block: 4 + 8 + 16, then the JMP (32 bytes)
+    assert len(program) == 52
+    assert _BC_OP.unpack_from(program, 0) == (INET_DIAG_BC_D_COND, 16, 20)
+    assert _BC_OP.unpack_from(program, 16) == (INET_DIAG_BC_JMP, 4, 40)  # lands 4 bytes past the end
+    assert _BC_OP.unpack_from(program, 20) == (INET_DIAG_BC_D_COND, 28, 32)
+    assert _BC_OP.unpack_from(program, 48) == (INET_DIAG_BC_JMP, 4, 8)
+    assert _HOSTCOND.unpack_from(program, 24) == (socket.AF_INET6, 7, -1)
+
+    v4, v6 = socket.AF_INET, socket.AF_INET6
+    assert not _run_filter(program, v4, ipaddress.ip_address("10.1.2.3").packed)
+    assert _run_filter(program, v4, ipaddress.ip_address("93.184.216.34").packed)
+    assert not _run_filter(program, v6, ipaddress.ip_address("fd12::1").packed)
+    assert _run_filter(program, v6, ipaddress.ip_address("2606:4700::1111").packed)
+    print(f"✓ {len(program)}-byte filter rejects 10/8 and fc00::/7, keeps public peers")
+
+    # The default program covers every local range and still ends exactly at its length
+    default = build_dest_filter()
+    assert _run_filter(default, v4, ipaddress.ip_address("8.8.8.8").packed)
+    assert not _run_filter(default, v4, ipaddress.ip_address("192.168.1.1").packed)
+    assert not _run_filter(default, v6, ipaddress.ip_address("::1").packed)
+    print(f"✓ Default filter: {len(default)} bytes")
+
+
+def test_parse_dump():
+    """inet_diag_msg records are decoded with host-order ports until NLMSG_DONE."""
+    v4 = _diag(socket.AF_INET, socket.inet_aton("10.0.0.5"), 50000,
+               socket.inet_aton("93.184.216.34"), 443, 777)
+    v6 = _diag(socket.AF_INET6, socket.inet_pton(socket.AF_INET6, "2001:db8::5"), 50001,
+               socket.inet_pton(socket.AF_INET6, "2606:4700::1111"), 8443, 778)
+    buf = bytearray(4096)
+    data = v4 + v6
+    buf[:len(data)] = data
+
+    records, done = parse_dump(buf, len(data))
+    assert not done and len(records) == 2
+    inode, family, src, sport, dst, dport = records[0]
+    assert (inode, family, sport, dport) == (777, socket.AF_INET, 50000, 443)
+    assert socket.inet_ntoa(dst[:4]) == "93.184.216.34"
+    assert records[1][5] == 8443 and socket.inet_ntop(socket.AF_INET6, records[1][4]) == "2606:4700::1111"
+
+    data += _message(NLMSG_DONE, struct.pack("=i", 0))
+    buf[:len(data)] = data
+    records, done = parse_dump(buf, len(data))
+    assert done and len(records) == 2
+    print(f"✓ Parsed {len(records)} sockets and the end of the dump")
+
+    error = _message(NLMSG_ERROR, struct.pack("=i", -1))  # -EPERM
+    try:
+        parse_dump(error, len(error))
+        assert False, "a netlink error must raise"
+    except OSError as e:
+        assert e.errno == 1
+    print("✓ Netlink error surfaced as OSError")
+
+
+if __name__ == "__main__":
+    test_build_dest_filter()
+    test_parse_dump()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Test startup handling of connections that were open before monitoring."""
+
+import sqlite3
+import tempfile
+from pathlib import Path
+from queue import Queue
+
+import database.activity_store as store
+from collector.windows_net_collector import WindowsNetCollector
+from core import suspicion_engine
+
+
+class _FixedCollector(WindowsNetCollector):
+    def _snapshot(self):
+        yield 1, "10.0.0.5", 50000, "93.184.216.34", 443
+        yield 1, "10.0.0.5", 50001, "93.184.216.35", 443
+
+
+def test_startup_baseline():
+    """Pre-existing connections arrive as one batch and are stored in one transaction."""
+    queue = Queue()
+    collector = _FixedCollector(queue)
+    collector.start()
+    collector.stop()
+    batch = queue.get_nowait()
+    assert len(batch) == 2
+    assert {e["event_type"] for e in batch} == {"existing"}
+    print(f"✓ Startup snapshot: {len(batch)} existing connections in one batch")
+
+    suspicion_engine.seed_destinations(("seeded.exe", e["dest_ip"], e["dest_port"]) for e in batch)
+    assert not suspicion_engine.is_new_destination("seeded.exe", "93.184.216.34", 443)
+    assert suspicion_engine.get_recent_connection_count("seeded.exe") == 0
+    print("✓ Engine seeded without touching rate windows")
+
+    original = store.DB_PATH
+    store.DB_PATH = Path(tempfile.mkdtemp()) / "baseline.db"
+    try:
+        store.init_db()
+        rows = [{"timestamp": "2025-01-15 14:30:00", "process_name": "seeded.exe",
+                 "dest_ip": e["dest_ip"], "dest_port": e["dest_port"],
+                 "risk_level": "SAFE", "reasons": ["Pre-existing connection at startup"]}
+                for e in batch]
+        assert store.insert_events(rows)
+        count = sqlite3.connect(str(store.DB_PATH)).execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        assert count == 2
+        print(f"✓ Bulk insert stored {count} rows")
+    finally:
+        store.DB_PATH = original
+
+
+if __name__ == "__main__":
+    test_startup_baseline()
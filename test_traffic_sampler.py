@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Test per-process byte accounting used to fill event traffic."""
+
+import os
+
+from collector.traffic_sampler import TrafficSampler
+
+
+def test_traffic_sampler():
+    """Deltas are attributed once and idle PIDs release their slot."""
+    sampler = TrafficSampler()
+    pid = os.getpid()
+
+    sampler.track(pid)
+    sampler.track(pid)
+    sampler.sample()
+    first_read, first_write = sampler.take(pid)
+    assert first_read < 4096  # baseline taken at track(), not the lifetime totals
+    assert sampler.take(pid) == (0, 0)
+    print(f"✓ First interval from the baseline: {first_read} read, {first_write} written")
+
+    with open(os.devnull, 'wb') as f:
+        f.write(b'x' * 65536)
+    sampler.sample()
+    _, written = sampler.take(pid)
+    assert written >= 65536
+    print(f"✓ Delta after write: {written} bytes")
+
+    # Slot stays until both connections closed and one more sample ran
+    sampler.untrack(pid)
+    sampler.sample()
+    assert len(sampler) == 1
+    sampler.untrack(pid)
+    sampler.sample()
+    sampler.sample()
+    assert len(sampler) == 0
+    assert sampler.take(pid) == (0, 0)
+    print(f"✓ Slot released: {sampler.stats()}")
+
+
+if __name__ == "__main__":
+    test_traffic_sampler()
@@ -50,7 +50,7 @@ def export_suspicious_events_csv(severity_filter=None, limit=1000):
             fieldnames = [
                 'Timestamp', 'Process', 'PID', 'Destination IP', 'Port',
                 'Suspicion Score', 'Risk Level', 'Severity', 'Reasons',
-                'Intent Score', 'Protocol'
+                'Intent Score', 'Protocol', 'Count', 'First Seen'
             ]
             writer = csv.DictWriter(f, fieldnames=fieldnames)
             
@@ -71,6 +71,8 @@ def export_suspicious_events_csv(severity_filter=None, limit=1000):
                     'Reasons': event.get('reason', ''),
                     'Intent Score': round(event.get('intent_score', 0), 2),
                     'Protocol': event.get('protocol', 'TCP'),
+                    'Count': event.get('count') or 1,
+                    'First Seen': event.get('first_seen') or '',
                 })
         
         return str(filepath)